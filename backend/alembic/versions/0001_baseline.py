@@ -0,0 +1,165 @@
+"""baseline schema
+
+起動時の create_all + ALTER TABLE で作られていた既存スキーマを再現する。
+既存 DB に対しては不足しているテーブル・列だけを追加するため、そのまま upgrade できる。
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TASK_STATUS = sa.Enum("pending", "in_progress", "completed", "deleted", name="taskstatus")
+
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def _add_missing_columns(inspector, table: str, columns: list[sa.Column]) -> None:
+    existing = {c["name"] for c in inspector.get_columns(table)}
+    for column in columns:
+        if column.name not in existing:
+            op.add_column(table, column)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    is_postgres = bind.dialect.name == "postgresql"
+    tables = set(inspector.get_table_names())
+
+    if "users" not in tables:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("username", sa.String(30), nullable=False),
+            sa.Column("hashed_password", sa.String(255), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("is_verified", sa.Boolean(), nullable=True),
+            sa.Column("failed_login_attempts", sa.Integer(), nullable=True),
+            sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("ai_provider", sa.String(20), nullable=True),
+            sa.Column("ai_api_key", sa.String(500), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+    else:
+        _add_missing_columns(
+            inspector,
+            "users",
+            [
+                sa.Column("ai_provider", sa.String(20), nullable=True),
+                sa.Column("ai_api_key", sa.String(500), nullable=True),
+            ],
+        )
+
+    if "tasks" not in tables:
+        op.create_table(
+            "tasks",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("title", sa.String(100), nullable=False),
+            sa.Column("due_date", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("importance", sa.Integer(), nullable=False),
+            sa.Column("estimated_minutes", sa.Integer(), nullable=True),
+            sa.Column("actual_minutes", sa.Integer(), nullable=True),
+            sa.Column("category", sa.String(100), nullable=True),
+            sa.Column("memo", sa.Text(), nullable=True),
+            sa.Column("recurrence", sa.String(20), nullable=True),
+            sa.Column("depends_on_id", sa.Integer(), sa.ForeignKey("tasks.id"), nullable=True),
+            sa.Column("parent_task_id", sa.Integer(), sa.ForeignKey("tasks.id"), nullable=True),
+            sa.Column("status", TASK_STATUS, nullable=False),
+            sa.Column("today_focus", sa.Boolean(), nullable=True),
+            sa.Column("today_focus_approved", sa.Boolean(), nullable=True),
+            sa.Column("manual_order", sa.Integer(), nullable=True),
+            sa.Column("priority_score", sa.Float(), nullable=True),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+            *_timestamps(),
+            sa.Column("tags", sa.String(500), nullable=True),
+        )
+        op.create_index("ix_tasks_id", "tasks", ["id"])
+        op.create_index("ix_tasks_user_id", "tasks", ["user_id"])
+    else:
+        _add_missing_columns(
+            inspector,
+            "tasks",
+            [
+                sa.Column("actual_minutes", sa.Integer(), nullable=True),
+                sa.Column("recurrence", sa.String(20), nullable=True),
+                # SQLite は ALTER で制約を追加できないため、外部キーは PostgreSQL のみ
+                sa.Column(
+                    "parent_task_id",
+                    sa.Integer(),
+                    *([sa.ForeignKey("tasks.id")] if is_postgres else []),
+                    nullable=True,
+                ),
+                sa.Column("manual_order", sa.Integer(), nullable=True),
+                sa.Column("tags", sa.String(500), nullable=True),
+            ],
+        )
+        # 旧スキーマの category は Enum / 短い VARCHAR だった（型が違う場合のみ変更する）
+        category = next(c for c in inspector.get_columns("tasks") if c["name"] == "category")
+        if is_postgres and getattr(category["type"], "length", None) != 100:
+            op.alter_column(
+                "tasks",
+                "category",
+                type_=sa.String(100),
+                postgresql_using="category::varchar(100)",
+            )
+
+    if "objectives" not in tables:
+        op.create_table(
+            "objectives",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("title", sa.String(200), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("quarter", sa.String(10), nullable=False),
+            sa.Column("color", sa.String(20), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index("ix_objectives_id", "objectives", ["id"])
+        op.create_index("ix_objectives_user_id", "objectives", ["user_id"])
+
+    if "key_results" not in tables:
+        op.create_table(
+            "key_results",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column(
+                "objective_id", sa.Integer(), sa.ForeignKey("objectives.id"), nullable=False
+            ),
+            sa.Column("title", sa.String(200), nullable=False),
+            sa.Column("target_value", sa.Float(), nullable=True),
+            sa.Column("current_value", sa.Float(), nullable=True),
+            sa.Column("unit", sa.String(20), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index("ix_key_results_id", "key_results", ["id"])
+        op.create_index("ix_key_results_objective_id", "key_results", ["objective_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("key_results")
+    op.drop_table("objectives")
+    op.drop_table("tasks")
+    op.drop_table("users")
+    TASK_STATUS.drop(op.get_bind(), checkfirst=True)
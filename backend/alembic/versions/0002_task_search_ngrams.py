@@ -0,0 +1,67 @@
+"""task search n-grams
+
+タスク全文検索用の n-gram 列と GIN インデックスを追加し、既存タスクを埋める。
+
+Revision ID: 0002_task_search_ngrams
+Revises: 0001_baseline
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.search import NGRAM_VECTOR_SQL, build_search_ngrams
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_task_search_ngrams"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+tasks = sa.table(
+    "tasks",
+    sa.column("id", sa.Integer),
+    sa.column("title", sa.String),
+    sa.column("memo", sa.Text),
+    sa.column("search_ngrams", sa.Text),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    columns = {c["name"] for c in sa.inspect(bind).get_columns("tasks")}
+    if "search_ngrams" not in columns:
+        op.add_column("tasks", sa.Column("search_ngrams", sa.Text(), nullable=True))
+
+    while True:
+        rows = bind.execute(
+            sa.select(tasks.c.id, tasks.c.title, tasks.c.memo)
+            .where(tasks.c.search_ngrams.is_(None))
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            tasks.update()
+            .where(tasks.c.id == sa.bindparam("task_id"))
+            .values(search_ngrams=sa.bindparam("ngrams")),
+            [{"task_id": r.id, "ngrams": build_search_ngrams(r.title, r.memo)} for r in rows],
+        )
+
+    if bind.dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_search_ngrams ON tasks "
+                f"USING gin ({NGRAM_VECTOR_SQL.format('search_ngrams')})"
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_tasks_search_ngrams")
+    op.drop_column("tasks", "search_ngrams")
@@ -0,0 +1,78 @@
+"""task tags table
+
+カンマ区切りの tasks.tags を task_tags テーブルへ移し、旧列を削除する。
+
+Revision ID: 0003_task_tags
+Revises: 0002_task_search_ngrams
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_task_tags"
+down_revision: Union[str, None] = "0002_task_search_ngrams"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "task_tags" not in inspector.get_table_names():
+        op.create_table(
+            "task_tags",
+            sa.Column(
+                "task_id",
+                sa.Integer(),
+                sa.ForeignKey("tasks.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column("tag", sa.String(50), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        )
+        op.create_index("ix_task_tags_user_id_tag", "task_tags", ["user_id", "tag"])
+
+    if "tags" not in {c["name"] for c in inspector.get_columns("tasks")}:
+        return
+
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            "INSERT INTO task_tags (task_id, user_id, tag)"
+            " SELECT DISTINCT t.id, t.user_id, left(btrim(x.tag), 50)"
+            " FROM tasks t CROSS JOIN LATERAL regexp_split_to_table(t.tags, ',') AS x(tag)"
+            " WHERE t.tags IS NOT NULL AND btrim(x.tag) <> ''"
+            " ON CONFLICT DO NOTHING"
+        )
+    else:
+        rows = bind.execute(
+            sa.text("SELECT id, user_id, tags FROM tasks WHERE tags IS NOT NULL")
+        ).all()
+        tag_rows = {
+            (r.id, r.user_id, tag.strip()[:50])
+            for r in rows
+            for tag in r.tags.split(",")
+            if tag.strip()
+        }
+        if tag_rows:
+            bind.execute(
+                sa.text("INSERT INTO task_tags (task_id, user_id, tag) VALUES (:t, :u, :g)"),
+                [{"t": t, "u": u, "g": g} for t, u, g in tag_rows],
+            )
+    op.drop_column("tasks", "tags")
+
+
+def downgrade() -> None:
+    op.add_column("tasks", sa.Column("tags", sa.String(500), nullable=True))
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "UPDATE tasks SET tags = s.tags FROM ("
+            " SELECT task_id, string_agg(tag, ',' ORDER BY tag) AS tags"
+            " FROM task_tags GROUP BY task_id"
+            ") s WHERE tasks.id = s.task_id"
+        )
+    op.drop_table("task_tags")
@@ -0,0 +1,42 @@
+"""composite indexes for hot task queries
+
+一覧・Today Focus（user_id, status, due_date）とダッシュボード集計（user_id, completed_at）用。
+PostgreSQL ではテーブルをロックしないよう CONCURRENTLY で作成する。
+
+Revision ID: 0004_task_query_indexes
+Revises: 0003_task_tags
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_task_query_indexes"
+down_revision: Union[str, None] = "0003_task_tags"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_tasks_user_id_status_due_date": ["user_id", "status", "due_date"],
+    "ix_tasks_user_id_completed_at": ["user_id", "completed_at"],
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, columns in INDEXES.items():
+                op.create_index(
+                    name, "tasks", columns, postgresql_concurrently=True, if_not_exists=True
+                )
+    else:
+        for name, columns in INDEXES.items():
+            op.create_index(name, "tasks", columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name="tasks", if_exists=True)
@@ -0,0 +1,32 @@
+"""per-user data version
+
+タスク・OKR の変更ごとに +1 するカウンタ。読み取り API の ETag に使う。
+
+Revision ID: 0005_user_data_version
+Revises: 0004_task_query_indexes
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_user_data_version"
+down_revision: Union[str, None] = "0004_task_query_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # server_default 付きの NOT NULL 追加は PostgreSQL 11+ ではテーブルを書き換えない
+    op.add_column(
+        "users",
+        sa.Column("data_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "data_version")
@@ -0,0 +1,80 @@
+"""task daily stats
+
+ダッシュボード用の (ユーザー, 日, カテゴリ) 集計テーブルを作り、既存タスクから埋める。
+
+Revision ID: 0006_task_daily_stats
+Revises: 0005_user_data_version
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_task_daily_stats"
+down_revision: Union[str, None] = "0005_user_data_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _day(column: str, dialect_name: str) -> str:
+    if dialect_name == "postgresql":
+        return f"CAST(timezone('UTC', {column}) AS DATE)"
+    return f"date({column})"
+
+
+def _rebuild_daily_stats(bind) -> None:
+    """
+    tasks から集計を埋める。app.services.daily_stats.rebuild_daily_stats（その時点のモデル）ではなく、
+    このリビジョンのテーブル定義に合わせた固定の SQL を使う
+    """
+    dialect_name = bind.dialect.name
+    if dialect_name == "postgresql":
+        op.execute("LOCK TABLE task_daily_stats IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("DELETE FROM task_daily_stats")
+    op.execute(
+        "INSERT INTO task_daily_stats (user_id, day, category, completed_count,"
+        " completed_actual_minutes, completed_estimated_minutes, open_count)"
+        " SELECT user_id, day, category, SUM(completed),"
+        " COALESCE(SUM(actual_minutes), 0), COALESCE(SUM(estimated_minutes), 0),"
+        " COUNT(*) - SUM(completed)"
+        " FROM ("
+        " SELECT user_id,"
+        " CASE WHEN status = 'completed'"
+        f" THEN COALESCE({_day('completed_at', dialect_name)}, '1970-01-01')"
+        f" ELSE {_day('due_date', dialect_name)} END AS day,"
+        " COALESCE(category, '') AS category,"
+        " CASE WHEN status = 'completed' THEN 1 ELSE 0 END AS completed,"
+        " CASE WHEN status = 'completed' THEN actual_minutes ELSE 0 END AS actual_minutes,"
+        " CASE WHEN status = 'completed' THEN estimated_minutes ELSE 0 END AS estimated_minutes"
+        " FROM tasks WHERE status <> 'deleted'"
+        ") AS source"
+        " GROUP BY user_id, day, category"
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if "task_daily_stats" not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            "task_daily_stats",
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("category", sa.String(100), primary_key=True),
+            sa.Column("completed_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column(
+                "completed_actual_minutes", sa.Integer(), nullable=False, server_default="0"
+            ),
+            sa.Column(
+                "completed_estimated_minutes", sa.Integer(), nullable=False, server_default="0"
+            ),
+            sa.Column("open_count", sa.Integer(), nullable=False, server_default="0"),
+        )
+    _rebuild_daily_stats(bind)
+
+
+def downgrade() -> None:
+    op.drop_table("task_daily_stats")
@@ -0,0 +1,37 @@
+"""ai suggestion cache
+
+/api/ai/suggest の結果を保存するテーブル（AI_SUGGEST_CACHE_PERSIST=true のときに使う）。
+
+Revision ID: 0008_ai_suggestion_cache
+Revises: 0007_task_daily_stats_late
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_ai_suggestion_cache"
+down_revision: Union[str, None] = "0007_task_daily_stats_late"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ai_suggestion_cache",
+        sa.Column("cache_key", sa.String(64), primary_key=True),
+        sa.Column("provider", sa.String(20), nullable=False),
+        sa.Column("bucket", sa.Integer(), nullable=False),
+        sa.Column("result", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_ai_suggestion_cache_bucket", "ai_suggestion_cache", ["bucket"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ai_suggestion_cache_bucket", table_name="ai_suggestion_cache")
+    op.drop_table("ai_suggestion_cache")
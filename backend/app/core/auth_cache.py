@@ -0,0 +1,82 @@
+"""
+認証キャッシュ
+
+認証のたびに行っていた JWT 検証と users の SELECT を省くため、
+トークン → ユーザーID とユーザー情報のスナップショットを短い TTL で保持する。
+無効化（退会・パスワード変更・AI キー変更）は app/routers/users.py から行う。
+他ワーカーのキャッシュは無効化されないため、反映の遅れは AUTH_CACHE_TTL_SECONDS まで。
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.user import User
+
+_TOKENS = "tokens"
+_USER_KEY = "user"
+
+_cache = LRUCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    """
+    認証済みユーザーのスナップショット（ORM から切り離した読み取り専用の値）。
+    data_version はキャッシュせず、ETag を使う API だけ毎回 DB から読んで埋める。
+    """
+
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    created_at: Optional[datetime]
+    ai_provider: Optional[str]
+    ai_api_key: Optional[str]
+    data_version: Optional[int] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            ai_provider=user.ai_provider,
+            ai_api_key=user.ai_api_key,
+        )
+
+
+def get_token_user_id(token: str) -> Optional[int]:
+    """検証済みトークンのユーザーID（有効期限切れのものは返さない）"""
+    entry = _cache.get(_TOKENS, token)
+    if entry is None:
+        return None
+    user_id, expires_at = entry
+    if expires_at <= time.time():
+        return None
+    return user_id
+
+
+def set_token_user_id(token: str, user_id: int, expires_at: float) -> None:
+    _cache.set(_TOKENS, token, (user_id, expires_at))
+
+
+def get_cached_user(user_id: int) -> Optional[AuthUser]:
+    return _cache.get(str(user_id), _USER_KEY)
+
+
+def cache_user(user: User) -> AuthUser:
+    auth_user = AuthUser.from_user(user)
+    if auth_user.is_active:
+        _cache.set(str(user.id), _USER_KEY, auth_user)
+    return auth_user
+
+
+def forget_user(user_id: int) -> None:
+    """ユーザー情報を変更したら呼ぶ（次のリクエストで DB から読み直す）"""
+    _cache.invalidate(str(user_id))
@@ -0,0 +1,155 @@
+"""
+レスポンスキャッシュ
+
+読み取り系 API のシリアライズ済み JSON を保持する。キーにはユーザーのデータバージョンを
+含めるため、変更後に古い値が返ることはない（ワーカーごとのメモリキャッシュでも安全）。
+無効化は不要になったエントリを早めに捨ててメモリを空けるためのもの。
+
+- memory: プロセス内 LRU（件数上限 + TTL）
+- redis : 複数ワーカーで共有（redis パッケージが必要）
+- none  : 無効
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.core.config import settings
+
+
+class CacheBackend(ABC):
+    """キャッシュの共通インターフェース。namespace はユーザー単位の無効化に使う"""
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate(self, namespace: str) -> None:
+        ...
+
+
+class NullCache(CacheBackend):
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        return None
+
+    def set(self, namespace: str, key: str, value: bytes) -> None:
+        pass
+
+    def invalidate(self, namespace: str) -> None:
+        pass
+
+
+class LRUCache(CacheBackend):
+    """
+    プロセス内 LRU。同期エンドポイントはスレッドプールで動くためロックで保護する。
+    値はそのまま保持するので、bytes 以外のオブジェクトも入れられる（認証キャッシュ等）。
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+        self._keys_by_namespace: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove((namespace, key))
+                return None
+            self._entries.move_to_end((namespace, key))
+            return value
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[(namespace, key)] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end((namespace, key))
+            self._keys_by_namespace.setdefault(namespace, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, namespace: str) -> None:
+        with self._lock:
+            for key in self._keys_by_namespace.pop(namespace, set()):
+                self._entries.pop((namespace, key), None)
+
+    def _remove(self, entry_key: tuple[str, str]) -> None:
+        self._entries.pop(entry_key, None)
+        namespace, key = entry_key
+        keys = self._keys_by_namespace.get(namespace)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_namespace[namespace]
+
+
+class RedisCache(CacheBackend):
+    """
+    Redis 共有キャッシュ。namespace ごとのキー集合を持ち、無効化でまとめて削除する。
+    Redis が落ちていてもリクエストは失敗させない（読み込みはキャッシュなし、書き込み・無効化は何もしない）。
+    無効化できなくても、キーにデータバージョンを含めるので古い値は返らない。
+    """
+
+    def __init__(self, url: str, ttl_seconds: float, prefix: str = "taskkanri:cache"):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._errors = redis.RedisError
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def _index_key(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:__keys__"
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        try:
+            return self._redis.get(self._key(namespace, key))
+        except self._errors as e:
+            print(f"キャッシュの読み込みに失敗（キャッシュなしで続行）: {e}")
+            return None
+
+    def set(self, namespace: str, key: str, value: bytes) -> None:
+        pipe = self._redis.pipeline()
+        pipe.set(self._key(namespace, key), value, ex=self.ttl_seconds)
+        pipe.sadd(self._index_key(namespace), key)
+        pipe.expire(self._index_key(namespace), self.ttl_seconds)
+        try:
+            pipe.execute()
+        except self._errors as e:
+            print(f"キャッシュの書き込みに失敗: {e}")
+
+    def invalidate(self, namespace: str) -> None:
+        index_key = self._index_key(namespace)
+        try:
+            keys = [self._key(namespace, k.decode()) for k in self._redis.smembers(index_key)]
+            self._redis.delete(index_key, *keys)
+        except self._errors as e:
+            print(f"キャッシュの無効化に失敗: {e}")
+
+
+def build_cache() -> CacheBackend:
+    backend = settings.CACHE_BACKEND
+    if backend == "memory":
+        return LRUCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+    if backend == "redis":
+        return RedisCache(settings.CACHE_URL, settings.CACHE_TTL_SECONDS)
+    if backend == "none":
+        return NullCache()
+    raise ValueError(f"未対応のキャッシュバックエンド: {backend}")
+
+
+response_cache: CacheBackend = build_cache()
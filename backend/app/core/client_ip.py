@@ -0,0 +1,56 @@
+"""
+リクエスト元のクライアント IP
+
+Railway・nginx などのリバースプロキシの後ろでは、request.client.host はプロキシのアドレスになる。
+接続元が TRUSTED_PROXIES に含まれるときだけ X-Forwarded-For を右（プロキシに近い側）から読み、
+信頼するプロキシ以外で最初に現れたアドレスをクライアントとみなす。
+左側はクライアントが自由に書けるため、信頼しないアドレスより左は見ない。
+"""
+
+import ipaddress
+from functools import lru_cache
+from typing import Optional, Union
+
+from fastapi import Request
+
+from app.core.config import settings
+
+_Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+@lru_cache(maxsize=None)
+def _trusted_networks(trusted_proxies: str) -> tuple[_Network, ...]:
+    return tuple(
+        ipaddress.ip_network(entry.strip(), strict=False)
+        for entry in trusted_proxies.split(",")
+        if entry.strip()
+    )
+
+
+def _is_trusted(host: str, networks: tuple[_Network, ...]) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
+def client_ip(request: Request) -> Optional[str]:
+    """クライアントの IP（不明なら None）"""
+    host = request.client.host if request.client else None
+    networks = _trusted_networks(settings.TRUSTED_PROXIES)
+    if host is None or not networks or not _is_trusted(host, networks):
+        return host
+
+    forwarded = [
+        entry.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for entry in header.split(",")
+        if entry.strip()
+    ]
+    for entry in reversed(forwarded):
+        if not _is_trusted(entry, networks):
+            return entry
+        host = entry
+    # すべて信頼するプロキシ（内部からのアクセス）なら、いちばん左のアドレス
+    return host
@@ -1,13 +1,74 @@
+from uuid import uuid4
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
+from app.core.pool import MeteredAsyncQueuePool, MeteredQueuePool
+
+
+def _engine_options(url: str, is_async: bool) -> dict:
+    """Settings のプール設定を create_engine の引数にする"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}  # SQLite（ローカル確認用）はドライバ既定のプールのまま
+    if settings.DB_PGBOUNCER:
+        options: dict = {"poolclass": NullPool}
+        if is_async:
+            # asyncpg のステートメントキャッシュを無効にし、名前付きプリペアドの衝突も避ける
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+    return {
+        "poolclass": MeteredAsyncQueuePool if is_async else MeteredQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
 
-engine = create_engine(settings.DATABASE_URL)
+
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL, False))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# 同期 URL のドライバを非同期ドライバに読み替える
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"非同期ドライバ未対応のデータベース: {backend}")
+    return parsed.set(drivername=_ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+# DB_ASYNC=true のときだけ作る（非同期ドライバを import するため）
+async_engine = (
+    create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        **_engine_options(settings.DATABASE_URL, True),
+    )
+    if settings.DB_ASYNC
+    else None
+)
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False)
+    if async_engine is not None
+    else None
+)
+
 
 def get_db():
     db = SessionLocal()
@@ -15,3 +76,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,38 @@
+"""プロセス内の簡易メトリクス（/api/admin/* で参照する）"""
+
+import threading
+
+# レイテンシヒストグラムの上限（ミリ秒）。最後は上限なし
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class LatencyHistogram:
+    def __init__(self, bounds_ms: tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.bounds_ms = bounds_ms
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(bounds_ms) + 1)
+
+    def observe(self, seconds: float) -> None:
+        elapsed_ms = seconds * 1000
+        index = next(
+            (i for i, bound in enumerate(self.bounds_ms) if elapsed_ms <= bound),
+            len(self.bounds_ms),
+        )
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self.buckets[index] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in self.bounds_ms] + [f">{self.bounds_ms[-1]}ms"]
+            return {
+                "count": self.count,
+                "avg_ms": round(self.total_seconds / self.count * 1000, 3) if self.count else 0.0,
+                "max_ms": round(self.max_seconds * 1000, 3),
+                "histogram": dict(zip(labels, self.buckets)),
+            }
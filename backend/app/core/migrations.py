@@ -0,0 +1,46 @@
+"""
+スキーマバージョン確認
+
+DDL は `alembic upgrade head`（デプロイ前に1回）で適用し、アプリ起動時は
+DB のリビジョンがコードの想定と一致しているかだけを確認する。
+"""
+
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from alembic.util import CommandError
+from sqlalchemy.engine import Engine
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+class SchemaVersionError(RuntimeError):
+    """DB のスキーマがコードより古い（マイグレーション未適用）"""
+
+
+def check_schema_version(engine: Engine) -> str:
+    """
+    DB の現在リビジョンを返す。
+    - 未適用・コードより古い → SchemaVersionError
+    - コードの知らないリビジョン（ローリングデプロイ中に新しい版が適用済み）→ そのまま返す
+    """
+    script = ScriptDirectory.from_config(Config(str(ALEMBIC_INI)))
+    expected = set(script.get_heads())
+    with engine.connect() as conn:
+        current = set(MigrationContext.configure(conn).get_current_heads())
+
+    if current == expected:
+        return ", ".join(sorted(current))
+    if not current:
+        raise SchemaVersionError("マイグレーションが未適用です（alembic upgrade head を実行してください）")
+    try:
+        for revision in current:
+            script.get_revision(revision)
+    except CommandError:
+        return ", ".join(sorted(current))
+    raise SchemaVersionError(
+        f"DB のスキーマが古いです（現在: {', '.join(sorted(current))} / "
+        f"必要: {', '.join(sorted(expected))}）。alembic upgrade head を実行してください"
+    )
@@ -0,0 +1,106 @@
+"""
+コネクションプールの計測
+
+QueuePool を継承し、接続の取得時間・オーバーフロー・タイムアウトを記録する。
+値は /api/admin/db-pool で確認できる。
+"""
+
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.core.metrics import LatencyHistogram
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.wait = LatencyHistogram()
+
+    def observe(self, wait_seconds: float) -> None:
+        self.wait.observe(wait_seconds)
+
+    def overflowed(self) -> None:
+        with self._lock:
+            self.overflow_events += 1
+
+    def timed_out(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        wait = self.wait.snapshot()
+        with self._lock:
+            return {
+                "checkouts": wait["count"],
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": wait["avg_ms"],
+                "wait_ms_max": wait["max_ms"],
+                "wait_histogram": wait["histogram"],
+            }
+
+
+class _MeteredPoolMixin:
+    """
+    connect()（空き待ち・新規接続・pre-ping を含む取得時間）と、
+    pool_size を超えて接続を作ったオーバーフローを記録する
+    """
+
+    metrics: PoolMetrics
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.timed_out()
+            raise
+        self.metrics.observe(time.perf_counter() - start)
+        return connection
+
+    def _inc_overflow(self) -> bool:
+        created = super()._inc_overflow()
+        # _overflow は -pool_size から始まり、正になったらオーバーフロー接続
+        if created and self._overflow > 0:
+            self.metrics.overflowed()
+        return created
+
+
+class MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool: Pool) -> dict:
+    """現在のプール状態（計測対象外のプールは種類のみ）"""
+    status: dict = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    metrics: Optional[PoolMetrics] = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
@@ -0,0 +1,141 @@
+"""
+ログイン試行の制限（スライディングウィンドウ）
+
+失敗回数をメモリ上のカウンタで数え、DB にはロック（locked_until）を保存するときだけ書き込む。
+カウンタはキーごとに「現在の窓・直前の窓」の2つだけを持ち、直前の窓を経過割合で
+按分して直近 window 秒の件数を近似する（1キーあたり数十バイト）。
+
+- memory: プロセス内（既定）
+- redis : 複数ワーカーで共有（redis パッケージが必要）
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from app.core.config import settings
+
+
+class SlidingWindowStore(ABC):
+    """キーごとの窓カウンタ。window_index は time // window"""
+
+    @abstractmethod
+    def add(self, key: str, window: int, window_index: int) -> tuple[int, int]:
+        """現在の窓に1件加え、(直前の窓の件数, 現在の窓の件数) を返す"""
+
+    @abstractmethod
+    def get(self, key: str, window: int, window_index: int) -> tuple[int, int]:
+        ...
+
+    @abstractmethod
+    def reset(self, key: str, window_index: int) -> None:
+        ...
+
+
+class MemorySlidingWindowStore(SlidingWindowStore):
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # key → [窓番号, 直前の窓の件数, 現在の窓の件数]
+        self._counters: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+
+    def _roll(self, key: str, window_index: int) -> list[int]:
+        counter = self._counters.get(key)
+        if counter is None:
+            return [window_index, 0, 0]
+        index, previous, current = counter
+        if index == window_index:
+            return counter
+        if index == window_index - 1:
+            return [window_index, current, 0]
+        return [window_index, 0, 0]
+
+    def add(self, key: str, window: int, window_index: int) -> tuple[int, int]:
+        with self._lock:
+            counter = self._roll(key, window_index)
+            counter[2] += 1
+            self._counters[key] = counter
+            if len(self._counters) > self.max_keys:
+                self._evict(window_index)
+            return counter[1], counter[2]
+
+    def get(self, key: str, window: int, window_index: int) -> tuple[int, int]:
+        with self._lock:
+            _, previous, current = self._roll(key, window_index)
+            return previous, current
+
+    def reset(self, key: str, window_index: int) -> None:
+        with self._lock:
+            self._counters.pop(key, None)
+
+    def _evict(self, window_index: int) -> None:
+        # 2窓以上前のキーを捨て、それでも多ければ古い順に捨てる（dict は挿入順）
+        stale = [k for k, (index, _, _) in self._counters.items() if index < window_index - 1]
+        for key in stale:
+            del self._counters[key]
+        while len(self._counters) > self.max_keys:
+            del self._counters[next(iter(self._counters))]
+
+
+class RedisSlidingWindowStore(SlidingWindowStore):
+    def __init__(self, url: str, prefix: str = "taskkanri:ratelimit"):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, key: str, window_index: int) -> str:
+        return f"{self.prefix}:{key}:{window_index}"
+
+    def add(self, key: str, window: int, window_index: int) -> tuple[int, int]:
+        pipe = self._redis.pipeline()
+        pipe.get(self._key(key, window_index - 1))
+        pipe.incr(self._key(key, window_index))
+        pipe.expire(self._key(key, window_index), window * 2)
+        previous, current, _ = pipe.execute()
+        return int(previous or 0), int(current)
+
+    def get(self, key: str, window: int, window_index: int) -> tuple[int, int]:
+        previous, current = self._redis.mget(
+            self._key(key, window_index - 1), self._key(key, window_index)
+        )
+        return int(previous or 0), int(current or 0)
+
+    def reset(self, key: str, window_index: int) -> None:
+        self._redis.delete(self._key(key, window_index - 1), self._key(key, window_index))
+
+
+class SlidingWindowLimiter:
+    def __init__(self, store: SlidingWindowStore, window: int):
+        self.store = store
+        self.window = window
+
+    def _estimate(self, counts: tuple[int, int], now: float) -> float:
+        previous, current = counts
+        elapsed = (now % self.window) / self.window
+        return previous * (1 - elapsed) + current
+
+    def count(self, key: str, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        return self._estimate(self.store.get(key, self.window, int(now) // self.window), now)
+
+    def hit(self, key: str, now: Optional[float] = None) -> float:
+        """1件記録し、記録後の直近 window 秒の推定件数を返す"""
+        now = time.time() if now is None else now
+        return self._estimate(self.store.add(key, self.window, int(now) // self.window), now)
+
+    def reset(self, key: str, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        self.store.reset(key, int(now) // self.window)
+
+
+def build_store() -> SlidingWindowStore:
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return MemorySlidingWindowStore(settings.RATE_LIMIT_MAX_KEYS)
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisSlidingWindowStore(settings.CACHE_URL)
+    raise ValueError(f"未対応のレート制限バックエンド: {settings.RATE_LIMIT_BACKEND}")
+
+
+login_limiter = SlidingWindowLimiter(build_store(), settings.LOGIN_WINDOW_SECONDS)
@@ -1,20 +1,109 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.metrics import LatencyHistogram
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__truncate_error=False)
 
+T = TypeVar("T")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+
+# ── パスワードハッシュ（専用プロセスプール + 受付制限） ──────────────────────────
+# bcrypt は1回数百ミリ秒の CPU 処理なので、リクエストのスレッドではなく専用の
+# プロセスプールで実行する。同時に受け付ける数を制限し、超えた分は待たせずに
+# PasswordHashBusy で即座に断る（ログイン集中で他 API のスレッドが枯渇しないように）。
+
+
+class PasswordHashBusy(Exception):
+    """ハッシュ処理の受付上限に達している（429 を返す）"""
+
+
+def _hash_in_worker(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_in_worker(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.rejected = 0
+        self.latency = LatencyHistogram()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # fork はスレッド・DB 接続ごと複製するため spawn で起動する
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def run(self, fn: Callable[..., T], *args) -> T:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHashBusy()
+        with self._lock:
+            self.pending += 1
+        start = time.perf_counter()
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        except BrokenProcessPool:
+            # ワーカーが落ちたら次回作り直す
+            with self._lock:
+                self._executor = None
+            raise
+        finally:
+            self.latency.observe(time.perf_counter() - start)
+            with self._lock:
+                self.pending -= 1
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def status(self) -> dict:
+        with self._lock:
+            status = {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "rejected": self.rejected,
+            }
+        status["latency"] = self.latency.snapshot()
+        return status
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return password_hasher.run(_verify_in_worker, plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.run(_hash_in_worker, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
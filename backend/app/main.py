@@ -1,42 +1,36 @@
 import os
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.core.database import Base, engine
+from app.core.config import settings
+from app.core.database import engine
+from app.core.migrations import SchemaVersionError, check_schema_version
+from app.core.security import PasswordHashBusy, password_hasher
 from app.models import okr as _okr_models  # noqa: ensure OKR tables are registered
-from app.routers import auth, dashboard, tasks, users
+from app.routers import admin, auth, dashboard, tasks, users
 from app.routers import okr
 from app.routers import ai as ai_router
+from app.routers.async_router import to_async_router
+from app.services.ai_clients import ai_clients
+from app.services.ai_gateway import AIGatewayError
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # スキーマ変更は alembic upgrade head で事前に適用する（起動時は DDL を実行しない）
     try:
-        Base.metadata.create_all(bind=engine)
-        print("DB: テーブル作成完了")
-        migrations = [
-            "ALTER TABLE tasks ALTER COLUMN category TYPE VARCHAR(100)",
-            "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS actual_minutes INTEGER",
-            "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS recurrence VARCHAR(20)",
-            "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS parent_task_id INTEGER REFERENCES tasks(id)",
-            "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS manual_order INTEGER",
-            "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS tags VARCHAR(500)",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS ai_provider VARCHAR(20)",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS ai_api_key VARCHAR(500)",
-        ]
-        with engine.connect() as conn:
-            for sql in migrations:
-                try:
-                    conn.execute(__import__("sqlalchemy").text(sql))
-                except Exception as e:
-                    print(f"Migration skipped: {e}")
-            conn.commit()
-            print("DB: マイグレーション完了")
+        revision = check_schema_version(engine)
+        print(f"DB: スキーマバージョン {revision}")
+    except SchemaVersionError:
+        raise
     except Exception as e:
         print(f"DB初期化: {e}")
     yield
+    await ai_clients.close_all()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -60,12 +54,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(PasswordHashBusy)
+async def password_hash_busy_handler(request: Request, exc: PasswordHashBusy):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "ログインが混み合っています。しばらくしてから再試行してください"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(AIGatewayError)
+async def ai_gateway_error_handler(request: Request, exc: AIGatewayError):
+    headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after else None
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=headers)
+
+
 app.include_router(auth.router)
 app.include_router(users.router)
-app.include_router(tasks.router)
-app.include_router(dashboard.router)
-app.include_router(okr.router)
+# DB_ASYNC=true ならタスク・ダッシュボード・OKR を非同期エンジンで処理する（スループット比較用）
+for router in (tasks.router, dashboard.router, okr.router):
+    app.include_router(to_async_router(router) if settings.DB_ASYNC else router)
 app.include_router(ai_router.router)
+app.include_router(admin.router)
 
 
 @app.get("/health")
@@ -1,4 +1,13 @@
 from app.models.user import User
-from app.models.task import Task, TaskStatus, TaskCategory
+from app.models.task import Task, TaskStatus, TaskCategory, TaskTag, TaskDailyStat
+from app.models.ai import AISuggestionCache
 
-__all__ = ["User", "Task", "TaskStatus", "TaskCategory"]
+__all__ = [
+    "User",
+    "Task",
+    "TaskStatus",
+    "TaskCategory",
+    "TaskTag",
+    "TaskDailyStat",
+    "AISuggestionCache",
+]
@@ -0,0 +1,21 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, String, Text
+
+from app.core.database import Base
+
+
+class AISuggestionCache(Base):
+    """
+    /api/ai/suggest の結果（AI_SUGGEST_CACHE_PERSIST=true のときだけ使う）。
+    cache_key は (プロバイダ, 日付の区切り, 正規化したタイトル) のハッシュ。
+    result の期日は提案した日からの日数で持つ（app.services.ai_suggest_cache）
+    """
+
+    __tablename__ = "ai_suggestion_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    provider = Column(String(20), nullable=False)
+    bucket = Column(Integer, nullable=False, index=True)
+    result = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -1,20 +1,27 @@
 import enum
 from datetime import datetime, timezone
+from typing import Optional
 
 from sqlalchemy import (
     Boolean,
     Column,
+    Date,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    event,
+    func,
+    inspect,
 )
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
+from app.services.search import build_search_ngrams
 
 
 class TaskStatus(str, enum.Enum):
@@ -34,6 +41,10 @@ class TaskCategory(str, enum.Enum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_user_id_status_due_date", "user_id", "status", "due_date"),
+        Index("ix_tasks_user_id_completed_at", "user_id", "completed_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -65,6 +76,9 @@ class Task(Base):
     # 優先度スコア（キャッシュ）
     priority_score = Column(Float, default=0.0)
 
+    # 全文検索用 n-gram（タイトル・メモから自動生成）
+    search_ngrams = Column(Text, nullable=True)
+
     # タイムスタンプ
     completed_at = Column(DateTime(timezone=True), nullable=True)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
@@ -83,4 +97,62 @@ class Task(Base):
     parent = relationship(
         "Task", remote_side=[id], foreign_keys=[parent_task_id], backref="subtasks"
     )
-# NOTE: tags column added via migration in main.py
+    tag_links = relationship(
+        "TaskTag", cascade="all, delete-orphan", order_by="TaskTag.tag", lazy="selectin"
+    )
+
+    @property
+    def tags(self) -> Optional[str]:
+        """カンマ区切りのタグ文字列（API 互換用）"""
+        return ",".join(link.tag for link in self.tag_links) or None
+
+
+class TaskTag(Base):
+    """タスクとタグの対応（(user_id, tag) で引ける転置インデックス）"""
+
+    __tablename__ = "task_tags"
+
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String(50), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    __table_args__ = (Index("ix_task_tags_user_id_tag", "user_id", "tag"),)
+
+
+class TaskDailyStat(Base):
+    """
+    ユーザー・日（UTC）・カテゴリごとのタスク集計（ダッシュボード用）
+    完了タスクは完了日、未完了タスクは期限日の行に数える。更新は app.services.daily_stats
+    """
+
+    __tablename__ = "task_daily_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(String(100), primary_key=True)  # 未設定は ""
+    completed_count = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_late_count = Column(Integer, nullable=False, default=0, server_default="0")  # 期限後に完了
+    completed_actual_minutes = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_estimated_minutes = Column(Integer, nullable=False, default=0, server_default="0")
+    open_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+# 全文検索用 GIN インデックス（PostgreSQL のみ）
+Index(
+    "ix_tasks_search_ngrams",
+    func.array_to_tsvector(func.string_to_array(Task.search_ngrams, " ")),
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
+
+
+@event.listens_for(Task, "before_insert")
+def _set_search_ngrams(mapper, connection, target: Task) -> None:
+    target.search_ngrams = build_search_ngrams(target.title, target.memo)
+
+
+@event.listens_for(Task, "before_update")
+def _refresh_search_ngrams(mapper, connection, target: Task) -> None:
+    state = inspect(target)
+    if state.attrs.title.history.has_changes() or state.attrs.memo.history.has_changes():
+        target.search_ngrams = build_search_ngrams(target.title, target.memo)
+
@@ -18,6 +18,8 @@ class User(Base):
     locked_until = Column(DateTime(timezone=True), nullable=True)
     ai_provider = Column(String(20), nullable=True)   # "openai" | "anthropic" | "gemini"
     ai_api_key = Column(String(500), nullable=True)   # ユーザー自身のAPIキー
+    # タスク・OKR の変更ごとに +1（ETag / 条件付き GET 用）
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime(timezone=True),
@@ -0,0 +1,57 @@
+import hmac
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from app.core.config import settings
+from app.core.database import async_engine, engine
+from app.core.pool import pool_status
+from app.core.security import password_hasher
+from app.services.ai_clients import ai_clients
+from app.services.ai_gateway import ai_gateway
+from app.services.ai_suggest_cache import suggestion_cache
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """X-Admin-Token が ADMIN_TOKEN と一致する場合のみ許可（未設定なら API ごと無効）"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="権限がありません")
+
+
+@router.get("/db-pool", dependencies=[Depends(require_admin_token)])
+def get_db_pool_status() -> dict[str, Any]:
+    """コネクションプールの使用状況と取得時間の分布"""
+    pools = {"sync": pool_status(engine.pool)}
+    if async_engine is not None:
+        pools["async"] = pool_status(async_engine.pool)
+    return {"pgbouncer": settings.DB_PGBOUNCER, "pools": pools}
+
+
+@router.get("/password-hash", dependencies=[Depends(require_admin_token)])
+def get_password_hash_status() -> dict[str, Any]:
+    """パスワードハッシュ用プロセスプールの処理中件数・拒否数・所要時間"""
+    return password_hasher.status()
+
+
+@router.get("/ai-clients", dependencies=[Depends(require_admin_token)])
+def get_ai_clients_status() -> dict[str, Any]:
+    """保持している AI プロバイダクライアントの件数と再利用状況"""
+    return ai_clients.status()
+
+
+@router.get("/ai-gateway", dependencies=[Depends(require_admin_token)])
+def get_ai_gateway_status() -> dict[str, Any]:
+    """AI 呼び出しの同時実行数・待ち行列・拒否数と、プロバイダごとの所要時間・エラー数"""
+    return ai_gateway.status()
+
+
+@router.get("/ai-suggest-cache", dependencies=[Depends(require_admin_token)])
+def get_ai_suggest_cache_status() -> dict[str, Any]:
+    """AI 提案キャッシュのヒット数・問い合わせ数・共有した同時リクエスト数"""
+    if suggestion_cache is None:
+        return {"enabled": False}
+    return suggestion_cache.status()
@@ -1,11 +1,18 @@
+import asyncio
 import json
-from typing import Optional
+from datetime import date, datetime, timezone
+from typing import Any, AsyncIterator, Callable, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 
-from app.models.user import User
-from app.routers.deps import get_current_user
+from app.core.auth_cache import AuthUser
+from app.core.config import settings
+from app.routers.deps import get_auth_user
+from app.services.ai_gateway import MAX_TOKENS, AIGatewayError, AIStream, ai_gateway
+from app.services.ai_stream import JSONArrayStreamParser, sse_event
+from app.services.ai_suggest_cache import normalize_title, suggestion_cache
 
 router = APIRouter(prefix="/api/ai", tags=["ai"])
 
@@ -24,6 +31,27 @@ class SuggestResponse(BaseModel):
     memo: Optional[str] = None
 
 
+MAX_SUGGEST_BATCH_SIZE = 100
+
+
+class SuggestBatchRequest(BaseModel):
+    titles: list[str] = Field(..., min_length=1, max_length=MAX_SUGGEST_BATCH_SIZE)
+
+
+class SuggestBatchItem(BaseModel):
+    index: int                          # リクエスト配列内の位置
+    title: str
+    ok: bool
+    error: Optional[str] = None
+    suggestion: Optional[SuggestResponse] = None
+
+
+class SuggestBatchResponse(BaseModel):
+    results: list[SuggestBatchItem]
+    succeeded: int
+    failed: int
+
+
 class WeeklyReviewRequest(BaseModel):
     week_label: str
     completed_tasks: list[dict]
@@ -51,47 +79,38 @@ class DecomposeResponse(BaseModel):
 
 # ── AIプロバイダ共通呼び出しヘルパー ──────────────────────────────────────────
 
-def call_ai(provider: str, api_key: str, system_prompt: str, user_prompt: str) -> str:
-    """各AIプロバイダにリクエストして応答テキストを返す"""
+async def call_ai(
+    provider: str,
+    api_key: str,
+    system_prompt: str,
+    user_prompt: str,
+    user_id: int,
+    max_tokens: int = MAX_TOKENS,
+) -> str:
+    """各AIプロバイダにリクエストして応答テキストを返す（同時実行数・期限は ai_gateway が管理）"""
     try:
-        if provider == "openai":
-            import openai
-            client = openai.OpenAI(api_key=api_key)
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.3,
-                max_tokens=1024,
-            )
-            return resp.choices[0].message.content or ""
-
-        elif provider == "anthropic":
-            import anthropic
-            client = anthropic.Anthropic(api_key=api_key)
-            resp = client.messages.create(
-                model="claude-haiku-4-5-20251001",
-                max_tokens=1024,
-                system=system_prompt,
-                messages=[{"role": "user", "content": user_prompt}],
-            )
-            return resp.content[0].text if resp.content else ""
-
-        elif provider == "gemini":
-            import google.generativeai as genai
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel(
-                model_name="gemini-1.5-flash",
-                system_instruction=system_prompt,
-            )
-            resp = model.generate_content(user_prompt)
-            return resp.text or ""
+        return await ai_gateway.complete(
+            provider, api_key, system_prompt, user_prompt, user_id=user_id, max_tokens=max_tokens
+        )
+    except AIGatewayError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"AI APIエラー: {str(e)}",
+        )
 
-        else:
-            raise ValueError(f"未対応のプロバイダ: {provider}")
 
+async def open_ai_stream(
+    provider: str, api_key: str, system_prompt: str, user_prompt: str, user_id: int
+) -> AIStream:
+    """call_ai のストリーミング版。接続までのエラーは call_ai と同じステータスで返す"""
+    try:
+        return await ai_gateway.open_stream(
+            provider, api_key, system_prompt, user_prompt, user_id=user_id
+        )
+    except AIGatewayError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
@@ -99,7 +118,40 @@ def call_ai(provider: str, api_key: str, system_prompt: str, user_prompt: str) -
         )
 
 
-def require_ai_key(current_user: User) -> tuple[str, str]:
+def sse_response(
+    stream: AIStream,
+    on_chunk: Callable[[str], list[str]],
+    on_end: Callable[[], str],
+) -> StreamingResponse:
+    """
+    AIの応答断片を SSE で中継する。on_chunk は断片ごとのイベント、on_end は最後のイベントを返す。
+    送信開始後はステータスを変えられないため、途中のエラーは error イベントで伝える。
+    """
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for chunk in stream:
+                for event in on_chunk(chunk):
+                    yield event
+            final = on_end()
+        except (AIGatewayError, HTTPException) as e:
+            yield sse_event("error", {"detail": e.detail})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"AI APIエラー: {str(e)}"})
+        else:
+            yield final
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # プロキシにバッファリングさせない
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def require_ai_key(current_user: AuthUser) -> tuple[str, str]:
     """APIキー未設定なら403を返す"""
     if not current_user.ai_api_key or not current_user.ai_provider:
         raise HTTPException(
@@ -109,8 +161,8 @@ def require_ai_key(current_user: User) -> tuple[str, str]:
     return current_user.ai_provider, current_user.ai_api_key
 
 
-def extract_json(text: str) -> dict:
-    """AIの応答からJSONを抽出する（```json ... ``` ブロックにも対応）"""
+def extract_json(text: str) -> Any:
+    """AIの応答からJSON（オブジェクトまたは配列）を抽出する（```json ... ``` ブロックにも対応）"""
     text = text.strip()
     if text.startswith("```"):
         lines = text.split("\n")
@@ -119,11 +171,18 @@ def extract_json(text: str) -> dict:
     try:
         return json.loads(text)
     except json.JSONDecodeError:
-        # JSONブロックを探して抽出
-        start = text.find("{")
-        end = text.rfind("}") + 1
-        if start != -1 and end > start:
-            return json.loads(text[start:end])
+        # JSONブロックを探して抽出（先に現れた { か [ から、対応する最後の } か ] まで）
+        candidates = sorted(
+            (text.find(opening), closing) for opening, closing in (("{", "}"), ("[", "]"))
+        )
+        for start, closing in candidates:
+            end = text.rfind(closing) + 1
+            if start == -1 or end <= start:
+                continue
+            try:
+                return json.loads(text[start:end])
+            except json.JSONDecodeError:
+                continue
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail="AIの応答をJSONとして解析できませんでした",
@@ -132,24 +191,15 @@ def extract_json(text: str) -> dict:
 
 # ── エンドポイント ──────────────────────────────────────────────────────────
 
-@router.post("/suggest", response_model=SuggestResponse)
-def suggest_task_details(
-    payload: SuggestRequest,
-    current_user: User = Depends(get_current_user),
-):
-    """タイトルからタスク詳細（期日・重要度・見積時間・カテゴリ・メモ）を提案する"""
-    provider, api_key = require_ai_key(current_user)
-
+def suggest_prompts(title: str, today: date) -> tuple[str, str]:
     system_prompt = (
         "あなたは業務タスク管理の専門家です。"
         "与えられたタスクタイトルから、適切なタスク詳細を推定してください。"
         "必ずJSON形式のみで回答してください。"
     )
-    from datetime import datetime, timezone, timedelta
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
     user_prompt = (
-        f"今日の日付: {today}\n"
-        f"タスクタイトル: {payload.title}\n\n"
+        f"今日の日付: {today.isoformat()}\n"
+        f"タスクタイトル: {title}\n\n"
         "以下のJSON形式で回答してください：\n"
         '{"due_date": "YYYY-MM-DD形式（今日から適切な期日）", '
         '"importance": 1〜5の整数（5が最重要）, '
@@ -157,9 +207,101 @@ def suggest_task_details(
         '"category": "カテゴリ名（法務/経理/総務/人事/その他など）", '
         '"memo": "タスクに関する補足メモ（1〜2文）"}'
     )
+    return system_prompt, user_prompt
 
-    raw = call_ai(provider, api_key, system_prompt, user_prompt)
-    data = extract_json(raw)
+
+# 一括提案の応答1件あたりのトークン数の見積もり（日本語のメモ1〜2文を含む JSON）
+SUGGEST_OUTPUT_TOKENS = 120
+
+
+def suggest_batch_prompts(titles: list[str], today: date) -> tuple[str, str]:
+    system_prompt = (
+        "あなたは業務タスク管理の専門家です。"
+        "与えられた複数のタスクタイトルそれぞれについて、適切なタスク詳細を推定してください。"
+        "必ずJSON配列のみで回答してください。"
+    )
+    numbered = "\n".join(f"{i}. {title}" for i, title in enumerate(titles, start=1))
+    user_prompt = (
+        f"今日の日付: {today.isoformat()}\n"
+        f"タスクタイトル（番号付き）:\n{numbered}\n\n"
+        "タスクごとに1要素の、以下のJSON配列で回答してください（index はタスクの番号）：\n"
+        '[{"index": 1, "due_date": "YYYY-MM-DD形式（今日から適切な期日）", '
+        '"importance": 1〜5の整数（5が最重要）, '
+        '"estimated_minutes": 見積もり作業時間（分・整数）, '
+        '"category": "カテゴリ名（法務/経理/総務/人事/その他など）", '
+        '"memo": "タスクに関する補足メモ（1〜2文）"}, ...]'
+    )
+    return system_prompt, user_prompt
+
+
+def chunk_titles(titles: list[str], max_output_tokens: int) -> list[list[str]]:
+    """1回の呼び出しの応答の見積もりが max_output_tokens に収まる件数ずつに分ける"""
+    size = max(1, max_output_tokens // SUGGEST_OUTPUT_TOKENS)
+    return [titles[i:i + size] for i in range(0, len(titles), size)]
+
+
+def to_suggestion(data: dict) -> SuggestResponse:
+    """AIの応答を SuggestResponse にする（型が合わなければ ValidationError）"""
+    return SuggestResponse(**{name: data.get(name) for name in SuggestResponse.model_fields})
+
+
+def parse_suggest_batch(raw: str, titles: list[str]) -> dict[str, dict]:
+    """
+    一括提案の応答を {タイトル: 提案} にする。番号が不正・型が合わない要素は含めない。
+    全体を JSON として読めない（途中で切れた等）ときは、閉じている要素だけを拾う
+    """
+    try:
+        data = extract_json(raw)
+    except HTTPException:
+        items = JSONArrayStreamParser().feed(raw)
+    else:
+        if isinstance(data, dict):
+            # {"results": [...]} のように包まれている場合
+            data = next((v for v in data.values() if isinstance(v, list)), [])
+        items = data if isinstance(data, list) else []
+
+    parsed: dict[str, dict] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        index = item.get("index")
+        if not isinstance(index, int) or not 1 <= index <= len(titles):
+            continue
+        try:
+            to_suggestion(item)
+        except ValidationError:
+            continue
+        parsed[titles[index - 1]] = item
+    return parsed
+
+
+async def fetch_suggestion(
+    provider: str, api_key: str, title: str, today: date, user_id: int
+) -> dict:
+    """タイトル1件の提案を問い合わせる（キャッシュは suggestion_cache を通すこと）"""
+
+    async def fetch(normalized_title: str) -> dict:
+        system_prompt, user_prompt = suggest_prompts(normalized_title, today)
+        raw = await call_ai(provider, api_key, system_prompt, user_prompt, user_id)
+        return extract_json(raw)
+
+    if suggestion_cache is None:
+        return await fetch(title)
+    return await suggestion_cache.get_or_fetch(provider, title, today, fetch)
+
+
+@router.post("/suggest", response_model=SuggestResponse)
+async def suggest_task_details(
+    payload: SuggestRequest,
+    current_user: AuthUser = Depends(get_auth_user),
+):
+    """
+    タイトルからタスク詳細（期日・重要度・見積時間・カテゴリ・メモ）を提案する。
+    同じタイトルの提案は suggestion_cache から返す（期日は今日からの日数で保持）
+    """
+    provider, api_key = require_ai_key(current_user)
+    today = datetime.now(timezone.utc).date()
+    data = await fetch_suggestion(provider, api_key, payload.title, today, current_user.id)
 
     return SuggestResponse(
         due_date=data.get("due_date"),
@@ -170,14 +312,91 @@ def suggest_task_details(
     )
 
 
-@router.post("/weekly-review", response_model=WeeklyReviewResponse)
-def generate_weekly_review(
-    payload: WeeklyReviewRequest,
-    current_user: User = Depends(get_current_user),
+@router.post("/suggest/batch", response_model=SuggestBatchResponse)
+async def suggest_task_details_batch(
+    payload: SuggestBatchRequest,
+    current_user: AuthUser = Depends(get_auth_user),
 ):
-    """週次レビューの振り返りコメントを生成する"""
+    """
+    複数タイトルの提案をまとめて返す。キャッシュにないタイトルは番号付きで1つのプロンプトにまとめ
+    （1回の応答が AI_DEADLINE_SECONDS 内に終わるよう AI_SUGGEST_BATCH_OUTPUT_TOKENS ごとに分割）、
+    応答の JSON 配列を番号で対応づける。
+    まとめた呼び出しが失敗したタイトル・解析できなかったタイトルだけを1件ずつ問い合わせ直し、
+    それでも失敗した項目は error で返す（1件の失敗で全体を失敗にはしない）。
+    """
     provider, api_key = require_ai_key(current_user)
+    today = datetime.now(timezone.utc).date()
+    titles = [normalize_title(title) for title in payload.titles]
+    unique_titles = list(dict.fromkeys(title for title in titles if title))
+
+    suggestions: dict[str, dict] = {}
+    errors: dict[str, str] = {}
+    if suggestion_cache is not None:
+        for title in unique_titles:
+            cached = await suggestion_cache.get(provider, title, today)
+            if cached is not None:
+                suggestions[title] = cached
+    pending = [title for title in unique_titles if title not in suggestions]
+
+    # 呼び出しはユーザーの同時実行数の上限までに抑える（超えると ai_gateway が 429 を返す）
+    slots = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY_PER_USER)
+
+    async def run_chunk(chunk: list[str]) -> None:
+        system_prompt, user_prompt = suggest_batch_prompts(chunk, today)
+        async with slots:
+            try:
+                raw = await call_ai(
+                    provider,
+                    api_key,
+                    system_prompt,
+                    user_prompt,
+                    current_user.id,
+                    max_tokens=settings.AI_SUGGEST_BATCH_OUTPUT_TOKENS,
+                )
+            except (HTTPException, AIGatewayError):
+                # このまとまりのタイトルは、後で1件ずつ問い合わせ直す
+                return
+        for title, data in parse_suggest_batch(raw, chunk).items():
+            suggestions[title] = data
+            if suggestion_cache is not None:
+                await suggestion_cache.put(provider, title, today, data)
+
+    async def run_single(title: str) -> None:
+        async with slots:
+            try:
+                suggestions[title] = await fetch_suggestion(
+                    provider, api_key, title, today, current_user.id
+                )
+            except (HTTPException, AIGatewayError) as e:
+                errors[title] = e.detail
+
+    chunks = chunk_titles(pending, settings.AI_SUGGEST_BATCH_OUTPUT_TOKENS)
+    await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+    await asyncio.gather(*(run_single(title) for title in pending if title not in suggestions))
+
+    results: list[SuggestBatchItem] = []
+    for index, (original, title) in enumerate(zip(payload.titles, titles)):
+        data = suggestions.get(title)
+        if data is None:
+            error = errors.get(title, "タイトルが空です" if not title else "提案を生成できませんでした")
+            results.append(SuggestBatchItem(index=index, title=original, ok=False, error=error))
+            continue
+        try:
+            suggestion = to_suggestion(data)
+        except ValidationError:
+            results.append(
+                SuggestBatchItem(
+                    index=index, title=original, ok=False, error="AIの応答の形式が不正です"
+                )
+            )
+            continue
+        results.append(SuggestBatchItem(index=index, title=original, ok=True, suggestion=suggestion))
 
+    succeeded = sum(1 for r in results if r.ok)
+    return SuggestBatchResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+
+
+def weekly_review_prompts(payload: WeeklyReviewRequest) -> tuple[str, str]:
     completed_list = "\n".join(
         f"- {t.get('title', '')}（カテゴリ: {t.get('category', 'なし')}, 実績: {t.get('actual_minutes', '記録なし')}分）"
         for t in payload.completed_tasks
@@ -200,19 +419,10 @@ def generate_weekly_review(
         "この週の振り返りコメントを生成してください。"
         "うまくいったこと、改善点、来週への提言を含めてください。"
     )
+    return system_prompt, user_prompt
 
-    review_text = call_ai(provider, api_key, system_prompt, user_prompt)
-    return WeeklyReviewResponse(review_text=review_text.strip())
-
-
-@router.post("/decompose", response_model=DecomposeResponse)
-def decompose_task(
-    payload: DecomposeRequest,
-    current_user: User = Depends(get_current_user),
-):
-    """タスクを3〜6個のサブタスクに分解する"""
-    provider, api_key = require_ai_key(current_user)
 
+def decompose_prompts(payload: DecomposeRequest) -> tuple[str, str]:
     system_prompt = (
         "あなたは業務タスク管理の専門家です。"
         "与えられたタスクを実行可能なサブタスクに分解してください。"
@@ -227,24 +437,115 @@ def decompose_task(
         '{"title": "サブタスク名", "estimated_minutes": 見積時間（分・整数）, "memo": "補足（省略可）"}'
         ", ...]}"
     )
+    return system_prompt, user_prompt
+
+
+def to_subtask(data: dict) -> Optional[SubTask]:
+    """AIの応答の要素を SubTask にする（タイトルのないものは None）"""
+    if not data.get("title"):
+        return None
+    return SubTask(
+        title=data.get("title", ""),
+        estimated_minutes=data.get("estimated_minutes"),
+        memo=data.get("memo"),
+    )
+
+
+def no_subtasks_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_502_BAD_GATEWAY,
+        detail="サブタスクを生成できませんでした",
+    )
+
+
+@router.post("/weekly-review", response_model=WeeklyReviewResponse)
+async def generate_weekly_review(
+    payload: WeeklyReviewRequest,
+    current_user: AuthUser = Depends(get_auth_user),
+):
+    """週次レビューの振り返りコメントを生成する"""
+    provider, api_key = require_ai_key(current_user)
+    system_prompt, user_prompt = weekly_review_prompts(payload)
+
+    review_text = await call_ai(provider, api_key, system_prompt, user_prompt, current_user.id)
+    return WeeklyReviewResponse(review_text=review_text.strip())
+
+
+@router.post("/weekly-review/stream")
+async def stream_weekly_review(
+    payload: WeeklyReviewRequest,
+    current_user: AuthUser = Depends(get_auth_user),
+):
+    """
+    週次レビューを SSE で返す。生成された断片を届いた順に中継する。
+    event: delta {"text": 断片} … event: done {"review_text": 全文} / event: error {"detail": ...}
+    """
+    provider, api_key = require_ai_key(current_user)
+    system_prompt, user_prompt = weekly_review_prompts(payload)
+    stream = await open_ai_stream(provider, api_key, system_prompt, user_prompt, current_user.id)
+
+    parts: list[str] = []
+
+    def on_chunk(text: str) -> list[str]:
+        parts.append(text)
+        return [sse_event("delta", {"text": text})]
+
+    def on_end() -> str:
+        return sse_event("done", {"review_text": "".join(parts).strip()})
+
+    return sse_response(stream, on_chunk, on_end)
+
+
+@router.post("/decompose", response_model=DecomposeResponse)
+async def decompose_task(
+    payload: DecomposeRequest,
+    current_user: AuthUser = Depends(get_auth_user),
+):
+    """タスクを3〜6個のサブタスクに分解する"""
+    provider, api_key = require_ai_key(current_user)
+    system_prompt, user_prompt = decompose_prompts(payload)
 
-    raw = call_ai(provider, api_key, system_prompt, user_prompt)
+    raw = await call_ai(provider, api_key, system_prompt, user_prompt, current_user.id)
     data = extract_json(raw)
 
     subtasks = [
-        SubTask(
-            title=s.get("title", ""),
-            estimated_minutes=s.get("estimated_minutes"),
-            memo=s.get("memo"),
-        )
-        for s in data.get("subtasks", [])
-        if s.get("title")
+        subtask for subtask in map(to_subtask, data.get("subtasks", [])) if subtask is not None
     ]
 
     if not subtasks:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail="サブタスクを生成できませんでした",
-        )
+        raise no_subtasks_error()
 
     return DecomposeResponse(subtasks=subtasks)
+
+
+@router.post("/decompose/stream")
+async def stream_decompose_task(
+    payload: DecomposeRequest,
+    current_user: AuthUser = Depends(get_auth_user),
+):
+    """
+    サブタスク分解を SSE で返す。応答の JSON を逐次解析し、サブタスクのオブジェクトが閉じるたびに送る。
+    event: subtask {SubTask} … event: done {"subtasks": [...]} / event: error {"detail": ...}
+    """
+    provider, api_key = require_ai_key(current_user)
+    system_prompt, user_prompt = decompose_prompts(payload)
+    stream = await open_ai_stream(provider, api_key, system_prompt, user_prompt, current_user.id)
+
+    parser = JSONArrayStreamParser()
+    subtasks: list[SubTask] = []
+
+    def on_chunk(text: str) -> list[str]:
+        events = []
+        for item in parser.feed(text):
+            subtask = to_subtask(item)
+            if subtask is not None:
+                subtasks.append(subtask)
+                events.append(sse_event("subtask", subtask.model_dump()))
+        return events
+
+    def on_end() -> str:
+        if not subtasks:
+            raise no_subtasks_error()
+        return sse_event("done", {"subtasks": [s.model_dump() for s in subtasks]})
+
+    return sse_response(stream, on_chunk, on_end)
@@ -0,0 +1,111 @@
+"""
+同期ルーターの非同期版を作る（DB_ASYNC=true 用）
+
+各エンドポイントを async def で包み、ハンドラ本体は AsyncSession.run_sync で実行する。
+run_sync 内の同期 Session 操作は greenlet 経由で非同期ドライバ（asyncpg）を await するため、
+スレッドプール（1ワーカーあたり約40並列）を使わずにイベントループ上で処理できる。
+ハンドラの実装は同期版と共通なので、sync / async を同じコードで比較できる。
+"""
+
+import inspect
+from functools import lru_cache
+from typing import Any, Callable
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.params import Depends as DependsParam
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db, get_db
+from app.routers.deps import (
+    check_not_modified,
+    check_not_modified_async,
+    get_auth_user,
+    get_auth_user_async,
+    get_current_user,
+    get_current_user_async,
+    get_versioned_user,
+    get_versioned_user_async,
+)
+
+# 同期依存関係 → 非同期依存関係（同じリクエスト内では同じ AsyncSession を共有する）
+ASYNC_DEPENDENCIES: dict[Callable, Callable] = {
+    get_db: get_async_db,
+    get_current_user: get_current_user_async,
+    get_auth_user: get_auth_user_async,
+    get_versioned_user: get_versioned_user_async,
+    check_not_modified: check_not_modified_async,
+}
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def _detach(result: Any, response_model: Any) -> Any:
+    """
+    ORM オブジェクトは run_sync の外で遅延ロードできないため、
+    response_model への変換（シリアライズ前の属性読み出し）を run_sync 内で済ませる。
+    """
+    if response_model is None or result is None or isinstance(result, (Response, BaseModel)):
+        return result
+    return _adapter(response_model).validate_python(result, from_attributes=True)
+
+
+def _async_endpoint(endpoint: Callable, response_model: Any) -> Callable:
+    signature = inspect.signature(endpoint)
+    parameters = []
+    db_params = []
+    for param in signature.parameters.values():
+        default = param.default
+        if isinstance(default, DependsParam) and default.dependency in ASYNC_DEPENDENCIES:
+            if default.dependency is get_db:
+                db_params.append(param.name)
+            param = param.replace(
+                default=Depends(ASYNC_DEPENDENCIES[default.dependency], use_cache=default.use_cache),
+                annotation=AsyncSession if default.dependency is get_db else param.annotation,
+            )
+        parameters.append(param)
+    if len(db_params) != 1:
+        raise ValueError(f"{endpoint.__name__}: get_db への依存がちょうど1つ必要です")
+    db_param = db_params[0]
+
+    async def wrapper(**kwargs):
+        db: AsyncSession = kwargs[db_param]
+
+        def run(session):
+            return _detach(endpoint(**{**kwargs, db_param: session}), response_model)
+
+        return await db.run_sync(run)
+
+    wrapper.__name__ = endpoint.__name__
+    wrapper.__doc__ = endpoint.__doc__
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+    return wrapper
+
+
+def to_async_router(router: APIRouter) -> APIRouter:
+    """ルートの順序・パス・レスポンス定義はそのままに、エンドポイントだけ非同期版に差し替える"""
+    async_router = APIRouter()
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+        async_router.add_api_route(
+            route.path,
+            _async_endpoint(route.endpoint, route.response_model),
+            methods=list(route.methods),
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            name=route.name,
+            response_class=route.response_class,
+        )
+    return async_router
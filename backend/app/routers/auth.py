@@ -1,9 +1,12 @@
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
+from app.core.client_ip import client_ip
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.rate_limit import login_limiter
 from app.core.security import (
     create_access_token,
     create_refresh_token,
@@ -22,9 +25,15 @@ from app.schemas.user import (
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
-MAX_LOGIN_ATTEMPTS = 5
+MAX_LOGIN_ATTEMPTS = 5  # 直近 LOGIN_WINDOW_SECONDS 内の失敗回数（アカウント単位）
 LOCK_DURATION_MINUTES = 30
 
+INVALID_CREDENTIALS = "メールアドレス/ユーザー名またはパスワードが正しくありません"
+
+
+def _client_key(request: Request) -> str:
+    return f"ip:{client_ip(request) or 'unknown'}"
+
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def register(payload: UserCreate, db: Session = Depends(get_db)):
@@ -53,7 +62,20 @@ def register(payload: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(payload: UserLogin, db: Session = Depends(get_db)):
+def login(payload: UserLogin, request: Request, db: Session = Depends(get_db)):
+    """
+    失敗回数はメモリ上のスライディングウィンドウで数え、DB には書かない。
+    アカウントの失敗が MAX_LOGIN_ATTEMPTS に達したときだけ locked_until を保存する。
+    同じ接続元からの失敗が多すぎる場合は、DB やハッシュ計算の前に 429 を返す。
+    """
+    client_key = _client_key(request)
+    if login_limiter.count(client_key) >= settings.LOGIN_MAX_FAILURES_PER_IP:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="ログインの失敗が多すぎます。しばらくしてから再試行してください",
+            headers={"Retry-After": str(settings.LOGIN_WINDOW_SECONDS)},
+        )
+
     # メールアドレス or ユーザー名で検索
     user = (
         db.query(User)
@@ -64,10 +86,8 @@ def login(payload: UserLogin, db: Session = Depends(get_db)):
     )
 
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="メールアドレス/ユーザー名またはパスワードが正しくありません",
-        )
+        login_limiter.hit(client_key)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=INVALID_CREDENTIALS)
 
     # アカウントロックチェック
     if user.locked_until and user.locked_until > datetime.now(timezone.utc):
@@ -76,21 +96,21 @@ def login(payload: UserLogin, db: Session = Depends(get_db)):
             detail=f"アカウントがロックされています。{user.locked_until.strftime('%H:%M')} 以降に再試行してください",
         )
 
+    user_key = f"user:{user.id}"
     if not verify_password(payload.password, user.hashed_password):
-        user.failed_login_attempts += 1
-        if user.failed_login_attempts >= MAX_LOGIN_ATTEMPTS:
+        login_limiter.hit(client_key)
+        if login_limiter.hit(user_key) >= MAX_LOGIN_ATTEMPTS:
             user.locked_until = datetime.now(timezone.utc) + timedelta(minutes=LOCK_DURATION_MINUTES)
-            user.failed_login_attempts = 0
+            db.commit()
+            login_limiter.reset(user_key)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=INVALID_CREDENTIALS)
+
+    # ログイン成功（以前の状態が残っている場合だけ書き込む）
+    login_limiter.reset(user_key)
+    if user.failed_login_attempts or user.locked_until:
+        user.failed_login_attempts = 0
+        user.locked_until = None
         db.commit()
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="メールアドレス/ユーザー名またはパスワードが正しくありません",
-        )
-
-    # ログイン成功
-    user.failed_login_attempts = 0
-    user.locked_until = None
-    db.commit()
 
     token_data = {"sub": str(user.id)}
     expire_delta = (
@@ -1,98 +1,110 @@
-from datetime import datetime, timedelta, timezone
-from typing import Any
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Optional
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
 
+from app.core.auth_cache import AuthUser
+from app.core.cache import response_cache
 from app.core.database import get_db
-from app.models.task import Task, TaskStatus
-from app.models.user import User
-from app.routers.deps import get_current_user
+from app.models.task import Task, TaskDailyStat, TaskStatus
+from app.routers.deps import check_not_modified, json_response, render_json, response_cache_key
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
+MAX_HISTORY_DAYS = 731  # 2年（うるう年を含む）
+
+
+def _aggregate_factory(db: Session) -> Callable:
+    """
+    条件付き集計。PostgreSQL は FILTER (WHERE ...)、
+    それ以外（SQLite 等）は CASE で条件外を NULL にして集計する（COUNT/SUM は NULL を無視する）
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return lambda aggregate, column, condition: aggregate(column).filter(condition)
+    return lambda aggregate, column, condition: aggregate(case((condition, column)))
+
 
 @router.get("/summary")
 def get_summary(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(check_not_modified),
 ) -> dict[str, Any]:
-    today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-    today_end = today_start + timedelta(days=1)
+    cache_key = response_cache_key(request, current_user)
+    cached = response_cache.get(str(current_user.id), cache_key)
+    if cached is not None:
+        return json_response(cached, response)
 
-    base_q = db.query(Task).filter(
-        Task.user_id == current_user.id,
-        Task.status != TaskStatus.deleted,
-    )
+    now = datetime.now(timezone.utc)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    today = today_start.date()
+    week_start = today - timedelta(days=today.weekday())  # 月曜始まり
+    days = [today - timedelta(days=i) for i in range(6, -1, -1)]  # 直近7日
 
-    total = base_q.count()
-    completed = base_q.filter(Task.status == TaskStatus.completed).count()
-    overdue = base_q.filter(
-        Task.due_date < datetime.now(timezone.utc),
-        Task.status != TaskStatus.completed,
-    ).count()
-
-    # 今日完了
-    today_completed = base_q.filter(
-        Task.status == TaskStatus.completed,
-        Task.completed_at >= today_start,
-        Task.completed_at < today_end,
-    ).count()
-
-    # 今日期限
-    today_due = base_q.filter(
-        Task.due_date >= today_start,
-        Task.due_date < today_end,
-        Task.status != TaskStatus.completed,
-    ).count()
+    aggregate = _aggregate_factory(db)
+    stat = TaskDailyStat
 
-    achievement_rate = round(completed / total * 100, 1) if total > 0 else 0.0
-
-    # 今週の実績時間合計（月曜始まり）
-    week_start = today_start - timedelta(days=today_start.weekday())
-    weekly_actual_minutes = (
-        db.query(func.sum(Task.actual_minutes))
-        .filter(
+    # 日次集計は日単位なので、今日期限のうち期限を過ぎたものだけ tasks から数える
+    overdue_today = (
+        select(func.count(Task.id))
+        .where(
             Task.user_id == current_user.id,
-            Task.status == TaskStatus.completed,
-            Task.completed_at >= week_start,
-            Task.actual_minutes.isnot(None),
+            Task.status.in_([TaskStatus.pending, TaskStatus.in_progress]),
+            Task.due_date >= today_start,
+            Task.due_date < now,
         )
-        .scalar()
-        or 0
+        .scalar_subquery()
     )
 
-    # カテゴリ別分布
-    category_stats = (
-        db.query(Task.category, func.count(Task.id))
-        .filter(
-            Task.user_id == current_user.id,
-            Task.status != TaskStatus.deleted,
-            Task.status != TaskStatus.completed,
+    # 日次集計（完了は完了日、未完了は期限日の行）をカテゴリ別に1クエリで集計し、Python で合算する
+    rows = (
+        db.query(
+            stat.category,
+            func.sum(stat.completed_count),
+            func.sum(stat.open_count),
+            aggregate(func.sum, stat.open_count, stat.day < today),
+            aggregate(func.sum, stat.completed_count, stat.day == today),
+            aggregate(func.sum, stat.open_count, stat.day == today),
+            aggregate(func.sum, stat.completed_actual_minutes, stat.day >= week_start),
+            overdue_today,
+            *[aggregate(func.sum, stat.completed_count, stat.day == day) for day in days],
         )
-        .group_by(Task.category)
+        .filter(stat.user_id == current_user.id)
+        .group_by(stat.category)
         .all()
     )
 
+    completed = open_total = overdue = today_completed = today_due = weekly_actual_minutes = 0
+    category_stats = []
+    daily_counts = [0] * len(days)
+    for category, cat_completed, cat_open, cat_overdue, cat_today_completed, cat_today_due, \
+            cat_minutes, overdue_today_count, *cat_daily in rows:
+        completed += cat_completed
+        open_total += cat_open
+        overdue += cat_overdue or 0
+        today_completed += cat_today_completed or 0
+        today_due += cat_today_due or 0
+        weekly_actual_minutes += cat_minutes or 0
+        daily_counts = [a + (b or 0) for a, b in zip(daily_counts, cat_daily)]
+        # カテゴリ別分布（未完了タスクのみ）
+        if cat_open:
+            category_stats.append((category, cat_open))
+    if rows:
+        overdue += overdue_today_count
+
+    total = completed + open_total
+    achievement_rate = round(completed / total * 100, 1) if total > 0 else 0.0
+
     # 直近7日の完了数（週次グラフ用）
-    weekly = []
-    for i in range(6, -1, -1):
-        day_start = today_start - timedelta(days=i)
-        day_end = day_start + timedelta(days=1)
-        count = (
-            db.query(Task)
-            .filter(
-                Task.user_id == current_user.id,
-                Task.status == TaskStatus.completed,
-                Task.completed_at >= day_start,
-                Task.completed_at < day_end,
-            )
-            .count()
-        )
-        weekly.append({"date": day_start.strftime("%m/%d"), "count": count})
+    weekly = [
+        {"date": day.strftime("%m/%d"), "count": count}
+        for day, count in zip(days, daily_counts)
+    ]
 
-    return {
+    body = render_json({
         "total": total,
         "completed": completed,
         "overdue": overdue,
@@ -105,4 +117,122 @@ def get_summary(
             for cat, cnt in category_stats
         ],
         "weekly_completed": weekly,
-    }
+    })
+    response_cache.set(str(current_user.id), cache_key, body)
+    return json_response(body, response)
+
+
+def _period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())  # 月曜始まり
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_period(start: date, granularity: str) -> date:
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def _rate(part: int, whole: int) -> float:
+    return round(part / whole * 100, 1) if whole > 0 else 0.0
+
+
+@router.get("/history")
+def get_history(
+    request: Request,
+    response: Response,
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    days: int = Query(90, ge=1, le=MAX_HISTORY_DAYS),
+    granularity: str = Query("day", regex="^(day|week|month)$"),
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(check_not_modified),
+) -> dict[str, Any]:
+    """
+    期間内の完了数・期限超過率（期限後に完了した割合）・見積と実績の推移。
+    日次集計から読むため、タスク数ではなく日数に比例するコストで返せる。
+    start を省略すると end（既定は今日、UTC）から days 日分。
+    """
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=days - 1)
+    if start > end or (end - start).days >= MAX_HISTORY_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"期間は開始日 ≦ 終了日、{MAX_HISTORY_DAYS}日以内で指定してください",
+        )
+
+    cache_key = response_cache_key(request, current_user)
+    cached = response_cache.get(str(current_user.id), cache_key)
+    if cached is not None:
+        return json_response(cached, response)
+
+    stat = TaskDailyStat
+    rows = (
+        db.query(
+            stat.day,
+            stat.category,
+            func.sum(stat.completed_count),
+            func.sum(stat.completed_late_count),
+            func.sum(stat.completed_estimated_minutes),
+            func.sum(stat.completed_actual_minutes),
+        )
+        .filter(
+            stat.user_id == current_user.id,
+            stat.day >= start,
+            stat.day <= end,
+            stat.completed_count > 0,
+        )
+        .group_by(stat.day, stat.category)
+        .all()
+    )
+
+    # 期間内のすべての区間を 0 で用意してから日次の値を足し込む
+    periods: dict[date, dict[str, Any]] = {}
+    period = _period_start(start, granularity)
+    while period <= end:
+        following = _next_period(period, granularity)
+        periods[period] = {
+            "start": max(period, start),
+            "end": min(following - timedelta(days=1), end),
+            "completed": 0,
+            "completed_late": 0,
+            "estimated_minutes": 0,
+            "actual_minutes": 0,
+        }
+        period = following
+
+    categories: dict[str, dict[str, Any]] = {}
+    for day, category, completed, late, estimated, actual in rows:
+        bucket = periods[_period_start(day, granularity)]
+        name = category or "other"
+        per_category = categories.setdefault(
+            name, {"category": name, "completed": 0, "estimated_minutes": 0, "actual_minutes": 0}
+        )
+        for target in (bucket, per_category):
+            target["completed"] += completed
+            target["estimated_minutes"] += estimated
+            target["actual_minutes"] += actual
+        bucket["completed_late"] += late
+
+    series = list(periods.values())
+    for bucket in series:
+        bucket["overdue_rate"] = _rate(bucket["completed_late"], bucket["completed"])
+    completed_total = sum(b["completed"] for b in series)
+    late_total = sum(b["completed_late"] for b in series)
+
+    body = render_json({
+        "start": start,
+        "end": end,
+        "granularity": granularity,
+        "completed": completed_total,
+        "overdue_rate": _rate(late_total, completed_total),
+        "series": series,
+        "categories": sorted(categories.values(), key=lambda c: -c["completed"]),
+    })
+    response_cache.set(str(current_user.id), cache_key, body)
+    return json_response(body, response)
@@ -1,33 +1,188 @@
-from fastapi import Depends, HTTPException, status
+import json
+from dataclasses import replace
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import OAuth2PasswordBearer
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.auth_cache import (
+    AuthUser,
+    cache_user,
+    get_cached_user,
+    get_token_user_id,
+    set_token_user_id,
+)
+from app.core.database import get_async_db, get_db
 from app.core.security import decode_token
 from app.models.user import User
+from app.services.data_version import etag_matches, make_etag
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
+_credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="認証情報が無効です",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+def _user_id_from_token(token: str) -> int:
+    """トークンを検証してユーザーIDを返す（検証結果は認証キャッシュに保持する）"""
+    user_id = get_token_user_id(token)
+    if user_id is not None:
+        return user_id
+
+    payload = decode_token(token)
+    if payload is None or payload.get("type") != "access":
+        raise _credentials_exception
+
+    sub = payload.get("sub")
+    if sub is None:
+        raise _credentials_exception
+    set_token_user_id(token, int(sub), float(payload.get("exp", 0)))
+    return int(sub)
+
+
+def _active_user(user: Optional[User]) -> User:
+    if user is None or not user.is_active:
+        raise _credentials_exception
+    return user
+
+
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
 ) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="認証情報が無効です",
-        headers={"WWW-Authenticate": "Bearer"},
+    """ORM のユーザー行が必要な API 用（ユーザー情報の変更など）"""
+    user = _active_user(db.get(User, _user_id_from_token(token)))
+    cache_user(user)
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """非同期ルーター用。ユーザーは同じ AsyncSession に読み込む"""
+    user = _active_user(await db.get(User, _user_id_from_token(token)))
+    cache_user(user)
+    return user
+
+
+def get_auth_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> AuthUser:
+    """
+    ユーザーID等だけが必要な API 用。認証キャッシュにあれば DB にアクセスしない
+    （Session は最初のクエリまで接続を取らない）。
+    読んだら接続をすぐプールに返す。AI の API のように応答を長く待つ async のエンドポイントが、
+    その間ずっと接続を握ってほかの API の接続待ちを起こさないようにするため。
+    """
+    user_id = _user_id_from_token(token)
+    cached = get_cached_user(user_id)
+    if cached is not None:
+        return cached
+    user = db.get(User, user_id)
+    db.close()
+    return cache_user(_active_user(user))
+
+
+async def get_auth_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> AuthUser:
+    user_id = _user_id_from_token(token)
+    cached = get_cached_user(user_id)
+    if cached is not None:
+        return cached
+    return cache_user(_active_user(await db.get(User, user_id)))
+
+
+def _data_version_query(user_id: int):
+    return select(User.data_version).where(User.id == user_id)
+
+
+def get_versioned_user(
+    current_user: AuthUser = Depends(get_auth_user),
+    db: Session = Depends(get_db),
+) -> AuthUser:
+    """
+    データバージョン付きのユーザー（ETag・レスポンスキャッシュのキー用）。
+    バージョンは他ワーカーの変更も反映するよう、キャッシュせず毎回1列だけ読む。
+    """
+    return replace(current_user, data_version=db.scalar(_data_version_query(current_user.id)))
+
+
+async def get_versioned_user_async(
+    current_user: AuthUser = Depends(get_auth_user_async),
+    db: AsyncSession = Depends(get_async_db),
+) -> AuthUser:
+    return replace(
+        current_user, data_version=await db.scalar(_data_version_query(current_user.id))
     )
-    payload = decode_token(token)
-    if payload is None or payload.get("type") != "access":
-        raise credentials_exception
 
-    user_id: int = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None or not user.is_active:
-        raise credentials_exception
+def check_not_modified(
+    request: Request,
+    response: Response,
+    current_user: AuthUser = Depends(get_versioned_user),
+) -> AuthUser:
+    """
+    読み取り系 API 用。データバージョンから ETag を作り、If-None-Match と一致すれば
+    ハンドラ（タスクのクエリ）を実行せずに 304 を返す。
+    """
+    etag = make_etag(current_user.id, current_user.data_version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return current_user
 
-    return user
+
+async def check_not_modified_async(
+    request: Request,
+    response: Response,
+    current_user: AuthUser = Depends(get_versioned_user_async),
+) -> AuthUser:
+    return check_not_modified(request, response, current_user)
+
+
+# ── レスポンスキャッシュ ──────────────────────────────────────────
+
+_FORWARDED_HEADERS = ("etag", "cache-control")
+
+
+def response_cache_key(
+    request: Request, user: AuthUser, data_version: Optional[int] = None
+) -> str:
+    """パス・クエリ・データバージョン・時間帯（ETag と同じ）からキャッシュキーを作る"""
+    version = user.data_version if data_version is None else data_version
+    params = sorted(request.query_params.multi_items(), key=lambda kv: kv[0])
+    return f"{request.url.path}?{urlencode(params)}|{make_etag(user.id, version)}"
+
+
+def render_json(content: Any) -> bytes:
+    """FastAPI の JSONResponse と同じ形式でシリアライズする"""
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode()
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def json_response(body: bytes, response: Optional[Response] = None) -> Response:
+    """シリアライズ済み JSON を返す（依存関係で付けた ETag 等のヘッダを引き継ぐ）"""
+    headers = (
+        {k: v for k, v in response.headers.items() if k in _FORWARDED_HEADERS}
+        if response is not None
+        else None
+    )
+    return Response(content=body, media_type="application/json", headers=headers)
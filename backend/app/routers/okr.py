@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
+from app.core.auth_cache import AuthUser
+from app.core.cache import response_cache
 from app.core.database import get_db
 from app.models.okr import Objective, KeyResult
-from app.models.user import User
-from app.routers.deps import get_current_user
+from app.routers.deps import (
+    get_auth_user,
+    get_versioned_user,
+    json_response,
+    render_json,
+    response_cache_key,
+)
 from app.schemas.okr import (
     ObjectiveCreate, ObjectiveUpdate, ObjectiveResponse,
     KeyResultCreate, KeyResultUpdate, KeyResultResponse,
 )
+from app.services.data_version import bump_data_version
 
 router = APIRouter(prefix="/api/okr", tags=["okr"])
 
@@ -17,20 +25,30 @@ router = APIRouter(prefix="/api/okr", tags=["okr"])
 
 @router.get("/objectives", response_model=list[ObjectiveResponse])
 def list_objectives(
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_versioned_user),
 ):
-    return db.query(Objective).filter(Objective.user_id == current_user.id).order_by(Objective.quarter.desc(), Objective.id).all()
+    cache_key = response_cache_key(request, current_user)
+    cached = response_cache.get(str(current_user.id), cache_key)
+    if cached is not None:
+        return json_response(cached)
+
+    objectives = db.query(Objective).filter(Objective.user_id == current_user.id).order_by(Objective.quarter.desc(), Objective.id).all()
+    body = render_json([ObjectiveResponse.model_validate(o) for o in objectives])
+    response_cache.set(str(current_user.id), cache_key, body)
+    return json_response(body)
 
 
 @router.post("/objectives", response_model=ObjectiveResponse, status_code=201)
 def create_objective(
     payload: ObjectiveCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_auth_user),
 ):
     obj = Objective(user_id=current_user.id, **payload.model_dump())
     db.add(obj)
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(obj)
     return obj
@@ -41,13 +59,14 @@ def update_objective(
     obj_id: int,
     payload: ObjectiveUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_auth_user),
 ):
     obj = db.query(Objective).filter(Objective.id == obj_id, Objective.user_id == current_user.id).first()
     if not obj:
         raise HTTPException(404, "目標が見つかりません")
     for k, v in payload.model_dump(exclude_none=True).items():
         setattr(obj, k, v)
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(obj)
     return obj
@@ -57,12 +76,13 @@ def update_objective(
 def delete_objective(
     obj_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_auth_user),
 ):
     obj = db.query(Objective).filter(Objective.id == obj_id, Objective.user_id == current_user.id).first()
     if not obj:
         raise HTTPException(404, "目標が見つかりません")
     db.delete(obj)
+    bump_data_version(db, current_user.id)
     db.commit()
 
 
@@ -73,13 +93,14 @@ def create_key_result(
     obj_id: int,
     payload: KeyResultCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_auth_user),
 ):
     obj = db.query(Objective).filter(Objective.id == obj_id, Objective.user_id == current_user.id).first()
     if not obj:
         raise HTTPException(404, "目標が見つかりません")
     kr = KeyResult(objective_id=obj_id, **payload.model_dump())
     db.add(kr)
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(kr)
     return kr
@@ -90,7 +111,7 @@ def update_key_result(
     kr_id: int,
     payload: KeyResultUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_auth_user),
 ):
     kr = db.query(KeyResult).join(Objective).filter(
         KeyResult.id == kr_id, Objective.user_id == current_user.id
@@ -99,6 +120,7 @@ def update_key_result(
         raise HTTPException(404, "キーリザルトが見つかりません")
     for k, v in payload.model_dump(exclude_none=True).items():
         setattr(kr, k, v)
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(kr)
     return kr
@@ -108,7 +130,7 @@ def update_key_result(
 def delete_key_result(
     kr_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_auth_user),
 ):
     kr = db.query(KeyResult).join(Objective).filter(
         KeyResult.id == kr_id, Objective.user_id == current_user.id
@@ -116,4 +138,5 @@ def delete_key_result(
     if not kr:
         raise HTTPException(404, "キーリザルトが見つかりません")
     db.delete(kr)
+    bump_data_version(db, current_user.id)
     db.commit()
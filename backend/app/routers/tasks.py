@@ -1,27 +1,62 @@
+import base64
 import calendar
+import json
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import Integer, and_, case, column, func, insert, or_, select, update, values
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.auth_cache import AuthUser
+from app.core.cache import response_cache
 from app.core.database import get_db
-from app.models.task import Task, TaskStatus
-from app.models.user import User
-from app.routers.deps import get_current_user
+from app.models.task import Task, TaskStatus, TaskTag
+from app.routers.deps import (
+    check_not_modified,
+    get_auth_user,
+    json_response,
+    render_json,
+    response_cache_key,
+)
 from app.schemas.task import (
+    BatchItemResult,
+    BatchResponse,
+    MoveRequest,
     ReorderRequest,
     ScoreBreakdown,
+    TagCount,
+    TaskBatchCreate,
+    TaskBatchDelete,
+    TaskBatchUpdate,
     TaskCreate,
     TaskListResponse,
     TaskResponse,
     TaskUpdate,
     TodayFocusResponse,
+    parse_tags,
+)
+from app.services.daily_stats import add_tasks, subtract_tasks
+from app.services.data_version import bump_data_version, make_etag
+from app.services.priority import (
+    calculate_priority_score,
+    calculate_priority_scores,
+    get_priority_level,
+    is_score_stale,
+    priority_score_expression,
 )
-from app.services.priority import calculate_priority_score, get_priority_level
+from app.services.search import build_search_ngrams, keyword_tsquery, ngram_match, ngram_rank
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# 手動並び順は間隔を空けて採番し、1件の移動は隙間への挿入（1行更新）で済ませる
+MANUAL_ORDER_GAP = 1024
+MANUAL_ORDER_LAST = 2**31 - 1  # 未設定（NULL）を末尾に並べるための値
+
 
 def _next_due(due_date: datetime, recurrence: str) -> datetime:
     """繰り返し種別に応じて次の期日を計算する"""
@@ -37,68 +72,421 @@ def _next_due(due_date: datetime, recurrence: str) -> datetime:
     return due_date
 
 
-def _build_task_response(task: Task, db: Session) -> TaskResponse:
-    has_blocker = False
-    if task.depends_on_id:
-        blocker = db.query(Task).filter(Task.id == task.depends_on_id).first()
-        has_blocker = blocker is not None and blocker.status != TaskStatus.completed
+def _load_blocker_statuses(tasks: list[Task], db: Session) -> dict[int, TaskStatus]:
+    """
+    依存先タスクのステータスを id → status の辞書としてまとめて取得する（リクエスト単位）。
+    読み込み済みのタスクはそのまま使い、残りは1クエリで取得する。
+    """
+    blocker_ids = {t.depends_on_id for t in tasks if t.depends_on_id}
+    if not blocker_ids:
+        return {}
+
+    statuses = {t.id: t.status for t in tasks if t.id in blocker_ids}
+    missing = blocker_ids - statuses.keys()
+    if missing:
+        statuses.update(
+            db.query(Task.id, Task.status).filter(Task.id.in_(missing)).all()
+        )
+    return statuses
+
+
+def _has_incomplete_blocker(task: Task, blocker_statuses: dict[int, TaskStatus]) -> bool:
+    if not task.depends_on_id:
+        return False
+    blocker_status = blocker_statuses.get(task.depends_on_id)
+    return blocker_status is not None and blocker_status != TaskStatus.completed
+
+
+def _build_task_response(
+    task: Task, db: Session, breakdown: Optional[dict] = None
+) -> TaskResponse:
+    if breakdown is None:
+        _, breakdown = calculate_priority_score(
+            due_date=task.due_date,
+            importance=task.importance,
+            estimated_minutes=task.estimated_minutes,
+            has_incomplete_blocker=_has_incomplete_blocker(
+                task, _load_blocker_statuses([task], db)
+            ),
+        )
+
+    data = {c.name: getattr(task, c.name) for c in task.__table__.columns}
+    data["priority_score"] = breakdown["total"]
+    data["tags"] = task.tags
+    return TaskResponse(**data, score_breakdown=ScoreBreakdown(**breakdown))
 
-    _, breakdown = calculate_priority_score(
+
+def _recalc_score(task: Task, db: Session) -> float:
+    score, _ = calculate_priority_score(
         due_date=task.due_date,
         importance=task.importance,
         estimated_minutes=task.estimated_minutes,
-        has_incomplete_blocker=has_blocker,
+        has_incomplete_blocker=_has_incomplete_blocker(
+            task, _load_blocker_statuses([task], db)
+        ),
     )
+    return score
+
 
-    return TaskResponse(
-        **{c.name: getattr(task, c.name) for c in task.__table__.columns},
-        score_breakdown=ScoreBreakdown(**breakdown),
+def _score_tasks(
+    tasks: list[Task], db: Session, now: datetime, persist_changes: bool = False
+) -> list[dict]:
+    """
+    複数タスクのスコアを同一基準時刻で一括算出して内訳を返す。
+    priority_score は、書き込み系（persist_changes=True）では値が変わったタスクをすべて書き換え、
+    読み取り系では緊急度の区分が変わったタスクだけ書き換える（is_score_stale 参照）。
+    """
+    if not tasks:
+        return []
+    blocker_statuses = _load_blocker_statuses(tasks, db)
+    scores, breakdown = calculate_priority_scores(
+        due_dates=[t.due_date for t in tasks],
+        importances=[t.importance for t in tasks],
+        estimated_minutes=[t.estimated_minutes for t in tasks],
+        has_incomplete_blockers=[_has_incomplete_blocker(t, blocker_statuses) for t in tasks],
+        now=now,
     )
+    columns = {k: v.tolist() for k, v in breakdown.items()}
+    for t, score, urgency in zip(tasks, scores.tolist(), columns["urgency"]):
+        if persist_changes:
+            stale = t.priority_score != score
+        else:
+            stale = is_score_stale(t.priority_score, score, urgency)
+        if stale:
+            t.priority_score = score
+    return [{k: v[i] for k, v in columns.items()} for i in range(len(tasks))]
+
+
+def _apply_tags(task: Task, tags: Optional[str]) -> None:
+    """カンマ区切りのタグ文字列で task_tags を置き換える（既存の行は再利用する）"""
+    current = {link.tag: link for link in task.tag_links}
+    task.tag_links = [
+        current.get(name) or TaskTag(tag=name, user_id=task.user_id)
+        for name in parse_tags(tags)
+    ]
+
+
+def _find_references(
+    db: Session, user_id: int, depends_on_ids: set[int], parent_ids: set[int]
+) -> tuple[dict[int, TaskStatus], set[int]]:
+    """
+    指定された依存先・親タスクのうち実在するものを、それぞれ1クエリで取得する。
+    依存先は id → status（スコア算出に使う）、親は id の集合で返す。
+    """
+    found_deps: dict[int, TaskStatus] = {}
+    found_parents: set[int] = set()
+    if depends_on_ids:
+        found_deps = dict(
+            db.query(Task.id, Task.status).filter(
+                Task.id.in_(depends_on_ids),
+                Task.user_id == user_id,
+            )
+        )
+    if parent_ids:
+        found_parents = {
+            task_id
+            for (task_id,) in db.query(Task.id).filter(
+                Task.id.in_(parent_ids),
+                Task.user_id == user_id,
+                Task.status != TaskStatus.deleted,
+            )
+        }
+    return found_deps, found_parents
+
+
+def _reference_error(
+    depends_on_id: Optional[int],
+    parent_task_id: Optional[int],
+    found_deps: dict[int, TaskStatus],
+    found_parents: set[int],
+) -> Optional[str]:
+    if depends_on_id and depends_on_id not in found_deps:
+        return "依存タスクが見つかりません"
+    if parent_task_id and parent_task_id not in found_parents:
+        return "親タスクが見つかりません"
+    return None
+
+
+def _apply_update(task: Task, update_data: dict) -> Optional[Task]:
+    """
+    更新内容を task に反映する。
+    繰り返しタスクを完了した場合は次回分のタスク（未追加）を返す。
+    """
+    if "tags" in update_data:
+        _apply_tags(task, update_data.pop("tags"))
 
+    # 完了処理
+    completing = (
+        update_data.get("status") == TaskStatus.completed
+        and task.status != TaskStatus.completed
+    )
+    if completing:
+        update_data["completed_at"] = datetime.now(timezone.utc)
 
-def _recalc_score(task: Task, db: Session) -> float:
-    has_blocker = False
-    if task.depends_on_id:
-        blocker = db.query(Task).filter(Task.id == task.depends_on_id).first()
-        has_blocker = blocker is not None and blocker.status != TaskStatus.completed
+    for field, value in update_data.items():
+        setattr(task, field, value)
 
-    score, _ = calculate_priority_score(
-        due_date=task.due_date,
+    # 繰り返しタスク：完了時に次のタスクを自動生成
+    if not (completing and task.recurrence):
+        return None
+    next_task = Task(
+        user_id=task.user_id,
+        title=task.title,
+        due_date=_next_due(task.due_date, task.recurrence),
         importance=task.importance,
         estimated_minutes=task.estimated_minutes,
-        has_incomplete_blocker=has_blocker,
+        category=task.category,
+        memo=task.memo,
+        recurrence=task.recurrence,
+        parent_task_id=task.parent_task_id,
     )
-    return score
+    _apply_tags(next_task, task.tags)
+    return next_task
+
+
+def _tag_filter(user_id: int, tags: list[str], mode: str):
+    """タグ条件（and: すべて含む / or: いずれかを含む）"""
+    matched = select(TaskTag.task_id).where(
+        TaskTag.user_id == user_id,
+        TaskTag.tag.in_(tags),
+    )
+    if mode == "and":
+        matched = matched.group_by(TaskTag.task_id).having(func.count() == len(tags))
+    return Task.id.in_(matched)
+
+
+def _bulk_set_manual_order(db: Session, user_id: int, orders: list[tuple[int, int]]) -> None:
+    """(id, manual_order) の組をまとめて1文で反映する"""
+    if not orders:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        # UPDATE ... FROM (VALUES ...)
+        new_order = values(
+            column("id", Integer), column("manual_order", Integer), name="new_order"
+        ).data(orders)
+        stmt = (
+            update(Task)
+            .where(Task.id == new_order.c.id, Task.user_id == user_id)
+            .values(manual_order=new_order.c.manual_order)
+        )
+    else:
+        # UPDATE ... FROM 未対応の DB 向け（CASE 式）
+        stmt = (
+            update(Task)
+            .where(Task.id.in_([task_id for task_id, _ in orders]), Task.user_id == user_id)
+            .values(manual_order=case(dict(orders), value=Task.id))
+        )
+    db.execute(stmt.execution_options(synchronize_session=False))
+
+
+def _adjacent_task(
+    db: Session,
+    user_id: int,
+    task_id: int,
+    neighbour_id: int,
+    neighbour_order: Optional[int],
+    following: bool,
+) -> Optional[tuple[int, Optional[int]]]:
+    """
+    現在の並び順で neighbour_id の直後（following=False なら直前）にあるタスクの (id, manual_order)。
+    移動するタスク自身は除く。neighbour_id が末尾（先頭）なら None
+    """
+    key = func.coalesce(Task.manual_order, MANUAL_ORDER_LAST)
+    neighbour_key = MANUAL_ORDER_LAST if neighbour_order is None else neighbour_order
+    if following:
+        position = or_(key > neighbour_key, and_(key == neighbour_key, Task.id > neighbour_id))
+        order_by = (key, Task.id)
+    else:
+        position = or_(key < neighbour_key, and_(key == neighbour_key, Task.id < neighbour_id))
+        order_by = (key.desc(), Task.id.desc())
+    row = (
+        db.query(Task.id, Task.manual_order)
+        .filter(
+            Task.user_id == user_id,
+            Task.status != TaskStatus.deleted,
+            Task.id != task_id,
+            position,
+        )
+        .order_by(*order_by)
+        .first()
+    )
+    return tuple(row) if row is not None else None
+
+
+def _order_between(
+    has_after: bool, after_order: Optional[int], has_before: bool, before_order: Optional[int]
+) -> Optional[int]:
+    """
+    前後のタスクの間に入る manual_order。has_after / has_before は前（後）にタスクがあるか
+    （ないなら先頭・末尾）。隙間がない・前後が未採番・前後ともないなら None
+    """
+    if (has_after and after_order is None) or (has_before and before_order is None):
+        return None
+    if not has_after and not has_before:
+        return None
+    if not has_after:
+        return before_order - MANUAL_ORDER_GAP
+    if not has_before:
+        new_order = after_order + MANUAL_ORDER_GAP
+        return new_order if new_order < MANUAL_ORDER_LAST else None
+    if before_order - after_order > 1:
+        return (after_order + before_order) // 2
+    return None
+
+
+def _rebalance_manual_order(
+    db: Session,
+    user_id: int,
+    task_id: int,
+    after_id: Optional[int],
+    before_id: Optional[int],
+) -> None:
+    """現在の並び順のまま task_id を指定位置に差し込み、全件を等間隔で振り直す"""
+    ordered_ids = [
+        i
+        for (i,) in db.query(Task.id)
+        .filter(
+            Task.user_id == user_id,
+            Task.status != TaskStatus.deleted,
+            Task.id != task_id,
+        )
+        .order_by(func.coalesce(Task.manual_order, MANUAL_ORDER_LAST), Task.id)
+    ]
+    if after_id is not None:
+        position = ordered_ids.index(after_id) + 1
+    elif before_id is not None:
+        position = ordered_ids.index(before_id)
+    else:
+        position = len(ordered_ids)
+    ordered_ids.insert(position, task_id)
+    _bulk_set_manual_order(
+        db,
+        user_id,
+        [(i, (n + 1) * MANUAL_ORDER_GAP) for n, i in enumerate(ordered_ids)],
+    )
+
+
+def _score_expression(now: datetime):
+    """Task の優先度スコアを DB 側で算出する SQL 式"""
+    blocker = aliased(Task)
+    has_incomplete_blocker = (
+        select(blocker.id)
+        .where(blocker.id == Task.depends_on_id, blocker.status != TaskStatus.completed)
+        .exists()
+    )
+    return priority_score_expression(
+        due_date=Task.due_date,
+        importance=Task.importance,
+        estimated_minutes=Task.estimated_minutes,
+        has_incomplete_blocker=has_incomplete_blocker,
+        now=now,
+    )
+
+
+def _relevance_expression(keyword: str):
+    """検索結果の関連度（タイトル一致を優先し、n-gram 一致度で並べる）"""
+    title_hit = case((Task.title.ilike(f"%{keyword}%"), 1.0), else_=0.0)
+    tsquery = keyword_tsquery(keyword)
+    if tsquery is None:
+        return title_hit
+    return title_hit + ngram_rank(Task.search_ngrams, tsquery)
+
+
+def _search_filter(keyword: str):
+    """タイトル・メモの部分一致。PostgreSQL では n-gram インデックスで先に候補を絞る"""
+    pattern = f"%{keyword}%"
+    condition = Task.title.ilike(pattern) | Task.memo.ilike(pattern)
+    tsquery = keyword_tsquery(keyword)
+    if tsquery is None:
+        return condition
+    return and_(ngram_match(Task.search_ngrams, tsquery), condition)
+
+
+def _sort_key(sort: str, now: datetime, keyword: Optional[str] = None) -> tuple:
+    """sort パラメータに対応する (並び替えキーの式, 降順か)"""
+    if sort == "relevance" and keyword:
+        return _relevance_expression(keyword), True
+    if sort in ("score", "relevance"):
+        return _score_expression(now), True
+    if sort == "due_date":
+        return Task.due_date, False
+    if sort == "importance":
+        return Task.importance, True
+    if sort == "created_at":
+        return Task.id, True
+    return func.coalesce(Task.manual_order, MANUAL_ORDER_LAST), False
+
+
+def _sort_order(sort: str, now: datetime, keyword: Optional[str] = None) -> list:
+    """sort パラメータに対応する ORDER BY 句（同順位は id で安定させる）"""
+    key, descending = _sort_key(sort, now, keyword)
+    if key is Task.id:
+        return [Task.id.desc()]
+    return [key.desc() if descending else key, Task.id]
+
+
+def _keyset_filter(
+    sort: str, now: datetime, key_value, last_id: int, keyword: Optional[str] = None
+):
+    """カーソル位置より後ろの行に絞り込む条件（_sort_order と同じ順序）"""
+    key, descending = _sort_key(sort, now, keyword)
+    if key is Task.id:
+        return Task.id < last_id
+    after = key < key_value if descending else key > key_value
+    return or_(after, and_(key == key_value, Task.id > last_id))
+
+
+def _encode_cursor(sort: str, now: datetime, key_value, last_id: int) -> str:
+    if isinstance(key_value, datetime):
+        key_value = key_value.isoformat()
+    raw = json.dumps(
+        {"s": sort, "t": int(now.timestamp()), "k": key_value, "id": last_id},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str) -> tuple[datetime, object, int]:
+    """カーソルを (基準時刻, キー値, 最終id) に戻す。スコア順はページ間で同じ基準時刻を使う"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data["s"] != sort:
+            raise ValueError("sort mismatch")
+        now = datetime.fromtimestamp(int(data["t"]), tz=timezone.utc)
+        key_value = data["k"]
+        if sort == "due_date":
+            key_value = datetime.fromisoformat(key_value)
+        return now, key_value, int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="カーソルが無効です")
 
 
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 def create_task(
     payload: TaskCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_auth_user),
 ):
-    if payload.depends_on_id:
-        dep = db.query(Task).filter(
-            Task.id == payload.depends_on_id,
-            Task.user_id == current_user.id,
-        ).first()
-        if not dep:
-            raise HTTPException(status_code=404, detail="依存タスクが見つかりません")
-
-    if payload.parent_task_id:
-        parent = db.query(Task).filter(
-            Task.id == payload.parent_task_id,
-            Task.user_id == current_user.id,
-            Task.status != TaskStatus.deleted,
-        ).first()
-        if not parent:
-            raise HTTPException(status_code=404, detail="親タスクが見つかりません")
+    found_deps, found_parents = _find_references(
+        db,
+        current_user.id,
+        {payload.depends_on_id} if payload.depends_on_id else set(),
+        {payload.parent_task_id} if payload.parent_task_id else set(),
+    )
+    error = _reference_error(
+        payload.depends_on_id, payload.parent_task_id, found_deps, found_parents
+    )
+    if error:
+        raise HTTPException(status_code=404, detail=error)
 
-    task = Task(user_id=current_user.id, **payload.model_dump())
+    task = Task(user_id=current_user.id, **payload.model_dump(exclude={"tags"}))
+    _apply_tags(task, payload.tags)
     db.add(task)
     db.flush()
 
     task.priority_score = _recalc_score(task, db)
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(task)
     return _build_task_response(task, db)
@@ -106,14 +494,35 @@ def create_task(
 
 @router.get("", response_model=TaskListResponse)
 def list_tasks(
+    request: Request,
+    response: Response,
     status_filter: Optional[TaskStatus] = Query(None, alias="status"),
     category: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    tag: Optional[str] = Query(None),
-    sort: str = Query("score", regex="^(score|due_date|importance|created_at|manual)$"),
+    tag: Optional[list[str]] = Query(None),
+    tag_mode: str = Query("and", regex="^(and|or)$"),
+    sort: str = Query(
+        "score", regex="^(score|due_date|importance|created_at|manual|relevance)$"
+    ),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    with_total: bool = Query(False),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(check_not_modified),
 ):
+    """
+    タスク一覧。limit または cursor を指定するとキーセット方式でページングする。
+    If-None-Match がデータバージョンの ETag と一致すれば 304 を返し、
+    同じ条件・バージョンの結果はレスポンスキャッシュから返す。
+    ページング時の total は with_total=true のときだけ別クエリで数える。
+    sort=relevance は search 指定時に関連度順で並べる（未指定ならスコア順）。
+    tag は複数指定・カンマ区切りが可能で、tag_mode=and/or で結合方法を選ぶ。
+    """
+    cache_key = response_cache_key(request, current_user)
+    cached = response_cache.get(str(current_user.id), cache_key)
+    if cached is not None:
+        return json_response(cached, response)
+
     q = db.query(Task).filter(
         Task.user_id == current_user.id,
         Task.status != TaskStatus.deleted,
@@ -123,101 +532,410 @@ def list_tasks(
         q = q.filter(Task.status == status_filter)
     if category:
         q = q.filter(Task.category == category)
-    if search:
-        keyword = f"%{search.strip()}%"
-        q = q.filter(Task.title.ilike(keyword) | Task.memo.ilike(keyword))
-    if tag:
-        q = q.filter(Task.tags.ilike(f"%{tag.strip()}%"))
-
-    tasks = q.all()
-
-    # スコア再計算（manual 以外）
-    if sort != "manual":
-        for t in tasks:
-            t.priority_score = _recalc_score(t, db)
+    keyword = search.strip() if search else None
+    if keyword:
+        q = q.filter(_search_filter(keyword))
+    tag_names = parse_tags(",".join(tag or []))
+    if tag_names:
+        q = q.filter(_tag_filter(current_user.id, tag_names, tag_mode))
+
+    if limit is None and cursor is None:
+        now = datetime.now(timezone.utc)
+        tasks = q.order_by(*_sort_order(sort, now, keyword)).all()
+        total = len(tasks)
+        next_cursor = None
+    else:
+        limit = limit or DEFAULT_PAGE_SIZE
+        if cursor:
+            now, key_value, last_id = _decode_cursor(cursor, sort)
+            page_q = q.filter(_keyset_filter(sort, now, key_value, last_id, keyword))
+        else:
+            now = datetime.now(timezone.utc).replace(microsecond=0)
+            page_q = q
+        key, _ = _sort_key(sort, now, keyword)
+        rows = (
+            page_q.add_columns(key.label("sort_key"))
+            .order_by(*_sort_order(sort, now, keyword))
+            .limit(limit + 1)
+            .all()
+        )
+        tasks = [row[0] for row in rows[:limit]]
+        next_cursor = (
+            _encode_cursor(sort, now, rows[limit - 1][1], rows[limit - 1][0].id)
+            if len(rows) > limit
+            else None
+        )
+        total = q.order_by(None).count() if with_total else None
+
+    # スコア再計算（変化したものだけ保存する）
+    breakdowns = _score_tasks(tasks, db, now)
+    breakdown_by_id = {t.id: b for t, b in zip(tasks, breakdowns)}
+
+    body = render_json(
+        TaskListResponse(
+            tasks=[_build_task_response(t, db, breakdown_by_id[t.id]) for t in tasks],
+            total=total,
+            next_cursor=next_cursor,
+        )
+    )
+    if db.dirty:
         db.commit()
+    response_cache.set(str(current_user.id), cache_key, body)
+    return json_response(body, response)
 
-    sort_key = {
-        "score": lambda t: -t.priority_score,
-        "due_date": lambda t: t.due_date,
-        "importance": lambda t: -t.importance,
-        "created_at": lambda t: -t.id,
-        "manual": lambda t: (t.manual_order if t.manual_order is not None else 9999),
-    }[sort]
-    tasks.sort(key=sort_key)
-
-    return TaskListResponse(
-        tasks=[_build_task_response(t, db) for t in tasks],
-        total=len(tasks),
+
+@router.get("/tags", response_model=list[TagCount])
+def list_tags(
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(get_auth_user),
+):
+    """タグごとのタスク件数（削除済みを除く）"""
+    rows = (
+        db.query(TaskTag.tag, func.count())
+        .join(Task, Task.id == TaskTag.task_id)
+        .filter(
+            TaskTag.user_id == current_user.id,
+            Task.status != TaskStatus.deleted,
+        )
+        .group_by(TaskTag.tag)
+        .order_by(func.count().desc(), TaskTag.tag)
+        .all()
     )
+    return [TagCount(tag=tag, count=count) for tag, count in rows]
 
 
 @router.post("/reorder", status_code=status.HTTP_200_OK)
 def reorder_tasks(
     payload: ReorderRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_auth_user),
+):
+    """手動並び順を保存する（UPDATE 1文で全件を書き換える）"""
+    task_ids = list(dict.fromkeys(payload.task_ids))
+    _bulk_set_manual_order(
+        db,
+        current_user.id,
+        [(task_id, (i + 1) * MANUAL_ORDER_GAP) for i, task_id in enumerate(task_ids)],
+    )
+    bump_data_version(db, current_user.id)
+    db.commit()
+    return {"message": "順序を保存しました"}
+
+
+@router.post("/{task_id}/move", status_code=status.HTTP_200_OK)
+def move_task(
+    task_id: int,
+    payload: MoveRequest,
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(get_auth_user),
 ):
-    """手動並び順を保存する"""
-    for order, task_id in enumerate(payload.task_ids):
-        db.query(Task).filter(
-            Task.id == task_id,
+    """
+    タスクを after_id と before_id の間に移動する。片方だけ指定したときは、指定したタスクの
+    直後（直前）に置く（反対側は現在の並び順で隣にあるタスク）。両方省略なら末尾に置く。
+    隙間があれば移動するタスク1行だけを更新し、隙間がなければ全体を振り直す。
+    """
+    neighbour_ids = {i for i in (payload.after_id, payload.before_id) if i is not None}
+    orders = dict(
+        db.query(Task.id, Task.manual_order).filter(
+            Task.id.in_(neighbour_ids | {task_id}),
             Task.user_id == current_user.id,
-        ).update({"manual_order": order})
+            Task.status != TaskStatus.deleted,
+        )
+    )
+    if task_id not in orders or not neighbour_ids <= orders.keys():
+        raise HTTPException(status_code=404, detail="タスクが見つかりません")
+
+    after = (payload.after_id, orders[payload.after_id]) if payload.after_id is not None else None
+    before = (
+        (payload.before_id, orders[payload.before_id]) if payload.before_id is not None else None
+    )
+    if after is not None and before is None:
+        before = _adjacent_task(db, current_user.id, task_id, *after, following=True)
+    elif before is not None and after is None:
+        after = _adjacent_task(db, current_user.id, task_id, *before, following=False)
+
+    new_order = _order_between(
+        after is not None,
+        after[1] if after is not None else None,
+        before is not None,
+        before[1] if before is not None else None,
+    )
+    if new_order is not None:
+        db.query(Task).filter(Task.id == task_id).update(
+            {"manual_order": new_order}, synchronize_session=False
+        )
+    else:
+        _rebalance_manual_order(db, current_user.id, task_id, payload.after_id, payload.before_id)
+    bump_data_version(db, current_user.id)
     db.commit()
     return {"message": "順序を保存しました"}
 
 
 @router.get("/today-focus", response_model=TodayFocusResponse)
 def get_today_focus(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(check_not_modified),
 ):
-    tasks = (
+    cache_key = response_cache_key(request, current_user)
+    cached = response_cache.get(str(current_user.id), cache_key)
+    if cached is not None:
+        return json_response(cached, response)
+
+    now = datetime.now(timezone.utc)
+    top3 = (
         db.query(Task)
         .filter(
             Task.user_id == current_user.id,
             Task.status.in_([TaskStatus.pending, TaskStatus.in_progress]),
         )
+        .order_by(*_sort_order("score", now))
+        .limit(3)
         .all()
     )
 
-    for t in tasks:
-        t.priority_score = _recalc_score(t, db)
-    db.commit()
-
-    tasks.sort(key=lambda t: -t.priority_score)
-    top3 = tasks[:3]
+    breakdowns = _score_tasks(top3, db, now)
+    breakdown_by_id = {t.id: b for t, b in zip(top3, breakdowns)}
 
-    db.query(Task).filter(Task.user_id == current_user.id).update({"today_focus": False})
-    for t in top3:
-        t.today_focus = True
-    db.commit()
-
-    return TodayFocusResponse(
-        tasks=[_build_task_response(t, db) for t in top3],
-        date=datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+    # 上位3件の顔ぶれが変わったときだけ today_focus を書き換える
+    top3_ids = {t.id for t in top3}
+    flagged_ids = {
+        task_id
+        for (task_id,) in db.query(Task.id).filter(
+            Task.user_id == current_user.id,
+            Task.today_focus == True,
+        )
+    }
+    if flagged_ids != top3_ids:
+        if flagged_ids - top3_ids:
+            db.query(Task).filter(Task.id.in_(flagged_ids - top3_ids)).update(
+                {"today_focus": False}, synchronize_session="fetch"
+            )
+        for t in top3:
+            if t.id not in flagged_ids:
+                t.today_focus = True
+        # 一覧の today_focus も変わるため、バージョンを上げて ETag を付け直す
+        version = bump_data_version(db, current_user.id)
+        response.headers["ETag"] = make_etag(current_user.id, version, now)
+        cache_key = response_cache_key(request, current_user, version)
+
+    body = render_json(
+        TodayFocusResponse(
+            tasks=[_build_task_response(t, db, breakdown_by_id[t.id]) for t in top3],
+            date=now.strftime("%Y-%m-%d"),
+        )
     )
+    if db.dirty or flagged_ids != top3_ids:
+        db.commit()
+    response_cache.set(str(current_user.id), cache_key, body)
+    return json_response(body, response)
 
 
 @router.post("/today-focus/approve")
 def approve_today_focus(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_auth_user),
 ):
     db.query(Task).filter(
         Task.user_id == current_user.id,
         Task.today_focus == True,
     ).update({"today_focus_approved": True})
+    bump_data_version(db, current_user.id)
     db.commit()
     return {"message": "Today Focus を承認しました"}
 
 
+# ── 一括操作（1トランザクション） ──────────────────────────────────────────
+
+def _batch_response(results: list[BatchItemResult]) -> BatchResponse:
+    succeeded = sum(1 for r in results if r.ok)
+    return BatchResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+
+
+@router.post("/batch", response_model=BatchResponse)
+def batch_create_tasks(
+    payload: TaskBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(get_auth_user),
+):
+    """
+    複数タスクを一括作成する。参照エラーの項目だけ失敗とし、残りを1回のコミットで保存する。
+    INSERT は tasks / task_tags それぞれ1文（insertmanyvalues）にまとめる。
+    """
+    found_deps, found_parents = _find_references(
+        db,
+        current_user.id,
+        {p.depends_on_id for p in payload.tasks if p.depends_on_id},
+        {p.parent_task_id for p in payload.tasks if p.parent_task_id},
+    )
+
+    results: list[BatchItemResult] = []
+    accepted: list[tuple[int, TaskCreate]] = []
+    for index, item in enumerate(payload.tasks):
+        error = _reference_error(item.depends_on_id, item.parent_task_id, found_deps, found_parents)
+        if error:
+            results.append(BatchItemResult(index=index, ok=False, error=error))
+        else:
+            accepted.append((index, item))
+
+    if accepted:
+        items = [item for _, item in accepted]
+        scores, breakdown = calculate_priority_scores(
+            due_dates=[item.due_date for item in items],
+            importances=[item.importance for item in items],
+            estimated_minutes=[item.estimated_minutes for item in items],
+            has_incomplete_blockers=[
+                item.depends_on_id is not None
+                and found_deps.get(item.depends_on_id, TaskStatus.completed) != TaskStatus.completed
+                for item in items
+            ],
+            now=datetime.now(timezone.utc),
+        )
+        rows = [
+            {
+                **item.model_dump(exclude={"tags"}),
+                "user_id": current_user.id,
+                "priority_score": score,
+                "search_ngrams": build_search_ngrams(item.title, item.memo),
+            }
+            for item, score in zip(items, scores.tolist())
+        ]
+        tasks = db.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True), rows
+        ).all()
+        add_tasks(db, [task.id for task in tasks])
+        tag_rows = [
+            {"task_id": task.id, "user_id": current_user.id, "tag": name}
+            for task, item in zip(tasks, items)
+            for name in parse_tags(item.tags)
+        ]
+        links_by_task: dict[int, list[TaskTag]] = {task.id: [] for task in tasks}
+        if tag_rows:
+            for link in db.scalars(insert(TaskTag).returning(TaskTag), tag_rows):
+                links_by_task[link.task_id].append(link)
+        for task in tasks:
+            links = sorted(links_by_task[task.id], key=lambda link: link.tag)
+            set_committed_value(task, "tag_links", links)
+
+        columns = {k: v.tolist() for k, v in breakdown.items()}
+        for i, ((index, _), task) in enumerate(zip(accepted, tasks)):
+            task_breakdown = {k: v[i] for k, v in columns.items()}
+            results.append(
+                BatchItemResult(
+                    index=index,
+                    id=task.id,
+                    ok=True,
+                    task=_build_task_response(task, db, task_breakdown),
+                )
+            )
+        bump_data_version(db, current_user.id)
+        db.commit()
+
+    results.sort(key=lambda r: r.index)
+    return _batch_response(results)
+
+
+@router.patch("/batch", response_model=BatchResponse)
+def batch_update_tasks(
+    payload: TaskBatchUpdate,
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(get_auth_user),
+):
+    """複数タスクを一括更新する。対象・参照が見つからない項目だけ失敗とする"""
+    ids = {item.id for item in payload.tasks}
+    tasks_by_id = {
+        t.id: t
+        for t in db.query(Task).filter(
+            Task.id.in_(ids),
+            Task.user_id == current_user.id,
+            Task.status != TaskStatus.deleted,
+        )
+    }
+    found_deps, found_parents = _find_references(
+        db,
+        current_user.id,
+        {item.depends_on_id for item in payload.tasks if item.depends_on_id},
+        {item.parent_task_id for item in payload.tasks if item.parent_task_id},
+    )
+
+    results: list[BatchItemResult] = []
+    updated: list[tuple[int, Task]] = []
+    spawned: list[Task] = []
+    for index, item in enumerate(payload.tasks):
+        task = tasks_by_id.get(item.id)
+        error = (
+            "タスクが見つかりません"
+            if task is None
+            else _reference_error(item.depends_on_id, item.parent_task_id, found_deps, found_parents)
+        )
+        if error:
+            results.append(BatchItemResult(index=index, id=item.id, ok=False, error=error))
+            continue
+        next_task = _apply_update(task, item.model_dump(exclude_none=True, exclude={"id"}))
+        if next_task is not None:
+            spawned.append(next_task)
+        updated.append((index, task))
+
+    db.add_all(spawned)
+    tasks = [task for _, task in updated]
+    breakdowns = _score_tasks(
+        tasks + spawned, db, datetime.now(timezone.utc), persist_changes=True
+    )
+    db.flush()
+
+    for (index, task), breakdown in zip(updated, breakdowns):
+        results.append(
+            BatchItemResult(
+                index=index, id=task.id, ok=True, task=_build_task_response(task, db, breakdown)
+            )
+        )
+    if updated:
+        bump_data_version(db, current_user.id)
+    db.commit()
+
+    results.sort(key=lambda r: r.index)
+    return _batch_response(results)
+
+
+@router.delete("/batch", response_model=BatchResponse)
+def batch_delete_tasks(
+    payload: TaskBatchDelete,
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(get_auth_user),
+):
+    """複数タスクを一括で論理削除する（UPDATE 1文）"""
+    found = {
+        task_id
+        for (task_id,) in db.query(Task.id).filter(
+            Task.id.in_(set(payload.ids)),
+            Task.user_id == current_user.id,
+            Task.status != TaskStatus.deleted,
+        )
+    }
+    if found:
+        subtract_tasks(db, found)
+        db.query(Task).filter(Task.id.in_(found)).update(
+            {"status": TaskStatus.deleted, "deleted_at": datetime.now(timezone.utc)},
+            synchronize_session=False,
+        )
+        bump_data_version(db, current_user.id)
+        db.commit()
+
+    results = [
+        BatchItemResult(index=index, id=task_id, ok=True)
+        if task_id in found
+        else BatchItemResult(index=index, id=task_id, ok=False, error="タスクが見つかりません")
+        for index, task_id in enumerate(payload.ids)
+    ]
+    return _batch_response(results)
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 def get_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_auth_user),
 ):
     task = db.query(Task).filter(
         Task.id == task_id,
@@ -234,7 +952,7 @@ def update_task(
     task_id: int,
     payload: TaskUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_auth_user),
 ):
     task = db.query(Task).filter(
         Task.id == task_id,
@@ -244,40 +962,18 @@ def update_task(
     if not task:
         raise HTTPException(status_code=404, detail="タスクが見つかりません")
 
-    update_data = payload.model_dump(exclude_none=True)
-
-    # 完了処理
-    completing = (
-        update_data.get("status") == TaskStatus.completed
-        and task.status != TaskStatus.completed
-    )
-    if completing:
-        update_data["completed_at"] = datetime.now(timezone.utc)
-
-    for field, value in update_data.items():
-        setattr(task, field, value)
+    next_task = _apply_update(task, payload.model_dump(exclude_none=True))
 
     task.priority_score = _recalc_score(task, db)
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(task)
 
-    # 繰り返しタスク：完了時に次のタスクを自動生成
-    if completing and task.recurrence:
-        next_due = _next_due(task.due_date, task.recurrence)
-        new_task = Task(
-            user_id=current_user.id,
-            title=task.title,
-            due_date=next_due,
-            importance=task.importance,
-            estimated_minutes=task.estimated_minutes,
-            category=task.category,
-            memo=task.memo,
-            recurrence=task.recurrence,
-            parent_task_id=task.parent_task_id,
-        )
-        db.add(new_task)
+    if next_task is not None:
+        db.add(next_task)
         db.flush()
-        new_task.priority_score = _recalc_score(new_task, db)
+        next_task.priority_score = _recalc_score(next_task, db)
+        bump_data_version(db, current_user.id)
         db.commit()
 
     return _build_task_response(task, db)
@@ -287,7 +983,7 @@ def update_task(
 def delete_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_auth_user),
 ):
     task = db.query(Task).filter(
         Task.id == task_id,
@@ -299,4 +995,5 @@ def delete_task(
 
     task.status = TaskStatus.deleted
     task.deleted_at = datetime.now(timezone.utc)
+    bump_data_version(db, current_user.id)
     db.commit()
@@ -1,18 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.auth_cache import AuthUser, forget_user
 from app.core.database import get_db
 from app.core.security import verify_password, get_password_hash
 from app.models.task import Task, TaskStatus
 from app.models.user import User
-from app.routers.deps import get_current_user
+from app.routers.deps import get_auth_user, get_current_user
 from app.schemas.user import UserResponse, ChangePasswordRequest, AiKeyUpsert, AiKeyStatus
+from app.services.daily_stats import rebuild_daily_stats
+from app.services.data_version import bump_data_version
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: AuthUser = Depends(get_auth_user)):
     return current_user
 
 
@@ -27,8 +30,10 @@ def change_password(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="現在のパスワードが正しくありません",
         )
+    user_id = current_user.id
     current_user.hashed_password = get_password_hash(payload.new_password)
     db.commit()
+    forget_user(user_id)
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
@@ -39,12 +44,16 @@ def delete_account(
     db.query(Task).filter(Task.user_id == current_user.id).update(
         {"status": TaskStatus.deleted}
     )
+    user_id = current_user.id
+    rebuild_daily_stats(db, user_id)
     current_user.is_active = False
+    bump_data_version(db, user_id)
     db.commit()
+    forget_user(user_id)
 
 
 @router.get("/me/ai-key/status", response_model=AiKeyStatus)
-def get_ai_key_status(current_user: User = Depends(get_current_user)):
+def get_ai_key_status(current_user: AuthUser = Depends(get_auth_user)):
     return AiKeyStatus(
         has_key=bool(current_user.ai_api_key),
         provider=current_user.ai_provider,
@@ -57,9 +66,11 @@ def set_ai_key(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    user_id = current_user.id
     current_user.ai_provider = payload.provider
     current_user.ai_api_key = payload.api_key
     db.commit()
+    forget_user(user_id)
 
 
 @router.delete("/me/ai-key", status_code=status.HTTP_204_NO_CONTENT)
@@ -67,6 +78,8 @@ def delete_ai_key(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    user_id = current_user.id
     current_user.ai_provider = None
     current_user.ai_api_key = None
     db.commit()
+    forget_user(user_id)
@@ -1,10 +1,26 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 
 from app.models.task import TaskStatus
 
+MAX_TAG_LENGTH = 50
+MAX_BATCH_SIZE = 1000
+
+
+def parse_tags(tags: Optional[str]) -> list[str]:
+    """カンマ区切りのタグ文字列を重複なしのリストにする"""
+    if not tags:
+        return []
+    return list(dict.fromkeys(t.strip() for t in tags.split(",") if t.strip()))
+
+
+def _validate_tags(v: Optional[str]) -> Optional[str]:
+    if any(len(t) > MAX_TAG_LENGTH for t in parse_tags(v)):
+        raise ValueError(f"タグは{MAX_TAG_LENGTH}文字以内で入力してください")
+    return v
+
 
 class TaskCreate(BaseModel):
     title: str
@@ -50,6 +66,11 @@ class TaskCreate(BaseModel):
             raise ValueError("繰り返しは daily/weekly/monthly のいずれかを指定してください")
         return v
 
+    @field_validator("tags")
+    @classmethod
+    def validate_tags(cls, v: Optional[str]) -> Optional[str]:
+        return _validate_tags(v)
+
 
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
@@ -66,6 +87,11 @@ class TaskUpdate(BaseModel):
     status: Optional[TaskStatus] = None
     tags: Optional[str] = None
 
+    @field_validator("tags")
+    @classmethod
+    def validate_tags(cls, v: Optional[str]) -> Optional[str]:
+        return _validate_tags(v)
+
 
 class ScoreBreakdown(BaseModel):
     urgency: float
@@ -104,7 +130,8 @@ class TaskResponse(BaseModel):
 
 class TaskListResponse(BaseModel):
     tasks: list[TaskResponse]
-    total: int
+    total: Optional[int] = None  # ページング時は with_total=true の場合のみ
+    next_cursor: Optional[str] = None  # 次ページがない場合は None
 
 
 class TodayFocusResponse(BaseModel):
@@ -112,5 +139,46 @@ class TodayFocusResponse(BaseModel):
     date: str
 
 
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+
 class ReorderRequest(BaseModel):
     task_ids: list[int]
+
+
+class MoveRequest(BaseModel):
+    # 片方だけ指定したときは、指定したタスクのすぐ隣に置く。両方省略で末尾
+    after_id: Optional[int] = None    # 直前に来るタスク
+    before_id: Optional[int] = None   # 直後に来るタスク
+
+
+class TaskBatchCreate(BaseModel):
+    tasks: list[TaskCreate] = Field(..., max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchUpdateItem(TaskUpdate):
+    id: int
+
+
+class TaskBatchUpdate(BaseModel):
+    tasks: list[TaskBatchUpdateItem] = Field(..., max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchDelete(BaseModel):
+    ids: list[int] = Field(..., max_length=MAX_BATCH_SIZE)
+
+
+class BatchItemResult(BaseModel):
+    index: int                          # リクエスト配列内の位置
+    id: Optional[int] = None
+    ok: bool
+    error: Optional[str] = None
+    task: Optional[TaskResponse] = None
+
+
+class BatchResponse(BaseModel):
+    results: list[BatchItemResult]
+    succeeded: int
+    failed: int
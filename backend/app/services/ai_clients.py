@@ -0,0 +1,240 @@
+"""
+AI プロバイダのクライアント管理
+
+プロバイダ SDK のクライアントはそれぞれ HTTP 接続プールを持つため、リクエストごとに
+作り直すと毎回 TLS ハンドシェイクからやり直しになる。(プロバイダ, APIキーのハッシュ) ごとに
+クライアントを保持して keep-alive 接続を再利用し、件数上限（LRU）とアイドル時間で閉じる。
+使用中のクライアントは追い出されても、使い終わるまで閉じない。
+クライアントは非同期版（AsyncOpenAI 等）で、イベントループ上で使う（app.services.ai_gateway 経由）。
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+import httpx
+
+from app.core.config import settings
+
+GEMINI_API_VERSION = "v1beta"
+
+
+class GeminiClient:
+    """
+    Gemini REST API の最小クライアント。
+    google-generativeai は APIキーをプロセス全体の設定（genai.configure）に持つため、
+    ユーザーごとにキーが異なる場合は並行リクエストでキーが混ざりうる。キーごとに接続を持たせる。
+    """
+
+    def __init__(self, api_key: str, base_url: str, timeout: float):
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"x-goog-api-key": api_key},
+            timeout=timeout,
+        )
+
+    @staticmethod
+    def _body(system_prompt: str, user_prompt: str, max_output_tokens: Optional[int] = None) -> dict:
+        body: dict = {
+            "systemInstruction": {"parts": [{"text": system_prompt}]},
+            "contents": [{"role": "user", "parts": [{"text": user_prompt}]}],
+        }
+        if max_output_tokens is not None:
+            body["generationConfig"] = {"maxOutputTokens": max_output_tokens}
+        return body
+
+    @staticmethod
+    def _text(payload: dict) -> str:
+        candidates = payload.get("candidates") or [{}]
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    async def generate_content(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        max_output_tokens: Optional[int] = None,
+    ) -> str:
+        resp = await self._http.post(
+            f"/{GEMINI_API_VERSION}/models/{model}:generateContent",
+            json=self._body(system_prompt, user_prompt, max_output_tokens),
+        )
+        resp.raise_for_status()
+        return self._text(resp.json())
+
+    async def stream_generate_content(
+        self, model: str, system_prompt: str, user_prompt: str
+    ) -> tuple[AsyncIterator[str], Callable[[], Awaitable[None]]]:
+        """
+        streamGenerateContent（alt=sse）を開き、(テキスト断片のイテレータ, 接続を閉じる関数) を返す。
+        ステータスの確認まで済ませてから返すので、認証エラー等はここで送出される。
+        """
+        request = self._http.build_request(
+            "POST",
+            f"/{GEMINI_API_VERSION}/models/{model}:streamGenerateContent",
+            params={"alt": "sse"},
+            json=self._body(system_prompt, user_prompt),
+        )
+        resp = await self._http.send(request, stream=True)
+        if resp.is_error:
+            await resp.aread()
+            await resp.aclose()
+            resp.raise_for_status()
+
+        async def chunks() -> AsyncIterator[str]:
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                text = self._text(json.loads(line[len("data:"):]))
+                if text:
+                    yield text
+
+        return chunks(), resp.aclose
+
+    async def close(self) -> None:
+        await self._http.aclose()
+
+
+def _create_client(provider: str, api_key: str) -> Any:
+    timeout = settings.AI_TIMEOUT_SECONDS
+    if provider == "openai":
+        import openai
+
+        return openai.AsyncOpenAI(
+            api_key=api_key, base_url=settings.AI_OPENAI_BASE_URL or None, timeout=timeout
+        )
+    if provider == "anthropic":
+        import anthropic
+
+        return anthropic.AsyncAnthropic(
+            api_key=api_key, base_url=settings.AI_ANTHROPIC_BASE_URL or None, timeout=timeout
+        )
+    if provider == "gemini":
+        return GeminiClient(api_key, settings.AI_GEMINI_BASE_URL, timeout)
+    raise ValueError(f"未対応のプロバイダ: {provider}")
+
+
+@dataclass
+class _Entry:
+    client: Any
+    last_used: float
+    in_use: int = 0
+    evicted: bool = False
+
+
+class ProviderClientRegistry:
+    def __init__(self, max_clients: int, idle_seconds: float):
+        self.max_clients = max_clients
+        self.idle_seconds = idle_seconds
+        self._entries: OrderedDict[tuple[str, str, int], _Entry] = OrderedDict()
+        self._last_sweep = time.monotonic()
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(provider: str, api_key: str) -> tuple[str, str, int]:
+        # APIキーそのものはキーに使わない（メモリダンプ・ログに残さない）。
+        # 非同期クライアントの接続はイベントループに紐づくため、ループごとに分ける
+        # （本番は1ワーカー1ループ。TestClient などはリクエストごとにループが変わる）
+        loop_id = id(asyncio.get_running_loop())
+        return provider, hashlib.sha256(api_key.encode()).hexdigest(), loop_id
+
+    @asynccontextmanager
+    async def lease(self, provider: str, api_key: str) -> AsyncIterator[Any]:
+        """クライアントを借りる。with を抜けるまで閉じられない"""
+        key = self._key(provider, api_key)
+        to_close: list[Any] = []
+        with self._lock:
+            to_close += self._evict_idle(time.monotonic())
+            entry = self._checkout(key)
+        if entry is None:
+            # SDK の読み込みや SSL コンテキストの作成はクライアント1つで数十 ms かかるので、
+            # イベントループを止めないようスレッドで作る
+            client = await asyncio.to_thread(_create_client, provider, api_key)
+            with self._lock:
+                # 作っている間に同じキーのクライアントができていれば、そちらを使う
+                entry = self._checkout(key)
+                if entry is None:
+                    self.misses += 1
+                    entry = _Entry(client=client, last_used=time.monotonic(), in_use=1)
+                    self._entries[key] = entry
+                    while len(self._entries) > self.max_clients:
+                        to_close += self._evict(next(iter(self._entries)))
+                else:
+                    to_close.append(client)
+        await self._close(to_close)
+        try:
+            yield entry.client
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+                release = entry.evicted and entry.in_use == 0
+            if release:
+                await self._close([entry.client])
+
+    def _checkout(self, key: tuple[str, str, int]) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            entry.in_use += 1
+        return entry
+
+    def _evict_idle(self, now: float) -> list[Any]:
+        # 走査は1秒に1回まで（件数上限があるので全件見ても軽い）
+        if now - self._last_sweep < 1:
+            return []
+        self._last_sweep = now
+        to_close: list[Any] = []
+        for key, entry in list(self._entries.items()):
+            if not entry.in_use and now - entry.last_used >= self.idle_seconds:
+                to_close += self._evict(key)
+        return to_close
+
+    def _evict(self, key: tuple[str, str, int]) -> list[Any]:
+        entry = self._entries.pop(key)
+        entry.evicted = True
+        self.evictions += 1
+        return [entry.client] if entry.in_use == 0 else []
+
+    @staticmethod
+    async def _close(clients: list[Any]) -> None:
+        for client in clients:
+            try:
+                await client.close()
+            except Exception as e:
+                print(f"AIクライアントのクローズに失敗: {e}")
+
+    async def close_all(self) -> None:
+        with self._lock:
+            to_close = []
+            for key in list(self._entries):
+                to_close += self._evict(key)
+        await self._close(to_close)
+
+    def status(self) -> dict:
+        with self._lock:
+            by_provider: dict[str, int] = {}
+            for provider, _, _ in self._entries:
+                by_provider[provider] = by_provider.get(provider, 0) + 1
+            return {
+                "clients": len(self._entries),
+                "by_provider": by_provider,
+                "in_use": sum(1 for e in self._entries.values() if e.in_use),
+                "max_clients": self.max_clients,
+                "idle_seconds": self.idle_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+ai_clients = ProviderClientRegistry(settings.AI_CLIENT_MAX, settings.AI_CLIENT_IDLE_SECONDS)
@@ -0,0 +1,341 @@
+"""
+AI 呼び出しゲートウェイ
+
+AI の応答には数秒かかるため、同期ハンドラでは応答待ちの間スレッドプールのスレッドを
+占有し、数件の同時呼び出しでタスク・ダッシュボード API まで待たされていた。
+ここでは非同期クライアントでイベントループ上から呼び出し、次の制限をかける。
+
+- ユーザーごとの同時呼び出し数: 超えたら待たせずに 429
+- 全体の同時呼び出し数: 空きを待つが、待ち行列が上限なら 503
+- 期限（待ち時間を含む）: 超えたら打ち切って 504
+
+open_stream はストリーミング版で、応答テキストを届いた断片ごとに返す（SSE 中継用）。
+プロバイダごとの所要時間・エラー数は /api/admin/ai-gateway で確認できる。
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.core.metrics import LatencyHistogram
+from app.services.ai_clients import ai_clients
+
+PROVIDERS = ("openai", "anthropic", "gemini")
+AI_LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+OPENAI_MODEL = "gpt-4o-mini"
+ANTHROPIC_MODEL = "claude-haiku-4-5-20251001"
+GEMINI_MODEL = "gemini-1.5-flash"
+MAX_TOKENS = 1024
+
+# (テキスト断片のイテレータ, 接続を閉じる関数)
+TextStream = tuple[AsyncIterator[str], Callable[[], Awaitable[None]]]
+
+
+class AIGatewayError(Exception):
+    """呼び出しを受け付けられない・期限内に終わらなかった（status_code をそのまま返す）"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class _ProviderMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = LatencyHistogram(AI_LATENCY_BUCKETS_MS)
+        # ストリーミング呼び出しの最初の断片までの時間
+        self.first_chunk = LatencyHistogram(AI_LATENCY_BUCKETS_MS)
+        self.errors = 0
+        self.timeouts = 0
+
+    def failed(self, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.errors += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "latency": self.latency.snapshot(),
+                "first_chunk": self.first_chunk.snapshot(),
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+            }
+
+
+async def _complete_openai(client, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+    resp = await client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=0.3,
+        max_tokens=max_tokens,
+    )
+    return resp.choices[0].message.content or ""
+
+
+async def _complete_anthropic(client, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+    resp = await client.messages.create(
+        model=ANTHROPIC_MODEL,
+        max_tokens=max_tokens,
+        system=system_prompt,
+        messages=[{"role": "user", "content": user_prompt}],
+    )
+    return resp.content[0].text if resp.content else ""
+
+
+async def _complete_gemini(client, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+    return await client.generate_content(GEMINI_MODEL, system_prompt, user_prompt, max_tokens)
+
+
+_COMPLETIONS = {
+    "openai": _complete_openai,
+    "anthropic": _complete_anthropic,
+    "gemini": _complete_gemini,
+}
+
+
+# ── ストリーミング: 各 SDK のストリームを (テキスト断片のイテレータ, 閉じる関数) にそろえる ──
+
+async def _stream_openai(client, system_prompt: str, user_prompt: str) -> TextStream:
+    stream = await client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=0.3,
+        max_tokens=MAX_TOKENS,
+        stream=True,
+    )
+
+    async def chunks() -> AsyncIterator[str]:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    return chunks(), stream.close
+
+
+async def _stream_anthropic(client, system_prompt: str, user_prompt: str) -> TextStream:
+    stream = await client.messages.create(
+        model=ANTHROPIC_MODEL,
+        max_tokens=MAX_TOKENS,
+        system=system_prompt,
+        messages=[{"role": "user", "content": user_prompt}],
+        stream=True,
+    )
+
+    async def chunks() -> AsyncIterator[str]:
+        async for event in stream:
+            if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                yield event.delta.text
+
+    return chunks(), stream.close
+
+
+async def _stream_gemini(client, system_prompt: str, user_prompt: str) -> TextStream:
+    return await client.stream_generate_content(GEMINI_MODEL, system_prompt, user_prompt)
+
+
+_STREAMS = {
+    "openai": _stream_openai,
+    "anthropic": _stream_anthropic,
+    "gemini": _stream_gemini,
+}
+
+
+class AIStream:
+    """
+    open_stream の戻り値。async for で応答テキストの断片を受け取る。
+    読み終わるか aclose するまで同時実行枠とクライアントを保持する。
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[str],
+        resources: AsyncExitStack,
+        metrics: _ProviderMetrics,
+        deadline: float,
+        start: float,
+    ):
+        self._chunks = chunks
+        self._resources = resources
+        self._metrics = metrics
+        self._deadline = deadline
+        self._start = start
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        first = True
+        try:
+            while True:
+                # 期限は断片を待っている間だけ数える（呼び出し側の送信中に打ち切らない）
+                try:
+                    async with asyncio.timeout_at(self._deadline):
+                        chunk = await anext(self._chunks)
+                except StopAsyncIteration:
+                    break
+                if first:
+                    first = False
+                    self._metrics.first_chunk.observe(time.perf_counter() - self._start)
+                yield chunk
+        except TimeoutError:
+            self._metrics.failed(timed_out=True)
+            raise AIGatewayError(504, "AI の応答が期限内に返りませんでした")
+        except Exception:
+            self._metrics.failed(timed_out=False)
+            raise
+        else:
+            self._metrics.latency.observe(time.perf_counter() - self._start)
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._resources.aclose()
+
+
+class AIGateway:
+    def __init__(self, max_concurrency: int, max_queue: int, per_user: int, deadline: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.per_user = per_user
+        self.deadline = deadline
+        # イベントループ上でだけ更新するのでロックは不要
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._in_flight_by_user: dict[int, int] = {}
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected_user = 0
+        self.rejected_queue = 0
+        self.metrics = {provider: _ProviderMetrics() for provider in PROVIDERS}
+
+    def _admit_user(self, user_id: int) -> None:
+        count = self._in_flight_by_user.get(user_id, 0)
+        if count >= self.per_user:
+            self.rejected_user += 1
+            raise AIGatewayError(
+                429, "AI の処理中のリクエストが多すぎます。完了してから再試行してください", 1
+            )
+        self._in_flight_by_user[user_id] = count + 1
+
+    def _release_user(self, user_id: int) -> None:
+        count = self._in_flight_by_user.pop(user_id, 1) - 1
+        if count > 0:
+            self._in_flight_by_user[user_id] = count
+
+    async def _acquire_slot(self) -> None:
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.rejected_queue += 1
+            raise AIGatewayError(503, "AI の処理が混み合っています。しばらくしてから再試行してください", 5)
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+
+    async def _enter(
+        self, resources: AsyncExitStack, provider: str, api_key: str, user_id: int
+    ) -> Any:
+        """ユーザー枠・全体枠・クライアントを確保し、解放を resources に積む"""
+        self._admit_user(user_id)
+        resources.callback(self._release_user, user_id)
+        await self._acquire_slot()
+        self.in_flight += 1
+        resources.callback(self._release_slot)
+        return await resources.enter_async_context(ai_clients.lease(provider, api_key))
+
+    def _metrics_for(self, provider: str) -> _ProviderMetrics:
+        if provider not in self.metrics:
+            raise ValueError(f"未対応のプロバイダ: {provider}")
+        return self.metrics[provider]
+
+    async def complete(
+        self,
+        provider: str,
+        api_key: str,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        user_id: int,
+        max_tokens: int = MAX_TOKENS,
+    ) -> str:
+        """プロンプトを送って応答テキストを返す。プロバイダのエラーはそのまま送出する"""
+        metrics = self._metrics_for(provider)
+        start = time.perf_counter()
+        try:
+            async with AsyncExitStack() as resources, asyncio.timeout(self.deadline):
+                client = await self._enter(resources, provider, api_key, user_id)
+                text = await _COMPLETIONS[provider](client, system_prompt, user_prompt, max_tokens)
+        except TimeoutError:
+            metrics.failed(timed_out=True)
+            raise AIGatewayError(504, "AI の応答が期限内に返りませんでした")
+        except AIGatewayError:
+            raise
+        except Exception:
+            metrics.failed(timed_out=False)
+            raise
+        metrics.latency.observe(time.perf_counter() - start)
+        return text
+
+    async def open_stream(
+        self, provider: str, api_key: str, system_prompt: str, user_prompt: str, *, user_id: int
+    ) -> AIStream:
+        """
+        ストリーミングで呼び出す。枠の確保とプロバイダへの接続（応答ヘッダまで）を済ませて返すので、
+        429 / 503 / 504 や認証エラーはレスポンスを返し始める前にここで送出される。
+        期限は complete と同じく、待ち時間を含めた呼び出し全体にかかる。
+        """
+        metrics = self._metrics_for(provider)
+        start = time.perf_counter()
+        deadline = asyncio.get_running_loop().time() + self.deadline
+        resources = AsyncExitStack()
+        try:
+            async with asyncio.timeout_at(deadline):
+                client = await self._enter(resources, provider, api_key, user_id)
+                chunks, close = await _STREAMS[provider](client, system_prompt, user_prompt)
+        except BaseException as e:
+            await resources.aclose()
+            if isinstance(e, TimeoutError):
+                metrics.failed(timed_out=True)
+                raise AIGatewayError(504, "AI の応答が期限内に返りませんでした")
+            if isinstance(e, Exception) and not isinstance(e, AIGatewayError):
+                metrics.failed(timed_out=False)
+            raise
+        resources.push_async_callback(close)
+        resources.push_async_callback(chunks.aclose)
+        return AIStream(chunks, resources, metrics, deadline, start)
+
+    def status(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_concurrency_per_user": self.per_user,
+            "deadline_seconds": self.deadline,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected_user_limit": self.rejected_user,
+            "rejected_queue_full": self.rejected_queue,
+            "providers": {provider: m.snapshot() for provider, m in self.metrics.items()},
+        }
+
+
+ai_gateway = AIGateway(
+    settings.AI_MAX_CONCURRENCY,
+    settings.AI_MAX_QUEUE,
+    settings.AI_MAX_CONCURRENCY_PER_USER,
+    settings.AI_DEADLINE_SECONDS,
+)
@@ -0,0 +1,83 @@
+"""
+AI 応答のストリーミング中継（Server-Sent Events）
+
+ai_gateway.open_stream が返すテキスト断片を SSE のイベントに変換する。
+JSON で返させる応答（サブタスク分解など）は、配列の要素オブジェクトが閉じた時点で
+1件ずつ取り出して送れるよう、届いたテキストを逐次走査する。
+"""
+
+import json
+from typing import Any, Optional
+
+
+def sse_event(event: str, data: Any) -> str:
+    """SSE のイベント1件（data は JSON。改行を含まない）"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class JSONArrayStreamParser:
+    """
+    ストリームで届く JSON テキストから、最初に現れる配列の要素オブジェクトを閉じた時点で取り出す。
+    {"subtasks": [{...}, {...}]} でも [{...}, {...}] でもよく、前後の説明文や ``` も読み飛ばす。
+    要素単位で json.loads するので、壊れた要素があってもそれだけを捨てて続ける。
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._started = False    # 最初の { か [ を見たか（それ以前の文章は読み飛ばす）
+        self._depth = 0
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+        self._in_string = False
+        self._escape = False
+        self.done = False        # 配列が閉じた
+
+    def feed(self, text: str) -> list[dict]:
+        """テキスト断片を追加し、新たに閉じた要素オブジェクトを返す"""
+        self._buffer += text
+        buffer = self._buffer
+        items: list[dict] = []
+        i = self._pos
+        while i < len(buffer) and not self.done:
+            ch = buffer[i]
+            i += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if not self._started:
+                if ch not in "{[":
+                    continue
+                self._started = True
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+                if self._array_depth is None:
+                    if ch == "[":
+                        self._array_depth = self._depth
+                elif ch == "{" and self._depth == self._array_depth + 1:
+                    self._item_start = i - 1
+            elif ch in "}]":
+                if self._item_start is not None and self._depth == self._array_depth + 1:
+                    try:
+                        item = json.loads(buffer[self._item_start:i])
+                    except json.JSONDecodeError:
+                        item = None
+                    if isinstance(item, dict):
+                        items.append(item)
+                    self._item_start = None
+                elif self._array_depth is not None and self._depth == self._array_depth:
+                    self.done = True
+                self._depth -= 1
+        self._pos = i
+        # 要素の途中でなければ、走査済みの部分は不要
+        if self._item_start is None:
+            self._buffer = buffer[i:]
+            self._pos = 0
+        return items
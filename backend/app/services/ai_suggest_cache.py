@@ -0,0 +1,225 @@
+"""
+AI 提案（/api/ai/suggest）のキャッシュ
+
+同じタイトル（毎月の「月次請求書処理」など）の提案を毎回プロバイダに問い合わせない。
+
+- キー: (プロバイダ, 日付の区切り, 正規化したタイトル)。タイトルは NFKC 正規化し、空白をまとめる。
+  日付は AI_SUGGEST_CACHE_BUCKET_DAYS 日ごとに区切り、区切りが変われば問い合わせ直す
+- 期日は「提案した日から何日後か」で保持し、返すときにその日の日付に直す
+- プロセス内 LRU（件数上限 + TTL）。AI_SUGGEST_CACHE_PERSIST=true なら ai_suggestion_cache にも保存する
+- 同じキーの問い合わせが実行中なら、その結果を待って共有する（プロバイダへの呼び出しは1回）。
+  共有するのは成功した結果だけで、失敗したら待っていた側はそれぞれ自分のキーで問い合わせ直す
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+import unicodedata
+from datetime import date, datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.ai import AISuggestionCache
+
+# 古い区切りの行の削除は1時間に1回まで
+_PURGE_INTERVAL_SECONDS = 3600
+
+
+def normalize_title(title: str) -> str:
+    """全角英数・半角カナ等を NFKC でそろえ、連続する空白を1つにする"""
+    return " ".join(unicodedata.normalize("NFKC", title).split())
+
+
+def _to_stored(data: dict, today: date) -> Optional[dict]:
+    """AI の応答を保存用にする（期日 → 日数）。期日が日付として読めなければ保存しない"""
+    stored = dict(data)
+    due_date = stored.pop("due_date", None)
+    if due_date is not None:
+        try:
+            due_in_days = (date.fromisoformat(str(due_date)) - today).days
+        except ValueError:
+            return None
+        stored["due_in_days"] = due_in_days
+    return stored
+
+
+def _from_stored(stored: dict, today: date) -> dict:
+    data = dict(stored)
+    due_in_days = data.pop("due_in_days", None)
+    if due_in_days is not None:
+        data["due_date"] = (today + timedelta(days=due_in_days)).isoformat()
+    return data
+
+
+class SuggestionCache:
+    def __init__(self, max_entries: int, ttl_seconds: float, bucket_days: int, persist: bool):
+        self.ttl_seconds = ttl_seconds
+        self.bucket_days = bucket_days
+        self.persist = persist
+        self._memory = LRUCache(max_entries, ttl_seconds)
+        # 実行中の問い合わせ。Task はイベントループをまたげないのでループごとに分ける
+        self._in_flight: dict[tuple[str, int], asyncio.Task] = {}
+        self._last_purge = 0.0
+        self.hits = self.db_hits = self.misses = self.coalesced = 0
+
+    def _bucket(self, today: date) -> int:
+        return today.toordinal() // self.bucket_days
+
+    def _key(self, provider: str, title: str, bucket: int) -> str:
+        return hashlib.sha256(f"{provider}\n{bucket}\n{title}".encode()).hexdigest()
+
+    async def get(self, provider: str, title: str, today: date) -> Optional[dict]:
+        """キャッシュにあれば提案を返す（期日は today 基準の日付に直す）"""
+        title = normalize_title(title)
+        key = self._key(provider, title, self._bucket(today))
+        stored = await self._lookup(provider, key)
+        return _from_stored(stored, today) if stored is not None else None
+
+    async def put(self, provider: str, title: str, today: date, data: dict) -> None:
+        """提案を保存する（一括提案など、get_or_fetch を通さずに得た結果）"""
+        title = normalize_title(title)
+        bucket = self._bucket(today)
+        await self._store(provider, self._key(provider, title, bucket), bucket, data, today)
+
+    async def get_or_fetch(
+        self,
+        provider: str,
+        title: str,
+        today: date,
+        fetch: Callable[[str], Awaitable[dict]],
+    ) -> dict:
+        """
+        キャッシュにあれば返し、なければ fetch(正規化したタイトル) の結果を保存して返す。
+        同じキーの fetch が実行中なら、それを待つ。ただし先行した呼び出しが失敗した場合は
+        （他のユーザーのキー・上限によるエラーかもしれないので）自分の fetch で問い合わせ直す。
+        """
+        title = normalize_title(title)
+        bucket = self._bucket(today)
+        key = self._key(provider, title, bucket)
+
+        stored = await self._lookup(provider, key)
+        if stored is not None:
+            return _from_stored(stored, today)
+
+        flight_key = (key, id(asyncio.get_running_loop()))
+        task = self._in_flight.get(flight_key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fetch(provider, key, bucket, title, today, fetch))
+            self._in_flight[flight_key] = task
+            task.add_done_callback(lambda t: self._finished(flight_key, t))
+            # 呼び出し元が切断しても、問い合わせは最後まで行って保存する
+            return await asyncio.shield(task)
+
+        self.coalesced += 1
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            # 先行した呼び出しは別のユーザー（APIキー）のものかもしれない。失敗の理由は
+            # そのキーや同時実行数によるので、他人のエラーは返さず自分の fetch で問い合わせる
+            pass
+        return await self._fetch(provider, key, bucket, title, today, fetch)
+
+    async def _lookup(self, provider: str, key: str) -> Optional[dict]:
+        stored = self._memory.get(provider, key)
+        if stored is not None:
+            self.hits += 1
+            return stored
+        if self.persist:
+            stored = await run_in_threadpool(self._load, key)
+            if stored is not None:
+                self.db_hits += 1
+                self._memory.set(provider, key, stored)
+        return stored
+
+    def _finished(self, flight_key: tuple[str, int], task: asyncio.Task) -> None:
+        self._in_flight.pop(flight_key, None)
+        # 待っている呼び出し元がいなくても、例外を未回収のまま残さない
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(
+        self,
+        provider: str,
+        key: str,
+        bucket: int,
+        title: str,
+        today: date,
+        fetch: Callable[[str], Awaitable[dict]],
+    ) -> dict:
+        data = await fetch(title)
+        await self._store(provider, key, bucket, data, today)
+        return data
+
+    async def _store(self, provider: str, key: str, bucket: int, data: dict, today: date) -> None:
+        stored = _to_stored(data, today)
+        if stored is None:
+            return
+        self._memory.set(provider, key, stored)
+        if self.persist:
+            try:
+                await run_in_threadpool(self._save, key, provider, bucket, stored)
+            except Exception as e:
+                # 保存できなくても提案は返す（メモリには入っている）
+                print(f"AI提案キャッシュの保存に失敗: {e}")
+
+    def _load(self, key: str) -> Optional[dict]:
+        with SessionLocal() as db:
+            row = db.get(AISuggestionCache, key)
+            if row is None:
+                return None
+            created_at = row.created_at
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            if datetime.now(timezone.utc) - created_at > timedelta(seconds=self.ttl_seconds):
+                return None
+            return json.loads(row.result)
+
+    def _save(self, key: str, provider: str, bucket: int, stored: dict) -> None:
+        with SessionLocal() as db:
+            db.merge(
+                AISuggestionCache(
+                    cache_key=key,
+                    provider=provider,
+                    bucket=bucket,
+                    result=json.dumps(stored, ensure_ascii=False),
+                    created_at=datetime.now(timezone.utc),
+                )
+            )
+            now = time.monotonic()
+            if now - self._last_purge >= _PURGE_INTERVAL_SECONDS:
+                # 区切りが過ぎた行はキーが変わって読まれないので消す
+                self._last_purge = now
+                db.execute(delete(AISuggestionCache).where(AISuggestionCache.bucket < bucket))
+            db.commit()
+
+    def status(self) -> dict:
+        return {
+            "enabled": True,
+            "persist": self.persist,
+            "bucket_days": self.bucket_days,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
+
+
+suggestion_cache: Optional[SuggestionCache] = (
+    SuggestionCache(
+        settings.AI_SUGGEST_CACHE_MAX_ENTRIES,
+        settings.AI_SUGGEST_CACHE_TTL_SECONDS,
+        settings.AI_SUGGEST_CACHE_BUCKET_DAYS,
+        settings.AI_SUGGEST_CACHE_PERSIST,
+    )
+    if settings.AI_SUGGEST_CACHE
+    else None
+)
@@ -0,0 +1,298 @@
+"""
+タスクの日次集計（task_daily_stats）
+
+ダッシュボードは tasks を毎回集計せず、(ユーザー, 日, カテゴリ) ごとの集計行を読む。
+ORM 経由のタスク作成・更新・削除は after_flush で変更前後の差分を計算して加算する。
+ORM を通らない一括 INSERT / UPDATE では add_tasks / subtract_tasks / rebuild_daily_stats を呼ぶこと。
+
+初期投入・不整合時の再構築:
+    python -m app.services.daily_stats [--user-id ID]
+"""
+
+import argparse
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Iterable, Optional, Union
+
+from sqlalchemy import Date, case, cast, delete, event, func, inspect, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.task import Task, TaskDailyStat, TaskStatus
+
+# 完了日時のない完了タスク（旧データ）は件数にだけ含め、日付の範囲外に置く
+UNDATED_DAY = date(1970, 1, 1)
+
+_FIELDS = (
+    "user_id",
+    "status",
+    "category",
+    "completed_at",
+    "due_date",
+    "actual_minutes",
+    "estimated_minutes",
+)
+# ユーザー単位の再構築と加算を直列化する advisory lock の名前空間（2引数版の1つ目）
+_ADVISORY_LOCK_CLASS = 0x7A5C
+_COUNTERS = (
+    "completed_count",
+    "completed_late_count",
+    "completed_actual_minutes",
+    "completed_estimated_minutes",
+    "open_count",
+)
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+StatKey = tuple[int, date, str]
+
+
+class _UnknownOldValue(Exception):
+    """未ロードの属性が変更され、変更前の値がわからない"""
+
+
+def utc_day(value: Optional[datetime]) -> Optional[date]:
+    """日時の UTC での日付（タイムゾーンなしは UTC とみなす）"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _contribution(values: dict) -> Optional[tuple[StatKey, tuple[int, ...]]]:
+    """タスク1件が集計に与える寄与（集計行のキー, 各カウンタ）。削除済みは None"""
+    status = values["status"] or TaskStatus.pending
+    if status == TaskStatus.deleted:
+        return None
+    category = values["category"] or ""
+    if status == TaskStatus.completed:
+        completed_at, due_date = values["completed_at"], values["due_date"]
+        day = utc_day(completed_at) or UNDATED_DAY
+        late = int(completed_at is not None and _utc(completed_at) > _utc(due_date))
+        counters = (1, late, values["actual_minutes"] or 0, values["estimated_minutes"] or 0, 0)
+    else:
+        day = utc_day(values["due_date"])
+        counters = (0, 0, 0, 0, 1)
+    return (values["user_id"], day, category), counters
+
+
+def _add(deltas: dict, values: Optional[dict], sign: int) -> None:
+    contribution = _contribution(values) if values is not None else None
+    if contribution is None:
+        return
+    key, counters = contribution
+    current = deltas[key]
+    for i, value in enumerate(counters):
+        current[i] += sign * value
+
+
+def _changed_values(task: Task) -> Optional[tuple[dict, dict]]:
+    """集計に関わる属性の (変更前, 変更後)。関わる変更がなければ None"""
+    attrs = inspect(task).attrs
+    histories = {name: attrs[name].history for name in _FIELDS}
+    if not any(history.has_changes() for history in histories.values()):
+        return None
+    old, new = {}, {}
+    for name, history in histories.items():
+        if history.has_changes():
+            if not history.deleted:
+                raise _UnknownOldValue
+            old[name] = history.deleted[0]
+            new[name] = history.added[0] if history.added else None
+        else:
+            old[name] = new[name] = getattr(task, name)
+    return old, new
+
+
+def _committed_values(task: Task) -> dict:
+    """削除されるタスクの変更前の値"""
+    attrs = inspect(task).attrs
+    values = {}
+    for name in _FIELDS:
+        history = attrs[name].history
+        if history.has_changes():
+            if not history.deleted:
+                raise _UnknownOldValue
+            values[name] = history.deleted[0]
+        else:
+            values[name] = getattr(task, name)
+    return values
+
+
+def _connection(db: Union[Session, Connection]) -> Connection:
+    return db.connection() if isinstance(db, Session) else db
+
+
+def _lock_users(connection: Connection, user_ids: Iterable[int]) -> None:
+    """
+    PostgreSQL ではユーザーごとの advisory lock（トランザクション終了まで）を取る。
+    再構築と加算が同じユーザーの集計行を同時に書かないようにする。
+    複数ユーザーをまとめて取るときのデッドロックを避けるため、ID の昇順で取る
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    for user_id in sorted(set(user_ids)):
+        connection.execute(select(func.pg_advisory_xact_lock(_ADVISORY_LOCK_CLASS, user_id)))
+
+
+def _apply_deltas(connection: Connection, deltas: dict) -> None:
+    rows = [
+        {"user_id": user_id, "day": day, "category": category, **dict(zip(_COUNTERS, counters))}
+        for (user_id, day, category), counters in deltas.items()
+        if any(counters)
+    ]
+    if not rows:
+        return
+    _lock_users(connection, (row["user_id"] for row in rows))
+    table = TaskDailyStat.__table__
+    stmt = _INSERTS[connection.dialect.name](table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day, table.c.category],
+        set_={name: table.c[name] + stmt.excluded[name] for name in _COUNTERS},
+    )
+    connection.execute(stmt, rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_task_changes(session: Session, flush_context) -> None:
+    # after_flush ではまだ new / dirty / deleted と属性の変更履歴が残っている
+    deltas: dict[StatKey, list[int]] = defaultdict(lambda: [0] * len(_COUNTERS))
+    rebuild_users: set[int] = set()
+    for task in session.new:
+        if isinstance(task, Task):
+            _add(deltas, {name: getattr(task, name) for name in _FIELDS}, 1)
+    for task in session.dirty:
+        if not isinstance(task, Task):
+            continue
+        try:
+            changed = _changed_values(task)
+        except _UnknownOldValue:
+            rebuild_users.add(task.user_id)
+            continue
+        if changed is not None:
+            _add(deltas, changed[0], -1)
+            _add(deltas, changed[1], 1)
+    for task in session.deleted:
+        if not isinstance(task, Task):
+            continue
+        try:
+            _add(deltas, _committed_values(task), -1)
+        except _UnknownOldValue:
+            rebuild_users.add(task.user_id)
+
+    if not deltas and not rebuild_users:
+        return
+    connection = session.connection()
+    _lock_users(connection, {key[0] for key in deltas} | rebuild_users)
+    _apply_deltas(connection, {k: v for k, v in deltas.items() if k[0] not in rebuild_users})
+    for user_id in rebuild_users:
+        rebuild_daily_stats(connection, user_id)
+
+
+def _apply_tasks(db: Union[Session, Connection], task_ids: Iterable[int], sign: int) -> None:
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    connection = _connection(db)
+    deltas: dict[StatKey, list[int]] = defaultdict(lambda: [0] * len(_COUNTERS))
+    columns = [getattr(Task, name) for name in _FIELDS]
+    for row in connection.execute(select(*columns).where(Task.id.in_(task_ids))):
+        _add(deltas, dict(zip(_FIELDS, row)), sign)
+    _apply_deltas(connection, deltas)
+
+
+def add_tasks(db: Union[Session, Connection], task_ids: Iterable[int]) -> None:
+    """
+    ORM の一括 INSERT（insert(Task) に行のリストを渡す）で作ったタスクを、INSERT の後に集計に加える。
+    一括 INSERT の行は session.new を通らないため、after_flush では拾えない
+    """
+    _apply_tasks(db, task_ids, 1)
+
+
+def subtract_tasks(db: Union[Session, Connection], task_ids: Iterable[int]) -> None:
+    """ORM を通さずに削除（論理削除）するタスクを、更新の前に集計から差し引く"""
+    _apply_tasks(db, task_ids, -1)
+
+
+def _day_expression(column, dialect_name: str):
+    if dialect_name == "postgresql":
+        return cast(func.timezone("UTC", column), Date)
+    return func.date(column)
+
+
+def rebuild_daily_stats(db: Union[Session, Connection], user_id: Optional[int] = None) -> None:
+    """tasks から集計を作り直す（user_id 省略時は全ユーザー）。コミットは呼び出し側"""
+    connection = _connection(db)
+    dialect_name = connection.dialect.name
+    is_completed = Task.status == TaskStatus.completed
+
+    # 日付・カテゴリを副問い合わせで確定させてから GROUP BY する
+    # （式を直接 GROUP BY すると、PostgreSQL ではバインド変数の違いで別の式とみなされる）
+    source = select(
+        Task.user_id.label("user_id"),
+        case(
+            (
+                is_completed,
+                func.coalesce(_day_expression(Task.completed_at, dialect_name), UNDATED_DAY),
+            ),
+            else_=_day_expression(Task.due_date, dialect_name),
+        ).label("day"),
+        func.coalesce(Task.category, "").label("category"),
+        case((is_completed, 1), else_=0).label("completed"),
+        case((is_completed & (Task.completed_at > Task.due_date), 1), else_=0).label("late"),
+        case((is_completed, Task.actual_minutes), else_=0).label("actual_minutes"),
+        case((is_completed, Task.estimated_minutes), else_=0).label("estimated_minutes"),
+    ).where(Task.status != TaskStatus.deleted)
+    if user_id is not None:
+        source = source.where(Task.user_id == user_id)
+    source = source.subquery()
+
+    rollup = select(
+        source.c.user_id,
+        source.c.day,
+        source.c.category,
+        func.sum(source.c.completed),
+        func.sum(source.c.late),
+        func.coalesce(func.sum(source.c.actual_minutes), 0),
+        func.coalesce(func.sum(source.c.estimated_minutes), 0),
+        func.count() - func.sum(source.c.completed),
+    ).group_by(source.c.user_id, source.c.day, source.c.category)
+
+    # 作り直しの間に他のトランザクションが集計行を加算しないようにする。
+    # 全ユーザー（マイグレーション・CLI）はテーブルごと、1ユーザーならそのユーザーだけをロックする
+    if user_id is None:
+        if dialect_name == "postgresql":
+            connection.execute(text("LOCK TABLE task_daily_stats IN SHARE ROW EXCLUSIVE MODE"))
+    else:
+        _lock_users(connection, [user_id])
+    table = TaskDailyStat.__table__
+    clear = delete(table)
+    if user_id is not None:
+        clear = clear.where(table.c.user_id == user_id)
+    connection.execute(clear)
+    connection.execute(
+        insert(table).from_select(["user_id", "day", "category", *_COUNTERS], rollup)
+    )
+
+
+def main() -> None:
+    from app.core.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="タスクの日次集計を tasks から作り直す")
+    parser.add_argument("--user-id", type=int, help="対象ユーザー（省略時は全ユーザー）")
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        rebuild_daily_stats(db, args.user_id)
+        db.commit()
+    print("日次集計を再構築しました")
+
+
+if __name__ == "__main__":
+    main()
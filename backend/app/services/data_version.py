@@ -0,0 +1,70 @@
+"""
+ユーザー単位のデータバージョンと ETag
+
+タスク・OKR を変更するたびに users.data_version を +1 し、読み取り系 API は
+（バージョン, 時間帯）から ETag を作る。If-None-Match が一致すれば 304 を返し、
+タスクのクエリやスコア計算を丸ごと省略できる。
+変更がコミットされたら、そのユーザーのレスポンスキャッシュも破棄する。
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import response_cache
+from app.models.user import User
+
+# 緊急度は時間とともに変わるため、時間帯も ETag に含める。
+# 緊急度の最大傾き（期限3日以内: 10点/日 × 重み0.4 = 4点/日）でも5分間の変化は
+# 約0.014点で、期限切れ・今日期限の判定が切り替わる遅れも最大5分に収まる。
+ETAG_TIME_BUCKET_SECONDS = 300
+
+
+_STALE_USERS_KEY = "stale_cache_users"
+
+
+def invalidate_after_commit(db: Session, user_id: int) -> None:
+    """コミット成功時にユーザーのレスポンスキャッシュを破棄するよう登録する"""
+    db.info.setdefault(_STALE_USERS_KEY, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    for user_id in session.info.pop(_STALE_USERS_KEY, ()):
+        response_cache.invalidate(str(user_id))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_users(session: Session) -> None:
+    session.info.pop(_STALE_USERS_KEY, None)
+
+
+def bump_data_version(db: Session, user_id: int) -> int:
+    """
+    データバージョンを +1 して新しい値を返す。
+    変更と同じトランザクション内で呼ぶ（commit されなければバージョンも戻る）。
+    """
+    invalidate_after_commit(db, user_id)
+    return db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(data_version=User.data_version + 1)
+        .returning(User.data_version)
+    ).scalar_one()
+
+
+def make_etag(user_id: int, data_version: int, now: Optional[datetime] = None) -> str:
+    """弱い ETag（内容ではなくバージョンと時間帯から作る）"""
+    now = now or datetime.now(timezone.utc)
+    bucket = int(now.timestamp()) // ETAG_TIME_BUCKET_SECONDS
+    return f'W/"{user_id}-{data_version}-{bucket}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match ヘッダ（カンマ区切り・"*" 可）に etag が含まれるか"""
+    if not if_none_match:
+        return False
+    candidates = {c.strip() for c in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
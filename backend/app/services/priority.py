@@ -7,43 +7,68 @@
 """
 
 import math
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Sequence
 
+import numpy as np
+from sqlalchemy import BigInteger, Float, case, cast, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement, FunctionElement
 
-def calc_urgency_score(due_date: datetime) -> float:
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _round2(value: float) -> float:
+    """
+    小数第2位に四捨五入する（ちょうど中間は切り上げ）。
+    四則演算と floor だけで丸めるので、同じ入力なら NumPy・SQL（_sql_round2）でもビット単位で同じ値になる
+    （組み込みの round や DB の round は、中間付近の扱いが互いに異なる）。
+    """
+    return math.floor(value * 100 + 0.5) / 100
+
+
+def calc_urgency_score(due_date: datetime, now: Optional[datetime] = None) -> float:
     """
     緊急度スコア（0〜100）
     - 期日まで14日以上 → 10〜30（余裕あり）
     - 期日まで7日以内 → 30〜70（注意）
     - 期日まで3日以内 → 70〜95（至急）
     - 期日当日または超過 → 100
+
+    now を省略した場合は現在時刻を基準にする。
     """
-    now = datetime.now(timezone.utc)
+    if now is None:
+        now = datetime.now(timezone.utc)
     # タイムゾーン統一
     if due_date.tzinfo is None:
         due_date = due_date.replace(tzinfo=timezone.utc)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
 
     days_left = (due_date - now).total_seconds() / 86400
+    return _urgency_from_days_left(days_left)
+
 
+def _urgency_from_days_left(days_left: float) -> float:
     if days_left <= 0:
         return 100.0
     elif days_left <= 3:
         # 3日以内：70〜100（指数的に増加）
         score = 100 - 30 * (days_left / 3)
-        return round(score, 2)
+        return _round2(score)
     elif days_left <= 7:
         # 7日以内：45〜70
         score = 70 - 25 * ((days_left - 3) / 4)
-        return round(score, 2)
+        return _round2(score)
     elif days_left <= 14:
         # 14日以内：25〜45
         score = 45 - 20 * ((days_left - 7) / 7)
-        return round(score, 2)
+        return _round2(score)
     else:
         # 14日超：指数的に減衰（最低10）
         score = max(10.0, 25 * math.exp(-0.05 * (days_left - 14)))
-        return round(score, 2)
+        return _round2(score)
 
 
 def calc_importance_score(importance: int) -> float:
@@ -92,12 +117,13 @@ def calculate_priority_score(
     importance: int,
     estimated_minutes: Optional[int],
     has_incomplete_blocker: bool,
+    now: Optional[datetime] = None,
 ) -> tuple[float, dict]:
     """
     優先度スコアを算出し、(総合スコア, 内訳dict) を返す。
     重み：緊急度40% / 重要度35% / 所要時間15% / 依存関係10%
     """
-    urgency = calc_urgency_score(due_date)
+    urgency = calc_urgency_score(due_date, now)
     importance_s = calc_importance_score(importance)
     duration = calc_duration_score(estimated_minutes)
     dependency = calc_dependency_score(has_incomplete_blocker)
@@ -110,14 +136,14 @@ def calculate_priority_score(
     )
 
     breakdown = {
-        "urgency": round(urgency, 2),
-        "importance": round(importance_s, 2),
-        "duration": round(duration, 2),
-        "dependency": round(dependency, 2),
-        "total": round(total, 2),
+        "urgency": _round2(urgency),
+        "importance": _round2(importance_s),
+        "duration": _round2(duration),
+        "dependency": _round2(dependency),
+        "total": _round2(total),
     }
 
-    return round(total, 2), breakdown
+    return _round2(total), breakdown
 
 
 def get_priority_level(score: float) -> str:
@@ -128,3 +154,210 @@ def get_priority_level(score: float) -> str:
         return "yellow"
     else:
         return "green"
+
+
+# 緊急度の区分（calc_urgency_score の期日までの日数の区切り）の下限。
+# 緊急度は期日までの日数に対して単調なので、緊急度の値から区分が決まる
+_URGENCY_BAND_FLOORS = (100.0, 70.0, 45.0, 25.0)
+
+
+def urgency_band(urgency: float) -> int:
+    """緊急度の区分: 0=当日・超過 / 1=3日以内 / 2=7日以内 / 3=14日以内 / 4=14日超"""
+    for band, floor in enumerate(_URGENCY_BAND_FLOORS):
+        if urgency >= floor:
+            return band
+    return len(_URGENCY_BAND_FLOORS)
+
+
+def is_score_stale(stored: Optional[float], fresh: float, urgency: float) -> bool:
+    """
+    読み取り時に保存済みスコアを書き換える必要があるか判定する（urgency は今の緊急度スコア）。
+    - 未保存 → 要更新
+    - 保存時から緊急度の区分が変わった → 要更新
+    緊急度は時間とともに少しずつ変わるため、区分内の変化では書き換えない。
+    保存時の緊急度は、スコアの差を緊急度の重み（0.40）で割って今の緊急度から逆算する
+    （重要度などが変わった場合も、その差が緊急度の差として現れる）。
+    書き込み系の処理では、値が変わったら常に書き換えること。
+    """
+    if stored is None:
+        return True
+    stored_urgency = urgency + (stored - fresh) / 0.40
+    return urgency_band(stored_urgency) != urgency_band(urgency)
+
+
+# ── バッチ算出（NumPy ベクトル化） ──────────────────────────────────────────
+
+_DURATION_BOUNDS = np.array([15, 30, 60, 120, 240, 480], dtype=np.float64)
+_DURATION_SCORES = np.array([100.0, 90.0, 80.0, 65.0, 45.0, 30.0, 20.0])
+
+
+def _to_epoch_us(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _ONE_MICROSECOND
+
+
+def _near_rounding_tie(values: np.ndarray) -> np.ndarray:
+    """小数第2位の丸めの境目に近く、計算誤差（np.exp と math.exp の差など）で丸め結果が変わり得る要素"""
+    scaled = values * 100
+    return np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+
+
+def _round2_array(values: np.ndarray) -> np.ndarray:
+    """_round2 の配列版（同じ演算なので要素ごとに _round2 と一致する）"""
+    return np.floor(values * 100 + 0.5) / 100
+
+
+def calculate_priority_scores(
+    due_dates: Sequence[datetime],
+    importances: Sequence[int],
+    estimated_minutes: Sequence[Optional[int]],
+    has_incomplete_blockers: Sequence[bool],
+    now: Optional[datetime] = None,
+) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """
+    複数タスクの優先度スコアを列指向の配列でまとめて算出する。
+    (総合スコア配列, 内訳dict[項目名 → 配列]) を返す。
+
+    全タスクを同一の基準時刻 now で評価し、結果は calculate_priority_score と完全に一致する。
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+
+    due_us = np.fromiter((_to_epoch_us(d) for d in due_dates), dtype=np.int64, count=len(due_dates))
+    days_left = (due_us - _to_epoch_us(now)).astype(np.float64) / 10**6 / 86400
+
+    with np.errstate(over="ignore"):
+        decay = np.maximum(10.0, 25 * np.exp(-0.05 * (days_left - 14)))
+    urgency_raw = np.select(
+        [days_left <= 0, days_left <= 3, days_left <= 7, days_left <= 14],
+        [
+            100.0,
+            100 - 30 * (days_left / 3),
+            70 - 25 * ((days_left - 3) / 4),
+            45 - 20 * ((days_left - 7) / 7),
+        ],
+        default=decay,
+    )
+    urgency = _round2_array(urgency_raw)
+    # 丸め境界に近い要素はスカラー版で再計算し、np.exp の誤差も含めて結果を揃える
+    for i in np.flatnonzero(_near_rounding_tie(urgency_raw)):
+        urgency[i] = _urgency_from_days_left(float(days_left[i]))
+
+    importance_s = np.asarray(importances, dtype=np.int64) * 20.0
+
+    minutes = np.array(
+        [np.nan if m is None else m for m in estimated_minutes], dtype=np.float64
+    )
+    duration = np.where(
+        np.isnan(minutes),
+        50.0,
+        _DURATION_SCORES[np.searchsorted(_DURATION_BOUNDS, np.nan_to_num(minutes), side="left")],
+    )
+
+    dependency = np.where(np.asarray(has_incomplete_blockers, dtype=bool), 10.0, 100.0)
+
+    total = _round2_array(
+        urgency * 0.40
+        + importance_s * 0.35
+        + duration * 0.15
+        + dependency * 0.10
+    )
+
+    breakdown = {
+        "urgency": urgency,
+        "importance": importance_s,
+        "duration": duration,
+        "dependency": dependency,
+        "total": total,
+    }
+    return total, breakdown
+
+
+# ── SQL 式（ORDER BY / LIMIT を DB 側で行うため） ──────────────────────────────
+
+class _sql_epoch_microseconds(FunctionElement):
+    """DateTime 列を UNIX マイクロ秒（整数）に変換する（Python 側の _to_epoch_us に相当）"""
+
+    type = BigInteger()
+    name = "epoch_microseconds"
+    inherit_cache = True
+
+
+@compiles(_sql_epoch_microseconds)
+def _compile_epoch_microseconds(element, compiler, **kw):
+    # SQLite：タイムゾーンなしで保存された値（YYYY-MM-DD HH:MM:SS.ffffff）を UTC として扱う（Python 側と同じ）。
+    # julianday は浮動小数の日数でマイクロ秒まで表せないので、秒とマイクロ秒を文字列から読む
+    column = compiler.process(element.clauses, **kw)
+    return (
+        f"(CAST(strftime('%s', {column}) AS INTEGER) * 1000000"
+        f" + CAST(substr({column}, 21, 6) AS INTEGER))"
+    )
+
+
+@compiles(_sql_epoch_microseconds, "postgresql")
+def _compile_epoch_microseconds_pg(element, compiler, **kw):
+    return "CAST(EXTRACT(EPOCH FROM %s) * 1000000 AS BIGINT)" % compiler.process(
+        element.clauses, **kw
+    )
+
+
+class _sql_round2(FunctionElement):
+    """小数第2位に四捨五入する（Python 側の _round2 と同じ演算）"""
+
+    type = Float()
+    name = "round2"
+    inherit_cache = True
+
+
+@compiles(_sql_round2)
+def _compile_round2(element, compiler, **kw):
+    # 倍精度の四則演算と floor は SQLite・PostgreSQL・Python で同じ結果になる
+    return "(floor((%s) * 100 + 0.5) / 100.0)" % compiler.process(element.clauses, **kw)
+
+
+def priority_score_expression(
+    due_date: ColumnElement,
+    importance: ColumnElement,
+    estimated_minutes: ColumnElement,
+    has_incomplete_blocker: ColumnElement,
+    now: datetime,
+) -> ColumnElement:
+    """
+    calculate_priority_score と同じ式を SQL 式として組み立てる。
+    期日までの日数はマイクロ秒の整数の差から Python 側と同じ順に割って求め、丸めも同じ演算（_round2）で
+    行うので、値は calculate_priority_score と一致する（14日超の exp だけは DB サーバーの数学ライブラリで
+    計算するため、アプリと異なる環境では丸めの境目でまれに 0.01 ずれうる）。
+    """
+    days_left = (
+        cast(_sql_epoch_microseconds(due_date) - _to_epoch_us(now), Float) / 1000000.0 / 86400.0
+    )
+    decay = 25 * func.exp(-0.05 * (days_left - 14))
+
+    urgency = case(
+        (days_left <= 0, 100.0),
+        (days_left <= 3, _sql_round2(100 - 30 * (days_left / 3))),
+        (days_left <= 7, _sql_round2(70 - 25 * ((days_left - 3) / 4))),
+        (days_left <= 14, _sql_round2(45 - 20 * ((days_left - 7) / 7))),
+        (decay < 10.0, 10.0),
+        else_=_sql_round2(decay),
+    )
+    importance_s = cast(importance, Float) * 20.0
+    duration = case(
+        (estimated_minutes.is_(None), 50.0),
+        (estimated_minutes <= 15, 100.0),
+        (estimated_minutes <= 30, 90.0),
+        (estimated_minutes <= 60, 80.0),
+        (estimated_minutes <= 120, 65.0),
+        (estimated_minutes <= 240, 45.0),
+        (estimated_minutes <= 480, 30.0),
+        else_=20.0,
+    )
+    dependency = case((has_incomplete_blocker, 10.0), else_=100.0)
+
+    return _sql_round2(
+        urgency * 0.40
+        + importance_s * 0.35
+        + duration * 0.15
+        + dependency * 0.10
+    )
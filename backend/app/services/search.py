@@ -0,0 +1,107 @@
+"""
+タスク全文検索サービス
+
+日本語は単語区切りがないため、タイトル・メモを NFKC 正規化した 1-gram / 2-gram の集合として
+tasks.search_ngrams に保存し、PostgreSQL では GIN インデックス付きの tsvector として検索する。
+候補の絞り込みにだけ n-gram を使い、最終判定は従来どおりの部分一致（ILIKE）で行う。
+SQLite（ローカル実行時）では n-gram 条件を無効化し、部分一致のみで検索する。
+"""
+
+import unicodedata
+from typing import Optional
+
+from sqlalchemy import Boolean, Float, bindparam
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement, FunctionElement
+
+
+def normalize_text(text: str) -> str:
+    """全角/半角・大文字/小文字の揺れを吸収する"""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def _ngrams(text: str) -> set[str]:
+    grams: set[str] = set()
+    for segment in normalize_text(text).split():
+        grams.update(segment)
+        grams.update(segment[i : i + 2] for i in range(len(segment) - 1))
+    return grams
+
+
+def build_search_ngrams(title: Optional[str], memo: Optional[str]) -> str:
+    """search_ngrams 列に保存する空白区切りの n-gram 文字列を作る"""
+    grams = _ngrams(title or "") | _ngrams(memo or "")
+    return " ".join(sorted(grams))
+
+
+def keyword_tsquery(keyword: str) -> Optional[str]:
+    """
+    検索語を tsquery のテキスト表現（全 n-gram の AND）に変換する。
+    1文字の語は 1-gram、それ以外は 2-gram で照合する。n-gram が作れなければ None。
+    """
+    grams = set()
+    for segment in normalize_text(keyword).split():
+        if len(segment) == 1:
+            grams.add(segment)
+        else:
+            grams.update(segment[i : i + 2] for i in range(len(segment) - 1))
+    if not grams:
+        return None
+    quoted = ("'" + g.replace("\\", "\\\\").replace("'", "''") + "'" for g in sorted(grams))
+    return " & ".join(quoted)
+
+
+# ── SQL 式 ──────────────────────────────────────────────────────────────
+
+NGRAM_VECTOR_SQL = "array_to_tsvector(string_to_array({}, ' '))"
+
+
+class _ngram_match(FunctionElement):
+    type = Boolean()
+    name = "ngram_match"
+    inherit_cache = True
+
+
+@compiles(_ngram_match)
+def _compile_ngram_match(element, compiler, **kw):
+    # インデックスがない環境では絞り込みを行わない（部分一致条件だけが効く）
+    return "1 = 1"
+
+
+@compiles(_ngram_match, "postgresql")
+def _compile_ngram_match_pg(element, compiler, **kw):
+    column, query = element.clauses
+    return "%s @@ CAST(%s AS tsquery)" % (
+        NGRAM_VECTOR_SQL.format(compiler.process(column, **kw)),
+        compiler.process(query, **kw),
+    )
+
+
+class _ngram_rank(FunctionElement):
+    type = Float()
+    name = "ngram_rank"
+    inherit_cache = True
+
+
+@compiles(_ngram_rank)
+def _compile_ngram_rank(element, compiler, **kw):
+    return "0.0"
+
+
+@compiles(_ngram_rank, "postgresql")
+def _compile_ngram_rank_pg(element, compiler, **kw):
+    column, query = element.clauses
+    return "CAST(ts_rank(%s, CAST(%s AS tsquery)) AS DOUBLE PRECISION)" % (
+        NGRAM_VECTOR_SQL.format(compiler.process(column, **kw)),
+        compiler.process(query, **kw),
+    )
+
+
+def ngram_match(column: ColumnElement, tsquery: str) -> ColumnElement:
+    """n-gram インデックスで候補を絞り込む条件"""
+    return _ngram_match(column, bindparam("ngram_query", tsquery, unique=True))
+
+
+def ngram_rank(column: ColumnElement, tsquery: str) -> ColumnElement:
+    """n-gram の一致度（SQLite では常に 0）"""
+    return _ngram_rank(column, bindparam("ngram_query", tsquery, unique=True))
@@ -0,0 +1,97 @@
+"""
+AI プロバイダのクライアントを使い回す効果を測るベンチマーク
+
+AI プロバイダの代役（bench.fake_ai_provider、応答に --delay 秒かかる）に向けて、
+3つのプロバイダの呼び出しを順に繰り返し、1回あたりの時間（p50 / p95 / 最大）と
+代役に張られた TCP 接続の数を比べる:
+  - 毎回作る: 呼び出しごとにクライアントを作って閉じる（app.services.ai_clients 導入前の動き）
+  - 使い回す: ProviderClientRegistry から借りる（keep-alive の接続を再利用する）
+本物のプロバイダは HTTPS なので、毎回作る場合はこれに TLS ハンドシェイクの往復も加わる。
+
+    cd backend
+    python -m bench.ai_clients [--calls 200] [--delay 0.02]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services import ai_gateway
+from app.services.ai_clients import ProviderClientRegistry, _create_client
+from bench.fake_ai_provider import fake_provider, provider_env
+from bench.login_flood import percentile
+
+PROVIDERS = ("openai", "anthropic", "gemini")
+
+
+async def call(client, provider: str) -> None:
+    await ai_gateway._COMPLETIONS[provider](client, "system", "サブタスクに分解して", 100)
+
+
+async def fresh_clients(provider: str, api_key: str) -> None:
+    client = _create_client(provider, api_key)
+    try:
+        await call(client, provider)
+    finally:
+        await client.close()
+
+
+def pooled_clients(registry: ProviderClientRegistry):
+    async def run(provider: str, api_key: str) -> None:
+        async with registry.lease(provider, api_key) as client:
+            await call(client, provider)
+
+    return run
+
+
+async def measure(base_url: str, label: str, runner, calls: int) -> None:
+    async with httpx.AsyncClient(base_url=base_url) as stats_client:
+        before = (await stats_client.get("/stats")).json()
+        latencies: dict[str, list[float]] = {provider: [] for provider in PROVIDERS}
+        for i in range(calls):
+            provider = PROVIDERS[i % len(PROVIDERS)]
+            start = time.perf_counter()
+            await runner(provider, "sk-bench")
+            latencies[provider].append(time.perf_counter() - start)
+        after = (await stats_client.get("/stats")).json()
+
+    print(f"{label}: {calls} 回、TCP 接続 {after['connections'] - before['connections']} 本")
+    for provider, values in latencies.items():
+        values.sort()
+        print(
+            f"  {provider:<9} p50={statistics.median(values) * 1000:.1f}ms "
+            f"p95={percentile(values, 0.95) * 1000:.1f}ms max={values[-1] * 1000:.1f}ms"
+        )
+
+
+async def run(base_url: str, calls: int) -> None:
+    # 両方とも SDK の import を済ませてから測る
+    for provider in PROVIDERS:
+        await fresh_clients(provider, "sk-warmup")
+
+    registry = ProviderClientRegistry(max_clients=16, idle_seconds=300)
+    await measure(base_url, "毎回作る", fresh_clients, calls)
+    await measure(base_url, "使い回す", pooled_clients(registry), calls)
+    await registry.close_all()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="AI プロバイダのクライアントを使い回す効果を測る")
+    parser.add_argument("--port", type=int, default=8102, help="AI プロバイダの代役のポート")
+    parser.add_argument("--delay", type=float, default=0.02, help="代役の応答にかける秒数")
+    parser.add_argument("--calls", type=int, default=200, help="それぞれの方式で呼ぶ回数")
+    args = parser.parse_args(argv)
+
+    with fake_provider(args.port, args.delay) as base_url:
+        for name, value in provider_env(base_url).items():
+            setattr(settings, name, value)
+        asyncio.run(run(base_url, args.calls))
+
+
+if __name__ == "__main__":
+    main()
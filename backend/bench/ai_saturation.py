@@ -0,0 +1,126 @@
+"""
+AI 呼び出しが詰まっているときの、ほかの API の応答時間を測るベンチマーク
+
+AI プロバイダの代役（bench.fake_ai_provider、応答に --ai-delay 秒かかる）に向けたサーバーへ
+複数のユーザーから POST /api/ai/decompose を一斉に投げ、AIGateway（app.services.ai_gateway）の
+同時実行数を使い切らせる。その間に別のユーザーとして GET /api/dashboard/summary を一定間隔で呼び、
+AI 呼び出しのない状態と比べた応答時間（p50 / p95 / 最大）と、AI 呼び出しのステータス内訳を表示する。
+AI 呼び出しがイベントループ上で待っていれば、ダッシュボードの応答時間はほとんど変わらない。
+
+SQLite の一時ファイルでマイグレーションを適用した uvicorn と代役を起動して測る:
+    cd backend
+    python -m bench.ai_saturation [--ai-users 40] [--calls-per-user 2] [--ai-delay 2]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Optional
+
+import httpx
+
+from bench.fake_ai_provider import fake_provider, provider_env
+from bench.login_flood import local_server, percentile, prepare_user, wait_until_ready
+
+PASSWORD = "passw0rdX"
+
+
+async def prepare_ai_user(client: httpx.AsyncClient, username: str) -> dict:
+    """AI キー（代役なので中身は何でもよい）を登録したユーザーの認証ヘッダーを返す"""
+    headers = await prepare_user(client, username, PASSWORD)
+    resp = await client.put(
+        "/api/users/me/ai-key",
+        json={"provider": "openai", "api_key": f"sk-{username}"},
+        headers=headers,
+    )
+    resp.raise_for_status()
+    return headers
+
+
+def summarize(label: str, latencies: list[float]) -> str:
+    latencies = sorted(latencies)
+    return (
+        f"{label}: {len(latencies)} 回、"
+        f"p50={statistics.median(latencies) * 1000:.1f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:.1f}ms "
+        f"max={latencies[-1] * 1000:.1f}ms"
+    )
+
+
+async def run(
+    base_url: str, ai_users: int, calls_per_user: int, idle_probes: int, probe_interval: float
+) -> None:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        await wait_until_ready(client)
+        headers = await prepare_user(client, "bench", PASSWORD)
+        ai_headers = [await prepare_ai_user(client, f"benchai{i}") for i in range(ai_users)]
+
+        async def probe_once() -> float:
+            start = time.perf_counter()
+            resp = await client.get("/api/dashboard/summary", headers=headers)
+            elapsed = time.perf_counter() - start
+            resp.raise_for_status()
+            await asyncio.sleep(probe_interval)
+            return elapsed
+
+        idle = [await probe_once() for _ in range(idle_probes)]
+
+        ai_statuses: dict[int, int] = {}
+        ai_latencies: list[float] = []
+
+        async def decompose(user_headers: dict) -> None:
+            start = time.perf_counter()
+            try:
+                resp = await client.post(
+                    "/api/ai/decompose", json={"title": "月次の請求書を処理する"}, headers=user_headers
+                )
+                status_code = resp.status_code
+            except httpx.TransportError:
+                status_code = 0      # 接続エラー・タイムアウト
+            ai_latencies.append(time.perf_counter() - start)
+            ai_statuses[status_code] = ai_statuses.get(status_code, 0) + 1
+
+        calls = [
+            asyncio.create_task(decompose(user_headers))
+            for user_headers in ai_headers
+            for _ in range(calls_per_user)
+        ]
+        busy: list[float] = []
+        while not all(call.done() for call in calls):
+            busy.append(await probe_once())
+        await asyncio.gather(*calls)
+
+    print(summarize("GET /api/dashboard/summary（AI 呼び出しなし）", idle))
+    print(summarize("GET /api/dashboard/summary（AI 呼び出し中）", busy))
+    print(
+        f"POST /api/ai/decompose: {len(calls)} 件（{ai_users} ユーザー × {calls_per_user}）、"
+        f"最大 {max(ai_latencies):.2f} 秒"
+    )
+    print("  ステータス: " + ", ".join(f"{code}={n}" for code, n in sorted(ai_statuses.items())))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="AI 呼び出しが詰まっているときの API の応答時間を測る")
+    parser.add_argument("--port", type=int, default=8101, help="起動する uvicorn のポート")
+    parser.add_argument("--ai-port", type=int, default=8102, help="AI プロバイダの代役のポート")
+    parser.add_argument("--ai-delay", type=float, default=2, help="代役の応答にかける秒数")
+    parser.add_argument("--ai-users", type=int, default=40, help="AI を呼ぶユーザー数")
+    parser.add_argument("--calls-per-user", type=int, default=2, help="ユーザーごとの同時呼び出し数")
+    parser.add_argument("--idle-probes", type=int, default=40, help="AI 呼び出し前に測る回数")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="GET の間隔（秒）")
+    args = parser.parse_args(argv)
+
+    with fake_provider(args.ai_port, args.ai_delay) as ai_base_url:
+        with local_server(args.port, provider_env(ai_base_url)) as base_url:
+            asyncio.run(
+                run(
+                    base_url, args.ai_users, args.calls_per_user,
+                    args.idle_probes, args.probe_interval,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+ベンチマーク用の AI プロバイダの代役（OpenAI / Anthropic / Gemini の HTTP API）
+
+実際のプロバイダの代わりに、決まった待ち時間のあとで固定の応答を返す。
+アプリからは AI_OPENAI_BASE_URL（…/v1）・AI_ANTHROPIC_BASE_URL・AI_GEMINI_BASE_URL で向ける。
+応答はプロンプトの内容で選ぶ（サブタスク分解・振り返り・番号付きの一括提案・単体の提案）。
+GET /stats で、受けた呼び出しの数と張られた TCP 接続の数（接続元ポートの種類）を返す。
+
+単体で起動する:
+    cd backend
+    python -m bench.fake_ai_provider --port 8102 --delay 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from bench.login_flood import BACKEND_DIR
+
+# 1回の応答にかける秒数（ストリームは断片に分けて、合計でこの秒数になるように送る）
+DELAY = float(os.environ.get("FAKE_AI_DELAY", "0.02"))
+
+SUGGESTION = {
+    "due_date": "2030-01-10",
+    "importance": 4,
+    "estimated_minutes": 30,
+    "category": "経理",
+    "memo": "ベンチマーク用の応答",
+}
+SUBTASKS = {
+    "subtasks": [
+        {"title": "資料を集める", "estimated_minutes": 15},
+        {"title": "内容を確認する", "estimated_minutes": 20},
+        {"title": "提出する", "estimated_minutes": 10},
+    ]
+}
+REVIEW = "今週は期限内に多くのタスクを終えられました。来週は見積もりとの差が大きい作業から見直しましょう。"
+
+app = FastAPI()
+_peers: set[tuple[str, int]] = set()
+_calls = 0
+
+
+@app.middleware("http")
+async def count_connections(request: Request, call_next):
+    global _calls
+    if request.url.path != "/stats":
+        _peers.add((request.client.host, request.client.port))
+        _calls += 1
+    return await call_next(request)
+
+
+@app.get("/stats")
+async def stats():
+    return {"calls": _calls, "connections": len(_peers)}
+
+
+def answer(prompt: str) -> str:
+    """プロンプトに合った応答の本文を返す"""
+    if "番号付き" in prompt:
+        items = [
+            {**SUGGESTION, "index": int(index), "memo": title}
+            for index, title in re.findall(r"^(\d+)\. (.+)$", prompt, re.M)
+        ]
+        return json.dumps(items, ensure_ascii=False)
+    if "サブタスク" in prompt:
+        return json.dumps(SUBTASKS, ensure_ascii=False)
+    if "振り返り" in prompt:
+        return REVIEW
+    return json.dumps(SUGGESTION, ensure_ascii=False)
+
+
+def pieces(text: str, size: int = 8) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+async def sse(frames: list[str]) -> AsyncIterator[str]:
+    for frame in frames:
+        await asyncio.sleep(DELAY / len(frames))
+        yield frame
+
+
+def stream_response(frames: list[str]) -> StreamingResponse:
+    return StreamingResponse(sse(frames), media_type="text/event-stream")
+
+
+@app.post("/v1/chat/completions")
+async def openai_chat_completions(request: Request):
+    body = await request.json()
+    text = answer(body["messages"][-1]["content"])
+    if body.get("stream"):
+        frames = [
+            "data: " + json.dumps({
+                "id": "fake", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }) + "\n\n"
+            for piece in pieces(text)
+        ]
+        return stream_response(frames + ["data: [DONE]\n\n"])
+    await asyncio.sleep(DELAY)
+    return {
+        "id": "fake", "object": "chat.completion", "created": 0, "model": body["model"],
+        "choices": [
+            {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}
+        ],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+def _anthropic_event(event_type: str, data: dict) -> str:
+    return f"event: {event_type}\ndata: {json.dumps({'type': event_type, **data})}\n\n"
+
+
+@app.post("/v1/messages")
+async def anthropic_messages(request: Request):
+    body = await request.json()
+    text = answer(body["messages"][-1]["content"])
+    message = {
+        "id": "fake", "type": "message", "role": "assistant", "model": body["model"],
+        "stop_reason": "end_turn", "stop_sequence": None,
+        "usage": {"input_tokens": 1, "output_tokens": 1},
+    }
+    if body.get("stream"):
+        frames = [
+            _anthropic_event("message_start", {"message": {**message, "content": [], "stop_reason": None}}),
+            _anthropic_event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}}),
+            *(
+                _anthropic_event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": piece}})
+                for piece in pieces(text)
+            ),
+            _anthropic_event("content_block_stop", {"index": 0}),
+            _anthropic_event(
+                "message_delta",
+                {"delta": {"stop_reason": "end_turn", "stop_sequence": None}, "usage": {"output_tokens": 1}},
+            ),
+            _anthropic_event("message_stop", {}),
+        ]
+        return stream_response(frames)
+    await asyncio.sleep(DELAY)
+    return {**message, "content": [{"type": "text", "text": text}]}
+
+
+def _gemini_payload(text: str) -> dict:
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+
+@app.post("/v1beta/models/{model}:generateContent")
+async def gemini_generate_content(model: str, request: Request):
+    body = await request.json()
+    await asyncio.sleep(DELAY)
+    return _gemini_payload(answer(body["contents"][-1]["parts"][0]["text"]))
+
+
+@app.post("/v1beta/models/{model}:streamGenerateContent")
+async def gemini_stream_generate_content(model: str, request: Request):
+    body = await request.json()
+    text = answer(body["contents"][-1]["parts"][0]["text"])
+    return stream_response(
+        ["data: " + json.dumps(_gemini_payload(piece)) + "\r\n\r\n" for piece in pieces(text)]
+    )
+
+
+def provider_env(base_url: str) -> dict[str, str]:
+    """3つのプロバイダをすべて base_url の代役に向ける設定"""
+    return {
+        "AI_OPENAI_BASE_URL": f"{base_url}/v1",
+        "AI_ANTHROPIC_BASE_URL": base_url,
+        "AI_GEMINI_BASE_URL": base_url,
+    }
+
+
+@contextmanager
+def fake_provider(port: int, delay: float) -> Iterator[str]:
+    """代役を別プロセスで起動し、応答できるようになったら base URL を返す"""
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "bench.fake_ai_provider", "--port", str(port), "--delay", str(delay)],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"{base_url}/stats")
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("AI プロバイダの代役が起動しませんでした")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="ベンチマーク用の AI プロバイダの代役")
+    parser.add_argument("--port", type=int, default=8102)
+    parser.add_argument("--delay", type=float, default=DELAY, help="1回の応答にかける秒数")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    os.environ["FAKE_AI_DELAY"] = str(args.delay)
+    uvicorn.run("bench.fake_ai_provider:app", host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+ログイン集中時のタスク API の応答時間を測るベンチマーク
+
+ログイン（bcrypt）を一斉に大量に投げながら、別のユーザー操作として GET /api/tasks を
+一定間隔で呼び、その応答時間（p50 / p95 / 最大）とログインのステータス内訳を表示する。
+パスワードハッシュ専用プロセス（app.core.security）と受付上限（PASSWORD_HASH_MAX_PENDING）が
+効いていれば、ログインは 429 で早めに断られ、タスク API の応答時間はほとんど伸びない。
+
+--base-url を省略すると、SQLite の一時ファイルでマイグレーションを適用した uvicorn を起動して測る:
+    cd backend
+    python -m bench.login_flood [--waves 4] [--concurrency 80]
+起動済みのサーバーを測る（既存のユーザーを使う）:
+    python -m bench.login_flood --base-url http://127.0.0.1:8000 --username alice --password ...
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@contextmanager
+def local_server(port: int, extra_env: Optional[dict[str, str]] = None) -> Iterator[str]:
+    """一時 DB にマイグレーションを適用し、uvicorn を起動して base URL を返す"""
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            **(extra_env or {}),
+        }
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=BACKEND_DIR,
+            env=env,
+            check=True,
+            capture_output=True,
+        )
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--port", str(port), "--log-level", "warning",
+            ],
+            cwd=BACKEND_DIR,
+            env=env,
+        )
+        try:
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            server.terminate()
+            server.wait()
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("サーバーが起動しませんでした")
+        await asyncio.sleep(0.2)
+
+
+async def prepare_user(client: httpx.AsyncClient, username: str, password: str) -> dict:
+    """ユーザーを登録（既存なら何もしない）してログインし、タスクを1件作って認証ヘッダーを返す"""
+    await client.post(
+        "/api/auth/register",
+        json={"email": f"{username}@example.com", "username": username, "password": password},
+    )
+    resp = await client.post("/api/auth/login", json={"identifier": username, "password": password})
+    resp.raise_for_status()
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    await client.post(
+        "/api/tasks",
+        json={"title": "ベンチマーク", "due_date": "2030-01-01T00:00:00Z", "importance": 3},
+        headers=headers,
+    )
+    return headers
+
+
+def percentile(sorted_values: list[float], ratio: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * ratio))]
+
+
+async def run(
+    base_url: str,
+    username: str,
+    password: str,
+    waves: int,
+    concurrency: int,
+    probe_interval: float,
+) -> None:
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        await wait_until_ready(client)
+        headers = await prepare_user(client, username, password)
+
+        latencies: list[float] = []
+        login_statuses: dict[int, int] = {}
+        flooding = True
+
+        async def probe() -> None:
+            while flooding:
+                start = time.perf_counter()
+                resp = await client.get("/api/tasks", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                resp.raise_for_status()
+                await asyncio.sleep(probe_interval)
+
+        async def login() -> None:
+            try:
+                resp = await client.post(
+                    "/api/auth/login", json={"identifier": username, "password": password}
+                )
+                status_code = resp.status_code
+            except httpx.TransportError:
+                status_code = 0      # 接続エラー・タイムアウト
+            login_statuses[status_code] = login_statuses.get(status_code, 0) + 1
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        for _ in range(waves):
+            await asyncio.gather(*(login() for _ in range(concurrency)))
+        flood_seconds = time.perf_counter() - start
+        flooding = False
+        await prober
+
+    latencies.sort()
+    print(f"ログイン: {waves} 回 × 同時 {concurrency} 件、{flood_seconds:.1f} 秒")
+    print("  ステータス: " + ", ".join(f"{code}={n}" for code, n in sorted(login_statuses.items())))
+    print(
+        f"GET /api/tasks: {len(latencies)} 回、"
+        f"p50={statistics.median(latencies) * 1000:.0f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:.0f}ms "
+        f"max={latencies[-1] * 1000:.0f}ms"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="ログイン集中時のタスク API の応答時間を測る")
+    parser.add_argument("--base-url", help="測るサーバー（省略時は一時 DB で uvicorn を起動する）")
+    parser.add_argument("--port", type=int, default=8101, help="起動する uvicorn のポート")
+    parser.add_argument("--username", default="bench")
+    parser.add_argument("--password", default="passw0rdX")
+    parser.add_argument("--waves", type=int, default=4, help="一斉ログインの回数")
+    parser.add_argument("--concurrency", type=int, default=80, help="1回あたりの同時ログイン数")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="GET /api/tasks の間隔（秒）")
+    args = parser.parse_args(argv)
+
+    options = (args.username, args.password, args.waves, args.concurrency, args.probe_interval)
+    if args.base_url:
+        asyncio.run(run(args.base_url, *options))
+        return
+    with local_server(args.port) as base_url:
+        asyncio.run(run(base_url, *options))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+テスト共通設定
+
+SQLite の一時ファイルにモデルからテーブルを作り、TestClient で API を呼ぶ。
+app を import する前に DATABASE_URL を差し替えるため、環境変数の設定はこのファイルの先頭で行う。
+"""
+
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+_db_dir = tempfile.mkdtemp(prefix="taskkanri-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.database import Base, SessionLocal, async_engine, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture(scope="session")
+def client() -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(client: TestClient) -> dict:
+    """登録・ログイン済みのユーザー（テストごとに別ユーザー）。id と headers を返す"""
+    name = f"u{uuid.uuid4().hex[:12]}"
+    password = "passw0rdX"
+    resp = client.post(
+        "/api/auth/register",
+        json={"email": f"{name}@example.com", "username": name, "password": password},
+    )
+    assert resp.status_code == 201, resp.text
+    user_id = resp.json()["id"]
+    resp = client.post("/api/auth/login", json={"identifier": name, "password": password})
+    assert resp.status_code == 200, resp.text
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    return {"id": user_id, "headers": headers}
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@pytest.fixture
+def count_queries():
+    """with count_queries() as counter: の中で実行された SQL を数える（DB_ASYNC=true なら非同期エンジンの分も）"""
+    engines = [engine] if async_engine is None else [engine, async_engine.sync_engine]
+
+    @contextmanager
+    def counting():
+        counter = QueryCounter()
+        for target in engines:
+            event.listen(target, "before_cursor_execute", counter._record)
+        try:
+            yield counter
+        finally:
+            for target in engines:
+                event.remove(target, "before_cursor_execute", counter._record)
+
+    return counting
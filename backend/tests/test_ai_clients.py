@@ -0,0 +1,71 @@
+"""ProviderClientRegistry: クライアントの使い回しと、追い出したクライアントを閉じる時機"""
+
+import asyncio
+
+import pytest
+
+from app.services import ai_clients as ai_clients_module
+from app.services.ai_clients import ProviderClientRegistry
+
+
+class FakeClient:
+    def __init__(self, provider: str, api_key: str):
+        self.name = f"{provider}:{api_key}"
+        self.closed = 0
+
+    async def close(self) -> None:
+        self.closed += 1
+
+
+@pytest.fixture
+def created(monkeypatch) -> list[FakeClient]:
+    clients: list[FakeClient] = []
+
+    def create(provider: str, api_key: str) -> FakeClient:
+        clients.append(FakeClient(provider, api_key))
+        return clients[-1]
+
+    monkeypatch.setattr(ai_clients_module, "_create_client", create)
+    return clients
+
+
+def test_same_key_reuses_client(created):
+    registry = ProviderClientRegistry(max_clients=4, idle_seconds=300)
+
+    async def main():
+        for _ in range(3):
+            async with registry.lease("openai", "sk-a") as client:
+                assert client.name == "openai:sk-a"
+        async with registry.lease("anthropic", "sk-a"):
+            pass
+        await registry.close_all()
+
+    asyncio.run(main())
+    assert [client.name for client in created] == ["openai:sk-a", "anthropic:sk-a"]
+    assert (registry.hits, registry.misses) == (2, 2)
+    assert [client.closed for client in created] == [1, 1]
+
+
+def test_evicted_client_is_closed_when_last_lease_ends(created):
+    registry = ProviderClientRegistry(max_clients=1, idle_seconds=300)
+
+    async def main():
+        async with registry.lease("openai", "sk-a") as first:
+            async with registry.lease("openai", "sk-a") as second:
+                assert second is first
+                # 上限1件なので、別のキーを借りると使用中の sk-a が追い出される
+                async with registry.lease("openai", "sk-b") as other:
+                    assert registry.evictions == 1
+                    assert other.closed == 0
+                assert first.closed == 0
+            # まだ1つ貸し出し中なので閉じない
+            assert first.closed == 0
+        assert first.closed == 1
+        assert registry.status()["clients"] == 1
+
+        # 使われていないクライアントは追い出したときにすぐ閉じる
+        async with registry.lease("openai", "sk-c"):
+            assert created[1].closed == 1
+
+    asyncio.run(main())
+    assert [client.closed for client in created] == [1, 1, 0]
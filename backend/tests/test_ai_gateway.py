@@ -0,0 +1,189 @@
+"""AIGateway の同時実行数・待ち行列・期限（プロバイダはスタブに差し替える）"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import pytest
+
+from app.services import ai_gateway as gateway_module
+from app.services.ai_gateway import AIGateway, AIGatewayError
+
+
+class StubProvider:
+    """
+    スタブのプロバイダ。delay が 0 なら release() されるまで、そうでなければ delay 秒待って応答する。
+    同時実行数の最大値と、借りているクライアントの数を記録する
+    """
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self.leases = 0
+        # Event は作ったイベントループに紐づくので、ループ上で初めて使うときに作る
+        self._released: Optional[asyncio.Event] = None
+
+    def release(self) -> None:
+        self._gate().set()
+
+    def _gate(self) -> asyncio.Event:
+        if self._released is None:
+            self._released = asyncio.Event()
+        return self._released
+
+    async def _enter(self) -> None:
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+
+    async def complete(self, client, system_prompt, user_prompt, max_tokens) -> str:
+        await self._enter()
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            else:
+                await self._gate().wait()
+            return f"応答:{user_prompt}"
+        finally:
+            self.active -= 1
+
+    async def stream(self, client, system_prompt, user_prompt):
+        await self._enter()
+
+        async def chunks():
+            try:
+                for text in ("一", "二", "三"):
+                    await asyncio.sleep(self.delay)
+                    yield text
+            finally:
+                self.active -= 1
+
+        async def close() -> None:
+            pass
+
+        return chunks(), close
+
+    @asynccontextmanager
+    async def lease(self, provider, api_key):
+        self.leases += 1
+        try:
+            yield object()
+        finally:
+            self.leases -= 1
+
+
+@pytest.fixture
+def stub(monkeypatch) -> StubProvider:
+    provider = StubProvider()
+    monkeypatch.setitem(gateway_module._COMPLETIONS, "openai", provider.complete)
+    monkeypatch.setitem(gateway_module._STREAMS, "openai", provider.stream)
+    monkeypatch.setattr(gateway_module.ai_clients, "lease", provider.lease)
+    return provider
+
+
+def _call(gateway: AIGateway, user_id: int, prompt: str = "p"):
+    return gateway.complete("openai", "sk-test", "system", prompt, user_id=user_id)
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_calls_beyond_max_concurrency_wait_for_a_slot(stub):
+    gateway = AIGateway(max_concurrency=2, max_queue=10, per_user=2, deadline=5)
+
+    async def main():
+        calls = [
+            asyncio.ensure_future(_call(gateway, user_id, f"p{user_id}")) for user_id in range(5)
+        ]
+        await _settle()
+        assert (stub.active, gateway.in_flight, gateway.waiting) == (2, 2, 3)
+        stub.release()
+        return await asyncio.gather(*calls)
+
+    results = asyncio.run(main())
+    assert results == [f"応答:p{user_id}" for user_id in range(5)]
+    assert stub.peak == 2
+    assert (gateway.in_flight, gateway.waiting, stub.leases) == (0, 0, 0)
+
+
+def test_per_user_limit_rejects_with_429(stub):
+    gateway = AIGateway(max_concurrency=10, max_queue=10, per_user=1, deadline=5)
+
+    async def main():
+        first = asyncio.ensure_future(_call(gateway, user_id=1))
+        await _settle()
+        with pytest.raises(AIGatewayError) as rejected:
+            await _call(gateway, user_id=1)
+        other_user = asyncio.ensure_future(_call(gateway, user_id=2))
+        await _settle()
+        assert stub.active == 2
+        stub.release()
+        await asyncio.gather(first, other_user)
+        # 終わった後は同じユーザーも再び呼べる
+        assert await _call(gateway, user_id=1) == "応答:p"
+        return rejected.value
+
+    error = asyncio.run(main())
+    assert (error.status_code, error.retry_after) == (429, 1)
+    assert gateway.rejected_user == 1
+    assert stub.calls == 3
+
+
+def test_full_queue_rejects_with_503(stub):
+    gateway = AIGateway(max_concurrency=1, max_queue=1, per_user=5, deadline=5)
+
+    async def main():
+        running = asyncio.ensure_future(_call(gateway, user_id=1))
+        queued = asyncio.ensure_future(_call(gateway, user_id=2))
+        await _settle()
+        assert (gateway.in_flight, gateway.waiting) == (1, 1)
+        with pytest.raises(AIGatewayError) as rejected:
+            await _call(gateway, user_id=3)
+        stub.release()
+        await asyncio.gather(running, queued)
+        return rejected.value
+
+    error = asyncio.run(main())
+    assert (error.status_code, error.retry_after) == (503, 5)
+    assert gateway.rejected_queue == 1
+    assert stub.calls == 2
+
+
+def test_slow_provider_times_out_with_504_and_releases_slots(stub):
+    stub.delay = 1
+    gateway = AIGateway(max_concurrency=1, max_queue=5, per_user=1, deadline=0.05)
+
+    async def main():
+        # 実行中の1件と、空きを待つ1件（期限は待ち時間も含む）がどちらも 504
+        return await asyncio.gather(
+            _call(gateway, user_id=1), _call(gateway, user_id=2), return_exceptions=True
+        )
+
+    errors = asyncio.run(main())
+    assert [e.status_code for e in errors] == [504, 504]
+    assert gateway.metrics["openai"].timeouts == 2
+    assert (gateway.in_flight, gateway.waiting, gateway._in_flight_by_user, stub.leases) == (
+        0, 0, {}, 0
+    )
+
+    stub.delay = 0.001
+    assert asyncio.run(_call(gateway, user_id=1)) == "応答:p"
+
+
+def test_stream_deadline_covers_waiting_for_chunks(stub):
+    gateway = AIGateway(max_concurrency=1, max_queue=5, per_user=1, deadline=0.2)
+
+    async def read(delay: float) -> list[str]:
+        stub.delay = delay
+        stream = await gateway.open_stream("openai", "sk-test", "system", "p", user_id=1)
+        return [chunk async for chunk in stream]
+
+    assert asyncio.run(read(0.001)) == ["一", "二", "三"]
+    with pytest.raises(AIGatewayError) as timed_out:
+        asyncio.run(read(0.5))
+    assert timed_out.value.status_code == 504
+    assert (gateway.in_flight, gateway._in_flight_by_user, stub.leases, stub.active) == (0, {}, 0, 0)
@@ -0,0 +1,86 @@
+"""/api/ai/suggest/batch: まとめた呼び出しが失敗しても、タイトルごとの問い合わせで補う"""
+
+import json
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers import ai
+from app.services.ai_gateway import AIGatewayError
+
+
+@pytest.fixture
+def ai_user(client, user):
+    resp = client.put(
+        "/api/users/me/ai-key",
+        json={"provider": "openai", "api_key": "sk-test"},
+        headers=user["headers"],
+    )
+    assert resp.status_code == 204, resp.text
+    return user
+
+
+def _suggestion(title: str) -> dict:
+    return {"importance": 3, "estimated_minutes": 30, "category": "総務", "memo": title}
+
+
+@pytest.mark.parametrize(
+    "chunk_error",
+    [
+        HTTPException(status_code=502, detail="AI APIエラー: upstream"),
+        AIGatewayError(504, "AIの応答が時間内に返りませんでした"),
+        AIGatewayError(503, "混み合っています"),
+    ],
+)
+def test_failed_chunk_falls_back_to_single_calls(client, ai_user, monkeypatch, chunk_error):
+    prefix = uuid.uuid4().hex[:8]
+    titles = [f"{prefix} 請求書処理 {i}" for i in range(3)]
+    failing = titles[1]
+    calls = {"batch": 0, "single": 0}
+
+    async def fake_call_ai(provider, api_key, system_prompt, user_prompt, user_id, max_tokens=0):
+        if "番号付き" in user_prompt:
+            calls["batch"] += 1
+            raise chunk_error
+        calls["single"] += 1
+        title = user_prompt.split("タスクタイトル: ", 1)[1].split("\n", 1)[0]
+        if title == failing:
+            raise AIGatewayError(429, "同時に実行できるAIリクエスト数の上限に達しました")
+        return json.dumps(_suggestion(title), ensure_ascii=False)
+
+    monkeypatch.setattr(ai, "call_ai", fake_call_ai)
+    resp = client.post("/api/ai/suggest/batch", json={"titles": titles}, headers=ai_user["headers"])
+
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert calls == {"batch": 1, "single": 3}
+    assert (body["succeeded"], body["failed"]) == (2, 1)
+    by_title = {item["title"]: item for item in body["results"]}
+    assert by_title[failing]["ok"] is False
+    assert by_title[failing]["error"] == "同時に実行できるAIリクエスト数の上限に達しました"
+    for title in titles:
+        if title != failing:
+            assert by_title[title]["suggestion"]["memo"] == title
+
+
+def test_chunks_fit_the_output_budget(client, ai_user, monkeypatch):
+    prefix = uuid.uuid4().hex[:8]
+    titles = [f"{prefix} 契約書レビュー {i}" for i in range(13)]
+    chunks: list[tuple[int, int]] = []
+
+    async def fake_call_ai(provider, api_key, system_prompt, user_prompt, user_id, max_tokens=0):
+        numbered = user_prompt.split("タスクタイトル（番号付き）:\n", 1)[1].split("\n\n", 1)[0]
+        size = len(numbered.splitlines())
+        chunks.append((size, max_tokens))
+        return json.dumps([{"index": i, **_suggestion("")} for i in range(1, size + 1)])
+
+    monkeypatch.setattr(ai, "call_ai", fake_call_ai)
+    monkeypatch.setattr(ai.settings, "AI_SUGGEST_BATCH_OUTPUT_TOKENS", 800)
+    resp = client.post("/api/ai/suggest/batch", json={"titles": titles}, headers=ai_user["headers"])
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["succeeded"] == 13
+    assert sorted(chunks) == [(1, 800), (6, 800), (6, 800)]
+    for size, max_tokens in chunks:
+        assert size * ai.SUGGEST_OUTPUT_TOKENS <= max_tokens
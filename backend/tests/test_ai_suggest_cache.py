@@ -0,0 +1,73 @@
+"""SuggestionCache.get_or_fetch: 実行中の問い合わせの共有"""
+
+import asyncio
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.ai_gateway import AIGatewayError
+from app.services.ai_suggest_cache import SuggestionCache
+
+TODAY = date(2026, 1, 5)
+
+
+def _cache() -> SuggestionCache:
+    return SuggestionCache(max_entries=100, ttl_seconds=3600, bucket_days=7, persist=False)
+
+
+def test_concurrent_calls_share_one_fetch():
+    cache = _cache()
+    calls = 0
+
+    async def fetch(title: str) -> dict:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"importance": 3, "memo": title}
+
+    async def main():
+        return await asyncio.gather(
+            *(cache.get_or_fetch("openai", "月次 請求書処理", TODAY, fetch) for _ in range(5))
+        )
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert all(result == {"importance": 3, "memo": "月次 請求書処理"} for result in results)
+
+
+@pytest.mark.parametrize(
+    "leader_error",
+    [
+        HTTPException(status_code=502, detail="AI APIエラー: invalid api key"),
+        AIGatewayError(429, "同時に実行できるAIリクエスト数の上限に達しました"),
+        AIGatewayError(504, "AIの応答が時間内に返りませんでした"),
+    ],
+)
+def test_joiner_refetches_with_its_own_key_when_leader_fails(leader_error):
+    cache = _cache()
+    calls: list[str] = []
+
+    def fetch_with(api_key: str):
+        async def fetch(title: str) -> dict:
+            calls.append(api_key)
+            await asyncio.sleep(0.01)
+            if api_key == "leader-key":
+                raise leader_error
+            return {"importance": 4, "memo": api_key}
+
+        return fetch
+
+    async def main():
+        leader = asyncio.ensure_future(
+            cache.get_or_fetch("openai", "契約書レビュー", TODAY, fetch_with("leader-key"))
+        )
+        await asyncio.sleep(0)
+        joiner = cache.get_or_fetch("openai", "契約書レビュー", TODAY, fetch_with("joiner-key"))
+        return await asyncio.gather(leader, joiner, return_exceptions=True)
+
+    leader_result, joiner_result = asyncio.run(main())
+    assert leader_result is leader_error
+    assert joiner_result == {"importance": 4, "memo": "joiner-key"}
+    assert calls == ["leader-key", "joiner-key"]
+    assert cache.coalesced == 1
@@ -0,0 +1,45 @@
+"""RedisCache: Redis に繋がらなくても API は失敗しない（キャッシュなしとして動く）"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.cache import RedisCache
+from app.routers import dashboard, tasks
+from app.services import data_version
+
+
+@pytest.fixture
+def unreachable_redis() -> RedisCache:
+    pytest.importorskip("redis")
+    # 誰も待ち受けていないポート（接続は即座に拒否される）
+    return RedisCache("redis://127.0.0.1:1/0", ttl_seconds=60)
+
+
+def test_redis_errors_are_a_miss(unreachable_redis, capsys):
+    assert unreachable_redis.get("1", "summary") is None
+    unreachable_redis.set("1", "summary", b"{}")
+    unreachable_redis.invalidate("1")
+    logged = capsys.readouterr().out
+    assert "読み込みに失敗" in logged
+    assert "書き込みに失敗" in logged
+    assert "無効化に失敗" in logged
+
+
+def test_api_works_while_redis_is_down(client, user, unreachable_redis, monkeypatch):
+    for module in (data_version, tasks, dashboard):
+        monkeypatch.setattr(module, "response_cache", unreachable_redis)
+    headers = user["headers"]
+    due = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+
+    resp = client.post("/api/tasks", json={"title": "Redis 停止中", "due_date": due}, headers=headers)
+    assert resp.status_code == 201, resp.text
+    task_id = resp.json()["id"]
+    # 変更の commit 後の無効化（after_commit）で例外にならない
+    resp = client.patch(f"/api/tasks/{task_id}", json={"status": "completed"}, headers=headers)
+    assert resp.status_code == 200, resp.text
+
+    assert client.get("/api/tasks", headers=headers).json()["tasks"][0]["status"] == "completed"
+    summary = client.get("/api/dashboard/summary", headers=headers)
+    assert summary.status_code == 200
+    assert summary.json()["completed"] == 1
@@ -0,0 +1,35 @@
+"""client_ip: X-Forwarded-For は信頼するプロキシからの接続のときだけ読む"""
+
+import pytest
+from starlette.requests import Request
+
+from app.core.client_ip import client_ip
+from app.core.config import settings
+
+
+def _request(peer: str, *forwarded_for: str) -> Request:
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded_for]
+    return Request({"type": "http", "client": (peer, 50000), "headers": headers})
+
+
+@pytest.mark.parametrize(
+    "trusted, peer, forwarded_for, expected",
+    [
+        # 設定なし：接続元をそのまま使う（ヘッダーは偽装できるので見ない）
+        ("", "10.0.0.5", ["203.0.113.7"], "10.0.0.5"),
+        # 信頼しない接続元からのヘッダーは無視する
+        ("10.0.0.0/8", "198.51.100.9", ["203.0.113.7"], "198.51.100.9"),
+        ("10.0.0.0/8", "10.0.0.5", ["203.0.113.7"], "203.0.113.7"),
+        # クライアントが左側に書いた偽のアドレスは使わない
+        ("10.0.0.0/8", "10.0.0.5", ["1.2.3.4, 203.0.113.7"], "203.0.113.7"),
+        # 多段のプロキシ（ヘッダーが複数行でも1つのリストとして読む）
+        ("10.0.0.0/8,127.0.0.1", "127.0.0.1", ["1.2.3.4, 203.0.113.7", "10.1.2.3"], "203.0.113.7"),
+        # ヘッダーがない・すべて信頼するプロキシ
+        ("10.0.0.0/8", "10.0.0.5", [], "10.0.0.5"),
+        ("10.0.0.0/8", "10.0.0.5", ["10.9.9.9, 10.1.1.1"], "10.9.9.9"),
+        ("::1,fd00::/8", "::1", ["2001:db8::1"], "2001:db8::1"),
+    ],
+)
+def test_client_ip(monkeypatch, trusted, peer, forwarded_for, expected):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", trusted)
+    assert client_ip(_request(peer, *forwarded_for)) == expected
@@ -0,0 +1,90 @@
+"""日次集計（task_daily_stats）が、一括操作の後も tasks からの作り直しと一致すること"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.models.task import TaskDailyStat
+from app.services.daily_stats import rebuild_daily_stats
+
+_COUNTERS = (
+    "completed_count",
+    "completed_late_count",
+    "completed_actual_minutes",
+    "completed_estimated_minutes",
+    "open_count",
+)
+
+
+def _stats(db, user_id: int) -> dict:
+    """集計行（全カウンタ 0 の行は作り直すと消えるので除く）"""
+    db.expire_all()
+    rows = db.scalars(select(TaskDailyStat).where(TaskDailyStat.user_id == user_id))
+    stats = {}
+    for row in rows:
+        counters = tuple(getattr(row, name) for name in _COUNTERS)
+        if any(counters):
+            stats[(row.day, row.category)] = counters
+    return stats
+
+
+def _assert_matches_rebuild(db, user_id: int) -> dict:
+    incremental = _stats(db, user_id)
+    rebuild_daily_stats(db, user_id)
+    db.commit()
+    assert incremental == _stats(db, user_id)
+    return incremental
+
+
+def _iso(value: datetime) -> str:
+    return value.isoformat()
+
+
+def test_batch_operations_keep_rollup_in_sync(client, db, user):
+    headers = user["headers"]
+    now = datetime.now(timezone.utc)
+    tasks = [
+        {
+            "title": f"一括{i}",
+            "due_date": _iso(now + timedelta(days=i - 5)),
+            "category": ["経理", "総務", None][i % 3],
+            "estimated_minutes": 10 * (i + 1),
+        }
+        for i in range(12)
+    ]
+    for chunk in (tasks[:6], tasks[6:]):
+        resp = client.post("/api/tasks/batch", json={"tasks": chunk}, headers=headers)
+        assert resp.status_code == 200, resp.text
+        assert resp.json()["failed"] == 0
+    ids = [
+        t["id"]
+        for t in client.get("/api/tasks", headers=headers).json()["tasks"]
+    ]
+    assert len(ids) == 12
+
+    stats = _assert_matches_rebuild(db, user["id"])
+    assert sum(counters[4] for counters in stats.values()) == 12
+    summary = client.get("/api/dashboard/summary", headers=headers).json()
+    assert summary["total"] == 12
+
+    updates = [
+        {"id": ids[0], "status": "completed", "actual_minutes": 30},
+        {"id": ids[1], "status": "completed"},
+        {"id": ids[2], "category": "人事", "due_date": _iso(now + timedelta(days=30))},
+        {"id": ids[3], "status": "in_progress"},
+    ]
+    resp = client.patch("/api/tasks/batch", json={"tasks": updates}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["failed"] == 0
+    stats = _assert_matches_rebuild(db, user["id"])
+    assert sum(counters[0] for counters in stats.values()) == 2
+
+    resp = client.request(
+        "DELETE", "/api/tasks/batch", json={"ids": ids[:2] + ids[5:8]}, headers=headers
+    )
+    assert resp.status_code == 200, resp.text
+    stats = _assert_matches_rebuild(db, user["id"])
+    assert all(value >= 0 for counters in stats.values() for value in counters)
+    assert sum(counters[0] + counters[4] for counters in stats.values()) == 7
+    summary = client.get("/api/dashboard/summary", headers=headers).json()
+    assert summary["total"] == 7
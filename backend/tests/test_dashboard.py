@@ -0,0 +1,52 @@
+"""GET /api/dashboard/summary は日次集計を1クエリで読む（タスク数・カテゴリ数によらない）"""
+
+from datetime import datetime, timedelta, timezone
+
+
+def _add_tasks(client, headers: dict, count: int, categories: list) -> None:
+    now = datetime.now(timezone.utc)
+    resp = client.post(
+        "/api/tasks/batch",
+        json={
+            "tasks": [
+                {
+                    "title": f"集計{i}",
+                    "due_date": (now + timedelta(days=i % 15 - 5)).isoformat(),
+                    "category": categories[i % len(categories)],
+                    "estimated_minutes": 30,
+                }
+                for i in range(count)
+            ]
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+    ids = [item["id"] for item in resp.json()["results"]]
+    resp = client.patch(
+        "/api/tasks/batch",
+        json={"tasks": [{"id": task_id, "status": "completed"} for task_id in ids[::4]]},
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+
+
+def _summary(client, headers: dict, count_queries) -> tuple[int, dict]:
+    with count_queries() as counter:
+        resp = client.get("/api/dashboard/summary", headers=headers)
+    assert resp.status_code == 200, resp.text
+    return counter.count, resp.json()
+
+
+def test_summary_query_count(client, user, count_queries):
+    headers = user["headers"]
+
+    _add_tasks(client, headers, 4, ["経理"])
+    small_queries, small = _summary(client, headers, count_queries)
+    _add_tasks(client, headers, 120, ["経理", "総務", "人事", "法務", None])
+    large_queries, large = _summary(client, headers, count_queries)
+
+    assert (small["total"], small["completed"]) == (4, 1)
+    assert (large["total"], large["completed"]) == (124, 31)
+    assert len(large["category_distribution"]) == 5
+    # 認証ユーザーの読み込み + 日次集計1クエリ
+    assert 1 <= small_queries == large_queries <= 2
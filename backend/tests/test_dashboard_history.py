@@ -0,0 +1,158 @@
+"""GET /api/dashboard/history: 区間の切り方（週・月）、期間の検証、tasks から直接数えた値との一致"""
+
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.models.task import Task, TaskStatus
+
+FIRST_DAY = date(2026, 1, 15)
+
+
+@pytest.fixture
+def completed_tasks(db, user) -> list[Task]:
+    """2026-01-15 から約2か月、1日1〜2件ずつ完了したタスク（一部は期限後の完了）と、未完了・削除済みのタスク"""
+    tasks = []
+    for i in range(90):
+        completed_at = datetime.combine(
+            FIRST_DAY + timedelta(days=i * 2 // 3), datetime.min.time(), timezone.utc
+        ) + timedelta(hours=9 + i % 12)
+        tasks.append(
+            Task(
+                user_id=user["id"],
+                title=f"完了{i}",
+                # i % 5 が 0・1 のものは期限の翌日・翌々日に完了（期限超過）
+                due_date=completed_at + timedelta(days=i % 5 - 2),
+                category=["経理", "総務", None][i % 3],
+                status=TaskStatus.completed,
+                completed_at=completed_at,
+                estimated_minutes=15 * (i % 4 + 1),
+                actual_minutes=10 * (i % 6 + 1),
+            )
+        )
+    for i, status in enumerate([TaskStatus.pending, TaskStatus.in_progress, TaskStatus.deleted]):
+        tasks.append(
+            Task(
+                user_id=user["id"],
+                title=f"対象外{i}",
+                due_date=datetime(2026, 2, 10, tzinfo=timezone.utc),
+                category="経理",
+                status=status,
+                estimated_minutes=30,
+            )
+        )
+    db.add_all(tasks)
+    db.commit()
+    return tasks
+
+
+def _raw_completed(db, user_id: int, start: date, end: date) -> list[Task]:
+    """日次集計を通さず、tasks から期間内（完了日、UTC）に完了したタスクを読む"""
+    db.expire_all()
+    tasks = db.scalars(
+        select(Task).where(Task.user_id == user_id, Task.status == TaskStatus.completed)
+    ).all()
+    return [t for t in tasks if start <= _utc(t.completed_at).date() <= end]
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _history(client, user, **params) -> dict:
+    resp = client.get("/api/dashboard/history", params=params, headers=user["headers"])
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+def _ranges(series: list[dict]) -> list[tuple[str, str]]:
+    return [(bucket["start"], bucket["end"]) for bucket in series]
+
+
+def test_week_buckets_clip_first_and_last_period(client, db, user, completed_tasks):
+    # 水曜から翌々週の火曜まで。最初と最後の週は期間内の日だけ
+    start, end = date(2026, 2, 4), date(2026, 2, 24)
+    body = _history(client, user, start=start.isoformat(), end=end.isoformat(), granularity="week")
+
+    assert _ranges(body["series"]) == [
+        ("2026-02-04", "2026-02-08"),
+        ("2026-02-09", "2026-02-15"),
+        ("2026-02-16", "2026-02-22"),
+        ("2026-02-23", "2026-02-24"),
+    ]
+    for bucket in body["series"]:
+        raw = _raw_completed(
+            db, user["id"], date.fromisoformat(bucket["start"]), date.fromisoformat(bucket["end"])
+        )
+        assert bucket["completed"] == len(raw), bucket
+    # 期間の前日・翌日の完了は含めない
+    assert body["completed"] == len(_raw_completed(db, user["id"], start, end))
+    assert len(_raw_completed(db, user["id"], start - timedelta(days=1), end + timedelta(days=1))) > (
+        body["completed"]
+    )
+
+
+def test_month_buckets_clip_first_and_last_period(client, db, user, completed_tasks):
+    start, end = date(2026, 1, 20), date(2026, 3, 5)
+    body = _history(client, user, start=start.isoformat(), end=end.isoformat(), granularity="month")
+
+    assert _ranges(body["series"]) == [
+        ("2026-01-20", "2026-01-31"),
+        ("2026-02-01", "2026-02-28"),
+        ("2026-03-01", "2026-03-05"),
+    ]
+    for bucket in body["series"]:
+        raw = _raw_completed(
+            db, user["id"], date.fromisoformat(bucket["start"]), date.fromisoformat(bucket["end"])
+        )
+        assert bucket["completed"] == len(raw)
+        assert bucket["completed_late"] == sum(_utc(t.completed_at) > _utc(t.due_date) for t in raw)
+        assert bucket["estimated_minutes"] == sum(t.estimated_minutes for t in raw)
+        assert bucket["actual_minutes"] == sum(t.actual_minutes for t in raw)
+
+
+def test_overdue_rate_and_categories_match_tasks(client, db, user, completed_tasks):
+    start, end = date(2026, 1, 25), date(2026, 3, 1)
+    body = _history(client, user, start=start.isoformat(), end=end.isoformat())
+    raw = _raw_completed(db, user["id"], start, end)
+    late = sum(_utc(t.completed_at) > _utc(t.due_date) for t in raw)
+
+    assert len(body["series"]) == (end - start).days + 1
+    assert body["completed"] == len(raw)
+    assert 0 < late < len(raw)
+    assert body["overdue_rate"] == round(late / len(raw) * 100, 1)
+
+    expected = Counter()
+    for t in raw:
+        name = t.category or "other"
+        expected[(name, "completed")] += 1
+        expected[(name, "estimated_minutes")] += t.estimated_minutes
+        expected[(name, "actual_minutes")] += t.actual_minutes
+    assert {
+        (c["category"], field): c[field]
+        for c in body["categories"]
+        for field in ("completed", "estimated_minutes", "actual_minutes")
+    } == dict(expected)
+    assert [c["completed"] for c in body["categories"]] == sorted(
+        (c["completed"] for c in body["categories"]), reverse=True
+    )
+
+
+@pytest.mark.parametrize(
+    "start, end, status_code",
+    [
+        ("2026-02-10", "2026-02-09", 400),
+        ("2026-02-10", "2026-02-10", 200),
+        # 終了日 − 開始日が 730 日（両端を含めて 731 日）までは受け付ける
+        ("2024-01-01", "2025-12-31", 200),
+        ("2024-01-01", "2026-01-01", 400),
+        ("2023-01-01", "2026-01-01", 400),
+    ],
+)
+def test_invalid_range_is_400(client, user, start, end, status_code):
+    resp = client.get(
+        "/api/dashboard/history", params={"start": start, "end": end}, headers=user["headers"]
+    )
+    assert resp.status_code == status_code, resp.text
@@ -0,0 +1,81 @@
+"""空の DB に alembic upgrade head が通り、日次集計が tasks から正しく埋まること"""
+
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert, select
+
+from app.models.task import Task, TaskDailyStat, TaskStatus
+from app.models.user import User
+from app.services.daily_stats import rebuild_daily_stats
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _alembic(url: str, *args: str) -> None:
+    subprocess.run(
+        [sys.executable, "-m", "alembic", *args],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATABASE_URL": url},
+        check=True,
+        capture_output=True,
+    )
+
+
+def _stats(connection) -> set[tuple]:
+    table = TaskDailyStat.__table__
+    return set(connection.execute(select(table)).all())
+
+
+def test_upgrade_from_empty_fills_daily_stats(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrate.db'}"
+    _alembic(url, "upgrade", "0005_user_data_version")
+
+    engine = create_engine(url)
+    now = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+    with engine.begin() as connection:
+        user_id = connection.execute(
+            insert(User.__table__)
+            .values(email="m@example.com", username="migrate", hashed_password="x")
+            .returning(User.__table__.c.id)
+        ).scalar_one()
+        rows = []
+        for i in range(12):
+            status = [TaskStatus.pending, TaskStatus.completed, TaskStatus.deleted][i % 3]
+            due_date = now + timedelta(days=i - 6)
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "title": f"既存{i}",
+                    "due_date": due_date,
+                    "importance": 3,
+                    "category": ["経理", None][i % 2],
+                    "status": status,
+                    "estimated_minutes": 30,
+                    "actual_minutes": 20 if status == TaskStatus.completed else None,
+                    # 期限後の完了（completed_late_count）と、完了日時のない旧データを含める
+                    "completed_at": (
+                        (due_date + timedelta(days=i % 4 - 1) if i != 4 else None)
+                        if status == TaskStatus.completed
+                        else None
+                    ),
+                }
+            )
+        connection.execute(insert(Task.__table__), rows)
+
+    _alembic(url, "upgrade", "head")
+    # 0007 の downgrade は 0007 が追加した列だけを戻す
+    _alembic(url, "downgrade", "0006_task_daily_stats")
+    _alembic(url, "upgrade", "head")
+
+    with engine.connect() as connection:
+        migrated = _stats(connection)
+        rebuild_daily_stats(connection)
+        assert migrated == _stats(connection)
+        connection.rollback()
+    assert sum(row.completed_count for row in migrated) == 4
+    assert sum(row.completed_late_count for row in migrated) > 0
+    engine.dispose()
@@ -0,0 +1,133 @@
+"""優先度スコア（app.services.priority）と、その保存（priority_score）"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+
+from app.models.task import Task, TaskStatus
+from app.routers.tasks import _score_expression, _sort_order
+from app.services.priority import (
+    calc_urgency_score,
+    calculate_priority_score,
+    is_score_stale,
+    urgency_band,
+)
+
+
+def test_urgency_band_matches_days_left_boundaries():
+    now = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+    for days_left, band in [
+        (-1, 0), (0, 0), (0.5, 1), (3, 1), (3.01, 2),
+        (7, 2), (7.01, 3), (14, 3), (14.01, 4), (60, 4),
+    ]:
+        urgency = calc_urgency_score(now + timedelta(days=days_left), now)
+        assert urgency_band(urgency) == band, (days_left, urgency)
+
+
+def test_score_is_stale_only_when_urgency_band_changes():
+    # 緊急度 50（7日以内）のタスク。スコアの差 0.4 は緊急度 1 点分
+    assert is_score_stale(None, 60.0, 50.0)
+    assert not is_score_stale(60.0, 60.0, 50.0)
+    assert not is_score_stale(61.6, 60.0, 50.0)     # 保存時の緊急度 54（同じ区分）
+    assert is_score_stale(68.0, 60.0, 50.0)         # 保存時の緊急度 70（3日以内）
+    assert is_score_stale(57.6, 60.0, 50.0)         # 保存時の緊急度 44（14日以内）
+
+
+def _stored_score(db, task_id: int) -> float:
+    db.expire_all()
+    return db.get(Task, task_id).priority_score
+
+
+def _set_stored_score(db, task_id: int, score: float) -> None:
+    db.execute(update(Task).where(Task.id == task_id).values(priority_score=score))
+    db.commit()
+
+
+def test_reads_persist_only_band_changes_and_writes_persist_any_change(
+    client, db, user, count_queries
+):
+    headers = user["headers"]
+    due = datetime.now(timezone.utc) + timedelta(days=5)
+    resp = client.post(
+        "/api/tasks",
+        json={"title": "見積書作成", "due_date": due.isoformat(), "estimated_minutes": 60},
+        headers=headers,
+    )
+    assert resp.status_code == 201, resp.text
+    task_id = resp.json()["id"]
+    fresh = _stored_score(db, task_id)
+
+    # 区分内のずれは、読み取りでは書き換えない
+    _set_stored_score(db, task_id, fresh + 0.3)
+    with count_queries() as counter:
+        assert client.get("/api/tasks", headers=headers).status_code == 200
+    assert not [s for s in counter.statements if s.lstrip().upper().startswith("UPDATE")]
+    assert _stored_score(db, task_id) == fresh + 0.3
+
+    # 書き込み（一括更新）では、値が変わっていれば書き換える
+    resp = client.patch(
+        "/api/tasks/batch", json={"tasks": [{"id": task_id, "memo": "更新"}]}, headers=headers
+    )
+    assert resp.status_code == 200, resp.text
+    assert _stored_score(db, task_id) == resp.json()["results"][0]["task"]["priority_score"]
+
+    # 保存時から緊急度の区分が変わっていれば、読み取りでも書き換える
+    _set_stored_score(db, task_id, fresh + 10)
+    resp = client.get("/api/tasks", headers=headers)
+    assert resp.status_code == 200
+    listed = next(t for t in resp.json()["tasks"] if t["id"] == task_id)
+    assert _stored_score(db, task_id) == listed["priority_score"]
+
+
+def test_sql_score_and_order_match_python(db, user):
+    """SQL 式（priority_score_expression）の値と ORDER BY が calculate_priority_score と一致する"""
+    rng = random.Random(20240601)
+    now = datetime(2026, 3, 1, 9, 30, tzinfo=timezone.utc)
+    # 緊急度の区分のちょうど境目（と前後1秒）、および乱数の期日
+    offsets = [
+        timedelta(days=days) + timedelta(seconds=delta)
+        for days in (0, 3, 7, 14)
+        for delta in (-1, 0, 1)
+    ]
+    # 緊急度がちょうど小数第3位の5になる期日（3日以内は 43.2 秒、7日以内は 69.12 秒ごとに 0.005 ずつ減る）
+    offsets += [timedelta(seconds=43.2 * k) for k in range(1, 40, 2)]
+    offsets += [timedelta(days=3, seconds=69.12 * k) for k in range(1, 40, 2)]
+    offsets += [timedelta(seconds=rng.uniform(-5 * 86400, 60 * 86400)) for _ in range(150)]
+
+    blockers = [
+        Task(user_id=user["id"], title=f"依存先{status.value}", due_date=now, status=status)
+        for status in (TaskStatus.pending, TaskStatus.completed)
+    ]
+    db.add_all(blockers)
+    db.flush()
+    tasks = [
+        Task(
+            user_id=user["id"],
+            title=f"期日{i}",
+            due_date=now + offset,
+            importance=rng.randint(1, 5),
+            estimated_minutes=rng.choice([None, 10, 15, 30, 45, 60, 120, 240, 480, 600]),
+            depends_on_id=rng.choice([None, blockers[0].id, blockers[1].id]),
+        )
+        for i, offset in enumerate(offsets)
+    ]
+    db.add_all(tasks)
+    db.commit()
+
+    expected = {
+        t.id: calculate_priority_score(
+            t.due_date, t.importance, t.estimated_minutes, t.depends_on_id == blockers[0].id, now
+        )[0]
+        for t in tasks
+    }
+    rows = db.execute(
+        select(Task.id, _score_expression(now))
+        .where(Task.user_id == user["id"], Task.id.in_(expected))
+        .order_by(*_sort_order("score", now))
+    ).all()
+
+    assert len(rows) == len(tasks)
+    assert {task_id: sql_score for task_id, sql_score in rows} == expected
+    python_order = sorted(expected, key=lambda task_id: (-expected[task_id], task_id))
+    assert [task_id for task_id, _ in rows] == python_order
@@ -0,0 +1,54 @@
+"""GET /api/tasks のクエリ数がタスク数（依存関係・タグを含む）によらず一定であること"""
+
+from datetime import datetime, timedelta, timezone
+
+
+def _add_tasks(client, headers: dict, count: int) -> None:
+    """依存関係（直前のタスクに依存）・タグ付きのタスクを作り、3件に1件を完了にする"""
+    now = datetime.now(timezone.utc)
+    resp = client.post(
+        "/api/tasks/batch",
+        json={
+            "tasks": [
+                {
+                    "title": f"依存つき{i}",
+                    "due_date": (now + timedelta(days=i % 20)).isoformat(),
+                    "tags": "経理,月次" if i % 2 else None,
+                }
+                for i in range(count)
+            ]
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+    ids = [item["id"] for item in resp.json()["results"]]
+    updates = [{"id": ids[i], "depends_on_id": ids[i - 1]} for i in range(1, count)]
+    updates += [{"id": ids[i], "status": "completed"} for i in range(0, count, 3)]
+    resp = client.patch("/api/tasks/batch", json={"tasks": updates}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["failed"] == 0
+
+
+def _list_queries(client, headers: dict, count_queries, params: dict) -> tuple[int, int]:
+    # 1回目はスコアの保存（緊急度の区分が変わった場合）が起こりうるので、2回目を数える
+    assert client.get("/api/tasks", params=params, headers=headers).status_code == 200
+    with count_queries() as counter:
+        resp = client.get("/api/tasks", params=params, headers=headers)
+    assert resp.status_code == 200
+    return counter.count, len(resp.json()["tasks"])
+
+
+def test_list_query_count_does_not_grow_with_tasks(client, user, count_queries):
+    headers = user["headers"]
+    # status=pending では完了済みの依存先が一覧に含まれず、別クエリで読む経路を通る
+    cases = [{}, {"status": "pending"}, {"limit": 200}]
+
+    _add_tasks(client, headers, 10)
+    small = [_list_queries(client, headers, count_queries, params) for params in cases]
+    _add_tasks(client, headers, 90)
+    large = [_list_queries(client, headers, count_queries, params) for params in cases]
+
+    assert [n for _, n in small] == [10, 6, 10]
+    assert [n for _, n in large] == [100, 66, 100]
+    assert [queries for queries, _ in small] == [queries for queries, _ in large]
+    assert all(queries > 0 for queries, _ in small)
@@ -0,0 +1,106 @@
+"""手動並び順（POST /api/tasks/reorder・/api/tasks/{id}/move）"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models.task import Task
+
+
+@pytest.fixture
+def tasks(client, user) -> dict[str, int]:
+    """A, B, C, D の順（manual_order 1024, 2048, 3072, 4096）に並べたタスク"""
+    due = (datetime.now(timezone.utc) + timedelta(days=3)).isoformat()
+    resp = client.post(
+        "/api/tasks/batch",
+        json={"tasks": [{"title": name, "due_date": due} for name in "ABCD"]},
+        headers=user["headers"],
+    )
+    assert resp.status_code == 200, resp.text
+    ids = {item["task"]["title"]: item["id"] for item in resp.json()["results"]}
+    resp = client.post(
+        "/api/tasks/reorder", json={"task_ids": list(ids.values())}, headers=user["headers"]
+    )
+    assert resp.status_code == 200, resp.text
+    return ids
+
+
+def _order(client, user, tasks: dict[str, int]) -> str:
+    resp = client.get("/api/tasks", params={"sort": "manual"}, headers=user["headers"])
+    assert resp.status_code == 200
+    names = {task_id: name for name, task_id in tasks.items()}
+    return "".join(names[t["id"]] for t in resp.json()["tasks"])
+
+
+def _move(client, user, tasks: dict[str, int], name: str, **neighbours: str) -> None:
+    payload = {f"{side}_id": tasks[other] for side, other in neighbours.items()}
+    resp = client.post(f"/api/tasks/{tasks[name]}/move", json=payload, headers=user["headers"])
+    assert resp.status_code == 200, resp.text
+
+
+def _manual_orders(db, tasks: dict[str, int]) -> dict[str, int]:
+    db.expire_all()
+    rows = db.execute(select(Task.id, Task.manual_order).where(Task.id.in_(tasks.values())))
+    names = {task_id: name for name, task_id in tasks.items()}
+    return {names[task_id]: order for task_id, order in rows}
+
+
+def test_reorder_assigns_evenly_spaced_orders(client, db, user, tasks):
+    resp = client.post(
+        "/api/tasks/reorder",
+        json={"task_ids": [tasks[name] for name in "DBAC"]},
+        headers=user["headers"],
+    )
+    assert resp.status_code == 200
+    assert _order(client, user, tasks) == "DBAC"
+    assert _manual_orders(db, tasks) == {"D": 1024, "B": 2048, "A": 3072, "C": 4096}
+
+
+@pytest.mark.parametrize(
+    "name, neighbours, expected",
+    [
+        ("D", {"after": "A"}, "ADBC"),
+        ("A", {"before": "C"}, "BACD"),
+        ("A", {"after": "D"}, "BCDA"),
+        ("D", {"before": "A"}, "DABC"),
+        ("A", {"after": "B", "before": "C"}, "BACD"),
+        ("B", {}, "ACDB"),
+    ],
+)
+def test_move_places_task_next_to_neighbour(client, db, user, tasks, name, neighbours, expected):
+    before = _manual_orders(db, tasks)
+    _move(client, user, tasks, name, **neighbours)
+    assert _order(client, user, tasks) == expected
+    after = _manual_orders(db, tasks)
+    if neighbours:
+        # 隙間があるので、移動したタスク1行だけが変わる
+        assert {k: v for k, v in after.items() if k != name} == {
+            k: v for k, v in before.items() if k != name
+        }
+    assert len(set(after.values())) == 4
+
+
+def test_move_rebalances_when_gap_is_exhausted(client, db, user, tasks):
+    db.execute(update(Task).where(Task.id == tasks["B"]).values(manual_order=1025))
+    db.commit()
+
+    _move(client, user, tasks, "D", after="A")
+    assert _order(client, user, tasks) == "ADBC"
+    assert _manual_orders(db, tasks) == {"A": 1024, "D": 2048, "B": 3072, "C": 4096}
+
+
+def test_move_rebalances_unnumbered_neighbour(client, db, user, tasks):
+    db.execute(update(Task).where(Task.id == tasks["D"]).values(manual_order=None))
+    db.commit()
+
+    _move(client, user, tasks, "A", after="C")
+    assert _order(client, user, tasks) == "BCAD"
+    assert _manual_orders(db, tasks) == {"B": 1024, "C": 2048, "A": 3072, "D": 4096}
+
+
+def test_move_unknown_neighbour_is_404(client, user, tasks):
+    resp = client.post(
+        f"/api/tasks/{tasks['A']}/move", json={"after_id": 10**9}, headers=user["headers"]
+    )
+    assert resp.status_code == 404
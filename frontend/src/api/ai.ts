@@ -1,5 +1,7 @@
 import api from "./client";
-import type { AiSuggestResult, AiDecomposeResult } from "../types";
+import type { AiSuggestResult, AiDecomposeResult, AiSubTask } from "../types";
+
+const BASE = import.meta.env.VITE_API_URL ?? "";
 
 interface WeeklyReviewPayload {
   week_label: string;
@@ -7,6 +9,54 @@ interface WeeklyReviewPayload {
   overdue_tasks: { title: string; due_date?: string }[];
 }
 
+// axios のエラーと同じ形（err.response.data.detail）で投げる
+const streamError = (status: number, detail: string) =>
+  Object.assign(new Error(detail), { response: { status, data: { detail } } });
+
+/**
+ * SSE（POST）を読み、イベントごとに onEvent を呼ぶ。done イベントのデータを返す。
+ * 401 のときは null を返す（呼び出し側で通常のAPIに切り替え、トークン更新を任せる）
+ */
+async function postStream<T>(
+  path: string,
+  body: unknown,
+  onEvent: (event: string, data: any) => void
+): Promise<T | null> {
+  const token = localStorage.getItem("access_token");
+  const res = await fetch(`${BASE}/api${path}`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: JSON.stringify(body),
+  });
+  if (res.status === 401) return null;
+  if (!res.ok || !res.body) {
+    const data = await res.json().catch(() => ({}));
+    throw streamError(res.status, data.detail);
+  }
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    let sep: number;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const block = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      const event = block.match(/^event: (.*)$/m)?.[1] ?? "message";
+      const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] ?? "null");
+      if (event === "error") throw streamError(502, data.detail);
+      if (event === "done") return data as T;
+      onEvent(event, data);
+    }
+  }
+  throw streamError(502, "AIの応答が途中で切れました");
+}
+
 export const aiApi = {
   suggest: (title: string): Promise<AiSuggestResult> =>
     api.post<AiSuggestResult>("/ai/suggest", { title }).then((r) => r.data),
@@ -20,4 +70,35 @@ export const aiApi = {
     api
       .post<AiDecomposeResult>("/ai/decompose", { title, memo })
       .then((r) => r.data),
+
+  // 生成中の文章を onText（それまでの全文）で受け取る
+  weeklyReviewStream: async (
+    payload: WeeklyReviewPayload,
+    onText: (text: string) => void
+  ): Promise<{ review_text: string }> => {
+    let text = "";
+    const result = await postStream<{ review_text: string }>(
+      "/ai/weekly-review/stream",
+      payload,
+      (_event, data) => {
+        text += data.text;
+        onText(text);
+      }
+    );
+    return result ?? aiApi.weeklyReview(payload);
+  },
+
+  // サブタスクを1件生成されるごとに onSubtask で受け取る
+  decomposeStream: async (
+    title: string,
+    memo: string | undefined,
+    onSubtask: (subtask: AiSubTask) => void
+  ): Promise<AiDecomposeResult> => {
+    const result = await postStream<AiDecomposeResult>(
+      "/ai/decompose/stream",
+      { title, memo },
+      (_event, data) => onSubtask(data)
+    );
+    return result ?? aiApi.decompose(title, memo);
+  },
 };
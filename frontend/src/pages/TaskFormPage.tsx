@@ -147,7 +147,10 @@ export default function TaskFormPage() {
     }
     setDecomposing(true);
     try {
-      const result = await aiApi.decompose(title, memo || undefined);
+      setAiSubtasks([]);
+      const result = await aiApi.decomposeStream(title, memo || undefined, (subtask) =>
+        setAiSubtasks((prev) => [...prev, subtask])
+      );
       setAiSubtasks(result.subtasks);
       toast.success(`${result.subtasks.length}個のサブタスクを生成しました`);
     } catch (err: any) {
@@ -39,18 +39,21 @@ export default function WeeklyReviewPage() {
     setGeneratingReview(true);
     try {
       const weekLabel = `${format(weekStart, "M月d日", { locale: ja })}〜${format(weekEnd, "M月d日", { locale: ja })}`;
-      const result = await aiApi.weeklyReview({
-        week_label: weekLabel,
-        completed_tasks: completedThisWeek.map((t) => ({
-          title: t.title,
-          actual_minutes: t.actual_minutes ?? undefined,
-          category: t.category ?? undefined,
-        })),
-        overdue_tasks: overdueTasks.map((t) => ({
-          title: t.title,
-          due_date: format(new Date(t.due_date), "M/d"),
-        })),
-      });
+      const result = await aiApi.weeklyReviewStream(
+        {
+          week_label: weekLabel,
+          completed_tasks: completedThisWeek.map((t) => ({
+            title: t.title,
+            actual_minutes: t.actual_minutes ?? undefined,
+            category: t.category ?? undefined,
+          })),
+          overdue_tasks: overdueTasks.map((t) => ({
+            title: t.title,
+            due_date: format(new Date(t.due_date), "M/d"),
+          })),
+        },
+        setMemo
+      );
       handleMemoChange(result.review_text);
       toast.success("AIレビューを生成しました");
     } catch (err: any) {